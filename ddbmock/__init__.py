@@ -33,13 +33,17 @@ def layer1_mock_init(self, access_key, *args, **kwargs):
         pass
     self.provider = provider()
     self.provider.access_key = access_key
+    self.trusted = False
 
-def connect_boto_patch(aws_access_key_id=None):
-    """Connect to ddbmock as a library via boto"""
+def connect_boto_patch(aws_access_key_id=None, trusted=False):
+    """Connect to ddbmock as a library via boto. ``trusted`` connections only
+    get default values applied to their requests, without validation"""
     import boto
 
     if real_boto:
-        return boto.connect_dynamodb()
+        db = boto.connect_dynamodb()
+        db.layer1.trusted = trusted
+        return db
 
     from boto.dynamodb.layer1 import Layer1
     from router.boto import boto_router
@@ -53,7 +57,9 @@ def connect_boto_patch(aws_access_key_id=None):
     Layer1.__init__ = layer1_mock_init
 
     # Just one more shortcut
-    return boto.connect_dynamodb(aws_access_key_id = aws_access_key_id)
+    db = boto.connect_dynamodb(aws_access_key_id = aws_access_key_id)
+    db.layer1.trusted = trusted
+    return db
 
 def clean_boto_patch():
     """Restore real boto code"""
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+"""
+Bulk load and dump tables as JSON Lines, one DynamoDB JSON item per line:
+
+::
+
+    {"hash_key": {"N": "123"}, "relevant_data": {"S": "tata"}}
+
+Lines wrapped in an ``{"Item": ...}`` object, like in DynamoDB exports, are
+accepted too. Items bypass the request validation and throughput accounting
+and are written to the store by batches.
+
+Tables must already exist, either persisted by the storage engine or in a
+snapshot loaded with ``--snapshot``.
+"""
+
+from ddbmock import config
+from ddbmock.errors import ResourceNotFoundException
+import argparse, json, os, sys
+
+# count: default number of items written per store batch
+BATCH_SIZE = 1000
+
+
+def _read_items(lines):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        item = json.loads(line)
+        if u'Item' in item and isinstance(item[u'Item'], dict):
+            item = item[u'Item']
+        yield item
+
+def import_items(table, lines, batch_size=BATCH_SIZE):
+    """
+    Write items from ``lines`` to ``table``. Existing items with the same key
+    are overwritten. Each group of ``batch_size`` items is written in a single
+    :py:meth:`ddbmock.database.table.Table.batch`.
+
+    :param table: target :py:class:`ddbmock.database.table.Table`
+    :param lines: iterable of JSON Lines, typically an open file
+    :param batch_size: number of items per store batch
+
+    :return: number of items written
+
+    :raises: :py:exc:`ddbmock.errors.ValidationException` if an item has no valid key or is too big
+    """
+    count = 0
+    items = _read_items(lines)
+
+    while True:
+        with table.batch():
+            for item in items:
+                table.put(item, {})
+                count += 1
+                if not count % batch_size:
+                    break
+            else:
+                return count
+
+def export_items(table, out):
+    """
+    Write all items of ``table`` to ``out`` as JSON Lines. Items are streamed
+    from the store, the table is never loaded at once.
+
+    :param table: source :py:class:`ddbmock.database.table.Table`
+    :param out: file like object to write to
+
+    :return: number of items written
+    """
+    count = 0
+    for item in table.store.scan():
+        out.write(json.dumps(item, separators=(',', ':')))
+        out.write('\n')
+        count += 1
+    return count
+
+def main(argv=None):
+    """
+    ``ddbmock-bulk`` command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Bulk import or export ddbmock tables as JSON Lines")
+    parser.add_argument('action', choices=['import', 'export'])
+    parser.add_argument('table', help="table name")
+    parser.add_argument('path', nargs='?', default='-', help="JSON Lines file, '-' for stdin/stdout (default)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="items per store batch (default: %(default)s)")
+    parser.add_argument('--snapshot', help="snapshot file to restore first. Written back after an import")
+    parser.add_argument('--engine', choices=['memory', 'sqlite', 'log'], default=config.STORAGE_ENGINE_NAME,
+                        help="storage engine (default: %(default)s)")
+    parser.add_argument('--sqlite-file', default=config.STORAGE_SQLITE_FILE, help="sqlite engine database (default: %(default)s)")
+    parser.add_argument('--log-dir', default=config.STORAGE_LOG_DIR, help="log engine directory (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    # importing ddbmock already loaded the database with the default storage
+    # configuration: reload it from the requested one
+    config.STORAGE_ENGINE_NAME = args.engine
+    config.STORAGE_SQLITE_FILE = args.sqlite_file
+    config.STORAGE_LOG_DIR = args.log_dir
+    from ddbmock.database.storage import sqlite
+    if sqlite.pool.path != args.sqlite_file:
+        sqlite.pool = sqlite.ConnectionPool(args.sqlite_file)
+    from ddbmock.database.db import dynamodb
+    dynamodb.load()
+
+    if args.snapshot and os.path.exists(args.snapshot):
+        dynamodb.restore(args.snapshot)
+
+    try:
+        table = dynamodb.get_table(args.table)
+    except ResourceNotFoundException as e:
+        parser.error(e.args[0])
+
+    if args.action == 'import':
+        f = sys.stdin if args.path == '-' else open(args.path, 'rb')
+        try:
+            count = import_items(table, f, args.batch_size)
+        finally:
+            if f is not sys.stdin:
+                f.close()
+        if args.snapshot:
+            dynamodb.snapshot(args.snapshot)
+    else:
+        f = sys.stdout if args.path == '-' else open(args.path, 'wb')
+        try:
+            count = export_items(table, f)
+        finally:
+            if f is not sys.stdout:
+                f.close()
+
+    print >>sys.stderr, "{} {}ed {} items".format(args.table, args.action, count)
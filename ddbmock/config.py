@@ -2,10 +2,15 @@
 
 # Index overhead. This is added to each Item size when computing table size
 INDEX_OVERHEAD = 100
+# seconds: how often ``ItemCount`` and ``TableSizeBytes`` are refreshed. 0 for live values, real DynamoDB uses 6*3600
+TABLE_STATS_INTERVAL = 0
 
 # count: maximum number of tables
 MAX_TABLES = 256
 
+# boolean: validate GetItem, PutItem, UpdateItem, Query and BatchGetItem with hand written code. Errors are still reported by the schemas
+FAST_VALIDATORS = True
+
 ### items constraints ###
 
 # bytes: max hash_key_size
@@ -14,6 +19,8 @@ MAX_HK_SIZE = 2048
 MAX_RK_SIZE = 1024
 # bytes: max item size, not including the index overhead
 MAX_ITEM_SIZE = 64*1024
+# bytes: max size of the data read by a single Query or Scan page
+MAX_PAGE_SIZE = 1024*1024
 
 config = {"_default":
 	{
@@ -42,6 +49,9 @@ config = {"_default":
 
 		# boolean: read-only access to tables
 		"READ_ONLY": False,
+		# boolean: skip the validation of requests, only apply default values.
+		# For in-process clients sending well formed requests, like boto
+		"TRUSTED": False,
 
 		# value: Fail every nth operation. So, N successes then 1 failure, repeat.
 		# None means "don't". 0 means every.
@@ -51,6 +61,9 @@ config = {"_default":
 	"read_only": {
 		"READ_ONLY": True
 	},
+	"trusted": {
+		"TRUSTED": True
+	},
 	"slow_user": {
 		"DELAY_OPERATIONS": 4
 	},
@@ -92,6 +105,11 @@ def setup(access_key = None):
 
 setup()
 
+### Concurrency ###
+
+# count: number of write locks per table. Writes to hash_keys sharing a lock are serialized
+WRITE_LOCK_STRIPES = 64
+
 ### Throughput statistics ###
 
 # seconds: datapoint duration
@@ -101,7 +119,24 @@ STAT_TP_AGGREG = 5*60
 
 ### Storage specific settings ###
 
-# Storage engine to use ('memory' or 'sqlite')
+# Storage engine to use ('memory', 'sqlite' or 'log')
 STORAGE_ENGINE_NAME = 'memory'
+# Per table storage engine: list of (table name pattern, engine). First match wins, defaults to STORAGE_ENGINE_NAME
+# ex: [('ref-*', 'sqlite'), ('~*schema*~', 'sqlite')]
+STORAGE_ENGINES = []
+# bytes: size of the LRU item cache in front of each table store. 0 to disable
+STORAGE_CACHE_SIZE = 0
+# Item serialization for persistent stores ('pickle', 'marshal' or 'json'). Data written with any of them can be read back
+STORAGE_ITEM_CODEC = 'marshal'
 # SQLite database location
 STORAGE_SQLITE_FILE = 'dynamo.db'
+# boolean: share fsyncs between commits. Last commits may be lost on power failure, not on application crash
+STORAGE_SQLITE_GROUP_COMMIT = False
+# count: number of rows read at once by sqlite Query and Scan. Bounds memory usage
+STORAGE_SQLITE_BATCH_SIZE = 100
+# Append-only log engine files location
+STORAGE_LOG_DIR = 'dynamo.log.d'
+# bytes: log size triggering a snapshot of the table and the truncation of the log
+STORAGE_LOG_COMPACT_SIZE = 64*1024*1024
+# boolean: fsync the log after each write. Otherwise, last writes may be lost on power failure, not on application crash
+STORAGE_LOG_SYNC = False
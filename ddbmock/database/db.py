@@ -2,7 +2,8 @@
 
 from .table import Table
 from .item import ItemSize
-from .storage import Store
+from .storage import create_store
+from .snapshot import write_snapshot, read_snapshot
 from collections import defaultdict
 from ddbmock import config
 from ddbmock.utils import push_write_throughput, push_read_throughput, schedule_action
@@ -40,9 +41,19 @@ class DynamoDB(object):
 
         # At first instanciation, attempt to reload the database schema
         if self.store is None:
-            self.store = Store('~*schema*~')
-            for table in self.store:
-                self.data[table.name] = table
+            self.load()
+
+    def load(self):
+        """
+        Load all tables schema from the ``~*schema*~`` store of the current
+        storage configuration. Tables loaded so far are forgotten, not dropped.
+        This is only needed when the configuration changes after the first
+        import of the database, like in :py:mod:`ddbmock.bulk`.
+        """
+        self.store = create_store('~*schema*~')
+        self.data.clear()
+        for table in self.store:
+            self.data[table.name] = table
 
     def hard_reset(self):
         """
@@ -56,6 +67,32 @@ class DynamoDB(object):
         self.data.clear()
         self.store.truncate()
 
+    def snapshot(self, path):
+        """
+        Save all tables schema and items to a snapshot file. See
+        :py:mod:`ddbmock.database.snapshot` for the format.
+
+        :param path: snapshot file location. Existing file is replaced.
+        """
+        write_snapshot(path, self.data.values())
+
+    def restore(self, path):
+        """
+        Replace all tables with the content of a snapshot file. All current
+        tables are dropped first. With the memory store, the file is memory
+        mapped and items are only deserialized on first read so that even big
+        datasets are available in seconds.
+
+        :param path: snapshot file location, as written by :py:meth:`snapshot`
+
+        :raises: ``ValueError`` if ``path`` is not a snapshot file
+        """
+        self.hard_reset()
+
+        for table in read_snapshot(path):
+            self.data[table.name] = table
+            self.store[table.name, False] = table
+
     def list_tables(self):
         """
         Get a list of all table names.
@@ -76,13 +113,14 @@ class DynamoDB(object):
             return self.data[name]
         raise ResourceNotFoundException("Table {} does not exist".format(name))
 
-    def create_table(self, name, data):
+    def create_table(self, name, data, engine=None):
         """
         Create a :py:class:`ddbmock.database.table.Table` named '``name``'' using
         parameters provided in ``data`` if it does not yet exist.
 
         :param name: Valid table name. No further checks are performed.
         :param data: raw DynamoDB request data.
+        :param engine: (optional) Storage engine name like 'memory' or 'sqlite'. Defaults to the first :py:const:`ddbmock.config.STORAGE_ENGINES` pattern matching ``name``, then :py:const:`ddbmock.config.STORAGE_ENGINE_NAME`.
 
         :return: A reference to the newly created :py:class:`ddbmock.database.table.Table`
 
@@ -94,7 +132,7 @@ class DynamoDB(object):
         if len(self.data) >= config.MAX_TABLES:
             raise LimitExceededException("Table limit reached. You can not have more than {} tables simultaneously".format(config.MAX_TABLES))
 
-        self.data[name] = Table.from_dict(data)
+        self.data[name] = Table.from_dict(data, engine)
         self.store[name, False] = self.data[name]
         return self.data[name]
 
@@ -169,6 +207,7 @@ class DynamoDB(object):
         """
         Batch processor. Dispatches call to appropriate :py:class:`ddbmock.database.table.Table`
         methods. This is the only low_level API that directly pushes throughput usage.
+        Writes to each table are grouped in a single store transaction.
 
         :param batch: raw DynamoDB request batch.
 
@@ -182,13 +221,14 @@ class DynamoDB(object):
         for tablename, operations in batch.iteritems():
             table = self.get_table(tablename)
             units = ItemSize(0)
-            for operation in operations:
-                if u'PutRequest' in operation:
-                    old, new = table.put(operation[u'PutRequest'][u'Item'], {})
-                    units += max(old.get_size().as_units(), new.get_size().as_units())
-                if u'DeleteRequest' in operation:
-                    old = table.delete_item(operation[u'DeleteRequest'][u'Key'], {})
-                    units += old.get_size().as_units()
+            with table.batch():
+                for operation in operations:
+                    if u'PutRequest' in operation:
+                        old, new = table.put(operation[u'PutRequest'][u'Item'], {})
+                        units += max(old.get_size().as_units(), new.get_size().as_units())
+                    if u'DeleteRequest' in operation:
+                        old = table.delete_item(operation[u'DeleteRequest'][u'Key'], {})
+                        units += old.get_size().as_units()
             push_write_throughput(tablename, units)
             ret[tablename][u'ConsumedCapacityUnits'] = units
 
@@ -61,6 +61,10 @@ class Item(dict):
     Internal Item representation. The Item is stored in its raw DynamoDB request
     form and no parsing is involved unless specifically needed.
 
+    Field values are never modified in place, they are replaced. Hence, a
+    shallow copy ``Item(item)`` is enough to get an independant version of an
+    ``Item``.
+
     It adds a couple of handful helpers to the dict class such as DynamoDB actions,
     condition validations and specific size computation.
     """
@@ -105,10 +109,13 @@ class Item(dict):
         :raises: :py:exc:`ddbmock.errors.ValidationException` whenever attempting an illegual action
         """
         # Rewrite this function, it's disgustting code
-        if action[u'Action'] == u"PUT":
+        # 'Action' defaults to PUT. Trusted requests are not defaulted by the schema
+        action_type = action.get(u'Action', u"PUT")
+
+        if action_type == u"PUT":
             self[fieldname] = action[u'Value']
 
-        if action[u'Action'] == u"DELETE": # Starts to be anoying
+        if action_type == u"DELETE": # Starts to be anoying
             if not fieldname in self:
                 return  #shortcut
             if u'Value' not in action:
@@ -131,7 +138,7 @@ class Item(dict):
             else:
                 self[fieldname] = {ftypename: list(data)}
 
-        if action[u'Action'] == u"ADD":  # Realy anoying to code :s
+        if action_type == u"ADD":  # Realy anoying to code :s
             #FIXME: not perfect, action should be different if the item was new
             typename, value = _decode_field(action[u'Value'])
             if fieldname in self:
@@ -139,12 +146,12 @@ class Item(dict):
 
                 if ftypename == u"N":
                     data = Decimal(value) + Decimal(fvalue)
-                    self[fieldname][u"N"] = unicode(data)
+                    self[fieldname] = {u"N": unicode(data)}
                 elif ftypename in [u"NS", u"SS", u"BS"]:
                     if ftypename != typename:
                         raise ValidationException(u"Expected type {t} for ADD in type {t}. Got {}".format(typename, t=ftypename))
                     data = set(fvalue).union(value)
-                    self[fieldname][typename] = list(data)
+                    self[fieldname] = {typename: list(data)}
                 else:
                     raise ValidationException(u"Only N, NS, SS and BS types supports ADD operation. Got {}".format(ftypename))
             else:
@@ -251,7 +258,7 @@ class Item(dict):
         :param name: override name field of key
         :param max_size: if specified, check that the item is bellow a treshold
 
-        :return: field value at ``key``
+        :return: encoded field value at ``key``. See :py:meth:`ddbmock.database.key.Key.encode`
 
         :raises: :py:exc:`ddbmock.errors.ValidationException` if field does not exist, type does not match or is above ``max_size``
         """
@@ -270,7 +277,7 @@ class Item(dict):
             if size > max_size:
                 raise ValidationException(u'Field {} is over {} bytes limit. Got {}'.format(name, max_size, size))
 
-        return key.read(field)
+        return key.encode(field)
 
     def _internal_item_size(self, base_type, value):
         """
@@ -3,6 +3,144 @@
 # All validations are performed on *incomming* data => already done :)
 
 from ddbmock.errors import ValidationException
+from decimal import Decimal
+import base64, struct, zlib
+
+# Keys are stored under a byte string encoding such that comparing 2 encoded
+# keys of the same type gives the same result as comparing the values with
+# DynamoDB rules. This is done once, when reading the key, so that stores can
+# rely on plain byte ordering for sorting and seeking.
+
+NUMBER_NEGATIVE = '\x01'
+NUMBER_ZERO = '\x02'
+NUMBER_POSITIVE = '\x03'
+
+def encode_number(value):
+    """
+    Encode a number so that byte order is numeric order. Equal numbers are
+    given the same encoding, no matter their representation (``1``, ``1.0``,
+    ``10E-1``, ...).
+
+    Layout is ``sign byte``, ``biased exponent`` (2 bytes, big endian), then
+    significant digits and a terminator. For negative numbers, all bytes after
+    the sign are inverted so that biggest magnitude comes first.
+
+    :param value: Raw DynamoDB number value
+
+    :return: byte string
+    """
+    sign, digits, exponent = Decimal(value).as_tuple()
+    digits = ''.join(map(str, digits)).lstrip('0')
+    if not digits:
+        return NUMBER_ZERO
+
+    significant = digits.rstrip('0')
+    exponent += len(digits) - len(significant)
+    adjusted = exponent + len(significant) - 1
+
+    magnitude = struct.pack('>H', adjusted + 0x8000) + significant + '\x00'
+    if sign:
+        return NUMBER_NEGATIVE + ''.join(chr(255 - ord(c)) for c in magnitude)
+    return NUMBER_POSITIVE + magnitude
+
+def encode_string(value):
+    """
+    Encode a string as utf-8. Byte order is unicode code point order.
+
+    :param value: Raw DynamoDB string value
+
+    :return: byte string
+    """
+    return value.encode('utf-8')
+
+def encode_binary(value):
+    """
+    Decode base64 binary value so that comparisons apply to actual data.
+
+    :param value: Raw DynamoDB binary value
+
+    :return: byte string
+    """
+    return base64.b64decode(value)
+
+ENCODERS = {
+    u'N': encode_number,
+    u'S': encode_string,
+    u'B': encode_binary,
+}
+
+def next_key(key):
+    """
+    Get the smallest encoded key strictly greater than ``key``. Turns an
+    exclusive bound into an inclusive one and the other way around.
+
+    :param key: encoded key
+
+    :return: byte string
+    """
+    return key + '\x00'
+
+def prefix_end(prefix):
+    """
+    Get the smallest encoded key greater than all keys starting with ``prefix``.
+
+    :param prefix: encoded key prefix
+
+    :return: byte string or ``None`` if there is no such key
+    """
+    prefix = prefix.rstrip('\xff')
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def hash_token(key):
+    """
+    Get a stable 32 bits token for an encoded ``hash_key``. Like DynamoDB hash
+    partitioning, stores may use it to lay the ``hash_key`` out so that
+    ``Scan`` order does not depend on key order.
+
+    :param key: encoded ``hash_key``
+
+    :return: unsigned int
+    """
+    return zlib.crc32(key) & 0xffffffff
+
+def hash_segment(key, total_segments):
+    """
+    Get the ``Scan`` segment an encoded ``hash_key`` belongs to. Segments are
+    contiguous slices of the token space so that each of them is a contiguous
+    part of the ``hash_key`` layout.
+
+    :param key: encoded ``hash_key``
+    :param total_segments: number of segments the table is split into
+
+    :return: segment number in [0, ``total_segments``[
+    """
+    return (hash_token(key) * total_segments) >> 32
+
+def segment_tokens(segment, total_segments):
+    """
+    Get the tokens range of a ``Scan`` segment. See :py:func:`hash_segment`.
+
+    :param segment: segment number in [0, ``total_segments``[
+    :param total_segments: number of segments the table is split into
+
+    :return: (``low``, ``high``) tokens where ``low`` is inclusive and ``high`` exclusive
+    """
+    low = -(-(segment << 32) // total_segments)
+    high = -(-((segment + 1) << 32) // total_segments)
+    return low, high
+
+def encode_key(typename, value):
+    """
+    Get the byte comparable version of a key value.
+
+    :param typename: Valid key typename. No further checks are performed.
+    :param value: Raw DynamoDB key value
+
+    :return: byte string
+    """
+    return ENCODERS[typename](value)
 
 class Key(object):
     """
@@ -37,6 +175,55 @@ class Key(object):
 
         return value
 
+    def encode(self, key):
+        """
+        Parse a key as specified by DynamoDB API and return its byte comparable
+        encoding as long as its typename matches :py:attr:`typename`. This is
+        the form under which keys are passed to the storage backend.
+
+        :param key: Raw DynamoDB request key.
+
+        :return: the encoded value of the key. See :py:func:`encode_key`
+
+        :raises: :py:exc:`ddbmock.errors.ValidationException` if field types does not match
+        """
+        return encode_key(self.typename, self.read(key))
+
+    def bounds(self, condition):
+        """
+        Translate a ``Query`` range key condition into the interval of encoded
+        keys it matches. As keys are stored in order, this interval is a
+        contiguous slice of the store.
+
+        :param condition: Raw DynamoDB request ``range_key`` condition or ``None`` to match all keys.
+
+        :return: (``low``, ``high``) where ``low`` is inclusive and ``high`` exclusive. ``None`` means unbounded.
+
+        :raises: :py:exc:`ddbmock.errors.ValidationException` if condition value types does not match
+        """
+        if condition is None:
+            return None, None
+
+        operator = condition[u'ComparisonOperator']
+        values = [self.encode(v) for v in condition[u'AttributeValueList']]
+
+        if operator == u'EQ':
+            return values[0], next_key(values[0])
+        if operator == u'GT':
+            return next_key(values[0]), None
+        if operator == u'GE':
+            return values[0], None
+        if operator == u'LT':
+            return None, values[0]
+        if operator == u'LE':
+            return None, next_key(values[0])
+        if operator == u'BETWEEN':
+            return values[0], next_key(values[1])
+        if operator == u'BEGINS_WITH':
+            return values[0], prefix_end(values[0])
+
+        raise ValidationException('Unsupported range key condition {}'.format(operator))
+
     def to_dict(self):
         """
         Return the key as a Python dict.
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+from .key import hash_token
+from threading import RLock
+
+class StripedLock(object):
+    """
+    Set of ``stripes`` locks. Each encoded ``hash_key`` is bound to one of them
+    so that writes to different ``hash_key`` may run concurrently while writes
+    to the same ``hash_key`` are serialized.
+
+    Use ``with lock[hash_key]:`` to lock a single ``hash_key`` and ``with lock:``
+    to lock all of them at once. Locks are reentrant so that a thread holding
+    all of them may still lock a single ``hash_key``.
+    """
+    def __init__(self, stripes):
+        """
+        :param stripes: number of locks. Must be at least 1.
+        """
+        self.locks = [RLock() for i in xrange(stripes)]
+
+    def __getitem__(self, hash_key):
+        """
+        Get the lock guarding ``hash_key``.
+
+        :param hash_key: encoded ``hash_key``
+
+        :return: ``threading.RLock`` instance
+        """
+        return self.locks[hash_token(hash_key) % len(self.locks)]
+
+    def __enter__(self):
+        # always acquire in the same order to avoid dead locks
+        for lock in self.locks:
+            lock.acquire()
+
+    def __exit__(self, *exc_info):
+        for lock in reversed(self.locks):
+            lock.release()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+from ddbmock.database.item import ItemSize
+from ddbmock.database.storage import memory
+from ddbmock.database.storage.codec import encode, decode
+import cPickle as pickle
+import marshal, mmap, os, struct
+
+# Snapshot file layout:
+#
+# - MAGIC
+# - serialized items, back to back
+# - index: marshaled list of (pickled table, [(hash_key, range_key, start, end, size), ...])
+# - FOOTER: offset of the index
+#
+# Only the index is read when loading a snapshot. Items are read from a memory
+# mapping of the file, on demand when the store supports it.
+
+MAGIC = 'DDBMOCK\x01'
+FOOTER = struct.Struct('>Q')
+
+
+def write_snapshot(path, tables):
+    """
+    Write all ``tables`` schema and items to a snapshot file at ``path``. The
+    file is replaced atomically.
+
+    :param path: snapshot file location
+    :param tables: iterable of :py:class:`ddbmock.database.table.Table`
+    """
+    index = []
+    tmp_path = path + '.tmp'
+
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        offset = len(MAGIC)
+
+        for table in tables:
+            keys = []
+            for item in table.store.scan():
+                data = encode(item)
+                f.write(data)
+                keys.append((
+                    item.read_key(table.hash_key),
+                    item.read_key(table.range_key),
+                    offset,
+                    offset + len(data),
+                    int(item.get_size()),
+                ))
+                offset += len(data)
+            index.append((pickle.dumps(table, 2), keys))
+
+        f.write(marshal.dumps(index, 2))
+        f.write(FOOTER.pack(offset))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.rename(tmp_path, path)
+
+
+def read_snapshot(path):
+    """
+    Load tables from snapshot file at ``path``. When tables use the memory
+    store, items are only deserialized on first read. Otherwise, they are
+    written to the store by batches.
+
+    :param path: snapshot file location
+
+    :return: list of :py:class:`ddbmock.database.table.Table`
+
+    :raises: ``ValueError`` if ``path`` is not a snapshot file
+    """
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("{} is not a ddbmock snapshot".format(path))
+
+    offset, = FOOTER.unpack(data[-FOOTER.size:])
+    index = marshal.loads(data[offset:-FOOTER.size])
+    tables = []
+
+    for schema, keys in index:
+        table = pickle.loads(schema)
+        store = table.store
+
+        # table is not shared yet: no need to lock. The log store is a memory
+        # store but it needs to journal its writes
+        if type(store) is memory.Store:
+            # the store is new and empty: its stats are known
+            table.truncate()
+            for hash_key, range_key, start, end, size in keys:
+                store[hash_key, range_key] = memory.LazyItem(data, start, end)
+            table._add_stats(len(keys), sum(ItemSize(size).with_indexing_overhead()
+                                            for _, _, _, _, size in keys))
+        else:
+            with table.batch():
+                for hash_key, range_key, start, end, size in keys:
+                    item = decode(data[start:end])
+                    store[hash_key, range_key] = item
+                    table._update_stats(None, item)
+
+        tables.append(table)
+
+    return tables
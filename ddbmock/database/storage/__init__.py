@@ -1,6 +1,45 @@
 # -*- coding: utf-8 -*-
 
 from ddbmock import config
+from fnmatch import fnmatchcase
 
-_store_mod = __import__(config.STORAGE_ENGINE_NAME, globals(), locals(), ['Store'], 1)
-Store = _store_mod.Store
+def get_store_class(engine):
+    """
+    Load storage engine module ``engine`` from this package.
+
+    :param engine: storage engine name like 'memory', 'sqlite' or 'log'
+
+    :return: ``Store`` class of the engine
+    """
+    return __import__(engine, globals(), locals(), ['Store'], 1).Store
+
+def get_engine(name):
+    """
+    Find the storage engine for table ``name``: first pattern of
+    :py:const:`ddbmock.config.STORAGE_ENGINES` matching the name or
+    :py:const:`ddbmock.config.STORAGE_ENGINE_NAME`.
+
+    :param name: table name
+
+    :return: storage engine name
+    """
+    for pattern, engine in config.STORAGE_ENGINES:
+        if fnmatchcase(name, pattern):
+            return engine
+    return config.STORAGE_ENGINE_NAME
+
+def create_store(name, engine=None, hash_key=None, range_key=None):
+    """
+    Create store for table ``name``.
+
+    :param name: table name
+    :param engine: storage engine name. Defaults to :py:func:`get_engine`
+    :param hash_key: (optional) :py:class:`ddbmock.database.key.Key` of the table ``hash_key``
+    :param range_key: (optional) :py:class:`ddbmock.database.key.Key` of the table ``range_key``
+
+    :return: ``Store`` instance
+    """
+    return get_store_class(engine or get_engine(name))(name, hash_key, range_key)
+
+# default engine
+Store = get_store_class(config.STORAGE_ENGINE_NAME)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+from threading import Lock
+
+
+class CachedStore(object):
+    """
+    Read-through LRU cache of single items in front of any ``Store``. Cache
+    size is bounded by the cumulated :py:class:`ddbmock.database.item.ItemSize`
+    of the cached items. Writes go straight to the wrapped store and invalidate
+    the cache.
+
+    Only ``store[hash_key, range_key]`` reads are cached. Ordered reads and
+    iterations are delegated to the wrapped store.
+    """
+    def __init__(self, store, max_size):
+        """
+        :param store: ``Store`` instance to wrap
+        :param max_size: maximum cumulated size of the cached items, in bytes
+        """
+        self.store = store
+        self.name = store.name
+        self.max_size = max_size
+        self.size = 0
+        self.items = OrderedDict()
+        self.lock = Lock()
+
+        # bumped on each invalidation so that a read racing with a write does
+        # not put a stale item back in the cache
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def _invalidate(self, key):
+        """Drop ``key`` from the cache. Caller must hold :py:attr:`lock`"""
+        self.generation += 1
+        item = self.items.pop(key, None)
+        if item is not None:
+            self.size -= item.get_size()
+
+    def batch(self):
+        return self.store.batch()
+
+    def truncate(self):
+        """Perform a full table cleanup and empty the cache"""
+        self.store.truncate()
+        with self.lock:
+            self.generation += 1
+            self.items.clear()
+            self.size = 0
+
+    def __getitem__(self, (hash_key, range_key)):
+        """
+        Get item at (``hash_key``, ``range_key``) from the cache or the wrapped
+        store. If ``range_key`` is None, all keys under ``hash_key`` are read
+        from the wrapped store.
+
+        :raise: KeyError
+        """
+        if range_key is None:
+            return self.store[hash_key, range_key]
+
+        key = (hash_key, range_key)
+        with self.lock:
+            try:
+                item = self.items.pop(key)
+            except KeyError:
+                self.misses += 1
+                generation = self.generation
+            else:
+                # move to most recently used
+                self.items[key] = item
+                self.hits += 1
+                return item
+
+        item = self.store[key]
+        size = item.get_size()
+
+        with self.lock:
+            if generation != self.generation or key in self.items or size > self.max_size:
+                return item
+
+            self.items[key] = item
+            self.size += size
+            while self.size > self.max_size:
+                old_key, old = self.items.popitem(last=False)
+                self.size -= old.get_size()
+
+        return item
+
+    # invalidate *after* the write: a concurrent read may otherwise cache the
+    # item as it was before
+    def __setitem__(self, (hash_key, range_key), item):
+        try:
+            self.store[hash_key, range_key] = item
+        finally:
+            with self.lock:
+                self._invalidate((hash_key, range_key))
+
+    def __delitem__(self, (hash_key, range_key)):
+        try:
+            del self.store[hash_key, range_key]
+        finally:
+            with self.lock:
+                self._invalidate((hash_key, range_key))
+
+    def __iter__(self):
+        return iter(self.store)
+
+    def range_query(self, hash_key, low=None, high=None, reverse=False, limit=None):
+        return self.store.range_query(hash_key, low, high, reverse, limit)
+
+    def scan(self, hash_key=None, range_key=None, segment=0, total_segments=1):
+        return self.store.scan(hash_key, range_key, segment, total_segments)
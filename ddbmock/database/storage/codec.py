@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+from ddbmock import config
+from ddbmock.database.item import Item
+import cPickle as pickle
+import marshal, json
+
+# Persistent stores need to serialize items. Items are raw DynamoDB attribute
+# maps: plain dicts of unicode, lists and dicts which simpler formats than
+# pickle handle much faster. Each codec is tagged by its first byte so that
+# data written with any codec can still be read after a configuration change.
+
+# Pickle protocol 2 data already starts with this byte
+PICKLE_TAG = '\x80'
+
+CODECS = {}
+"""Item codecs, by name: (tag, dumps, loads). See :py:func:`register_codec`"""
+
+_DECODERS = {}
+
+def register_codec(name, tag, dumps, loads):
+    """
+    Register a new item codec and make it available in
+    :py:const:`ddbmock.config.STORAGE_ITEM_CODEC`.
+
+    :param name: codec name
+    :param tag: single byte identifying data written with this codec
+    :param dumps: serialize a raw ``dict`` to a byte string
+    :param loads: deserialize a byte string to a raw ``dict``
+
+    :raises: ``ValueError`` if ``tag`` is already in use
+    """
+    if tag == PICKLE_TAG or _DECODERS.get(tag, loads) is not loads:
+        raise ValueError("Codec tag {!r} is already in use".format(tag))
+    CODECS[name] = (tag, dumps, loads)
+    _DECODERS[tag] = loads
+
+register_codec('marshal', 'm', lambda data: marshal.dumps(data, 2), marshal.loads)
+register_codec('json', 'j', lambda data: json.dumps(data, separators=(',', ':')), json.loads)
+
+def encode(value, codec=None):
+    """
+    Serialize ``value``. :py:class:`ddbmock.database.item.Item` are serialized
+    with ``codec``, any other value (ie: table schema) with pickle.
+
+    :param value: value to serialize
+    :param codec: codec name. Defaults to :py:const:`ddbmock.config.STORAGE_ITEM_CODEC`
+
+    :return: byte string
+    """
+    codec = codec or config.STORAGE_ITEM_CODEC
+    if codec == 'pickle' or not isinstance(value, Item):
+        return pickle.dumps(value, 2)
+
+    tag, dumps, loads = CODECS[codec]
+    return tag + dumps(dict(value))
+
+def decode(data):
+    """
+    Deserialize ``data``, whatever the codec it was serialized with.
+
+    :param data: byte string from :py:func:`encode`
+
+    :return: original value
+    """
+    if data[0] == PICKLE_TAG:
+        return pickle.loads(data)
+    return Item(_DECODERS[data[0]](data[1:]))
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+from ddbmock import config
+from ddbmock.database.storage import memory
+from ddbmock.database.storage.codec import encode, decode
+from contextlib import contextmanager
+from threading import RLock, local
+import marshal, os, struct, urllib
+
+# Items live in memory, like the memory store. Each mutation is also appended
+# to a per table log file. When the log grows too big, a snapshot of the whole
+# table is written and the log is emptied. On startup, the snapshot then the
+# log are replayed.
+
+# record: payload length, then marshaled (operation, hash_key, range_key, data)
+HEADER = struct.Struct('>I')
+
+SET = 's'
+DELETE = 'd'
+
+
+def write_record(f, record):
+    """
+    Append ``record`` to file ``f``.
+
+    :return: number of bytes written
+    """
+    payload = marshal.dumps(record, 2)
+    f.write(HEADER.pack(len(payload)) + payload)
+    return HEADER.size + len(payload)
+
+
+def read_records(f):
+    """
+    Iterate over the records of file ``f``. An incomplete trailing record, as
+    left by a crash, is ignored.
+
+    :return: iterator over (offset of the end of the record, record)
+    """
+    while True:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return
+        size, = HEADER.unpack(header)
+        payload = f.read(size)
+        if len(payload) < size:
+            return
+        yield f.tell(), marshal.loads(payload)
+
+
+class Store(memory.Store):
+    def __init__(self, name, hash_key=None, range_key=None):
+        """
+        Initialize the log store and replay persisted data, if any. Files are
+        stored in :py:const:`ddbmock.config.STORAGE_LOG_DIR`.
+
+        :param name: Table name.
+        :param hash_key: (optional) ``hash_key`` definition. Not used
+        :param range_key: (optional) ``range_key`` definition. Not used
+        """
+        super(Store, self).__init__(name, hash_key, range_key)
+
+        self.lock = RLock()
+        self.local = local()
+
+        directory = config.STORAGE_LOG_DIR
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        path = os.path.join(directory, urllib.quote(name, safe=''))
+        self.snapshot_path = path + '.snapshot'
+        self.log_path = path + '.log'
+
+        self._replay(self.snapshot_path)
+        self.log_size = self._replay(self.log_path)
+
+        # drop any incomplete trailing record before appending new ones
+        if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > self.log_size:
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(self.log_size)
+
+        self.log = open(self.log_path, 'ab')
+
+    def _replay(self, path):
+        """
+        Apply records of file at ``path`` to the in-memory data.
+
+        :return: offset of the end of the last complete record
+        """
+        offset = 0
+        if not os.path.exists(path):
+            return offset
+
+        with open(path, 'rb') as f:
+            for offset, (operation, hash_key, range_key, data) in read_records(f):
+                if operation == SET:
+                    memory.Store.__setitem__(self, (hash_key, range_key), decode(data))
+                elif (hash_key in self.data and range_key in self.data[hash_key]):
+                    memory.Store.__delitem__(self, (hash_key, range_key))
+
+        return offset
+
+    def _append(self, record):
+        """
+        Journal ``record``, then compact if the log is too big. Caller must
+        hold :py:attr:`lock`.
+        """
+        self.log_size += write_record(self.log, record)
+
+        if not getattr(self.local, 'batch', 0):
+            self._flush()
+        if self.log_size >= config.STORAGE_LOG_COMPACT_SIZE:
+            self.compact()
+
+    def _flush(self):
+        self.log.flush()
+        if config.STORAGE_LOG_SYNC:
+            os.fsync(self.log.fileno())
+
+    def compact(self):
+        """
+        Write a snapshot of the whole table, then empty the log. The snapshot
+        replaces the previous one atomically so that a crash at any point
+        leaves a consistent state on disk.
+        """
+        with self.lock:
+            tmp_path = self.snapshot_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                for hash_key, bucket in self.data.iteritems():
+                    for range_key, item in bucket.iteritems():
+                        write_record(f, (SET, hash_key, range_key, encode(item)))
+                f.flush()
+                os.fsync(f.fileno())
+            os.rename(tmp_path, self.snapshot_path)
+
+            # replaying the log over the new snapshot would be harmless
+            self.log.close()
+            self.log = open(self.log_path, 'wb')
+            self.log_size = 0
+
+    @contextmanager
+    def batch(self):
+        """
+        Group all writes of the current thread in the block. The log is only
+        flushed when the block exits, even on error.
+        """
+        depth = getattr(self.local, 'batch', 0)
+        self.local.batch = depth + 1
+        try:
+            yield
+        finally:
+            self.local.batch = depth
+            if not depth:
+                with self.lock:
+                    self._flush()
+
+    def truncate(self):
+        """Perform a full table cleanup. Might be a good idea in tests :)"""
+        with self.lock:
+            super(Store, self).truncate()
+            self.compact()
+
+    def __setitem__(self, (hash_key, range_key), item):
+        """
+        Set the item at (``hash_key``, ``range_key``) and journal it. Both
+        keys must be defined and valid. By convention, ``range_key`` may be
+        ``False`` to indicate a ``hash_key`` only key.
+
+        :param key: (``hash_key``, ``range_key``) Tuple.
+        :param item: the actual ``Item`` data structure to store
+        """
+        data = encode(item)
+        with self.lock:
+            super(Store, self).__setitem__((hash_key, range_key), item)
+            self._append((SET, hash_key, range_key, data))
+
+    def __delitem__(self, (hash_key, range_key)):
+        """
+        Delete item at key (``hash_key``, ``range_key``) and journal it.
+
+        :raises: KeyError if not found
+        """
+        with self.lock:
+            super(Store, self).__delitem__((hash_key, range_key))
+            self._append((DELETE, hash_key, range_key, None))
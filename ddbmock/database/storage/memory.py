@@ -1,20 +1,310 @@
 # -*- coding: utf-8 -*-
 
-from collections import defaultdict
+from ddbmock.database.key import hash_token, segment_tokens
+from ddbmock.database.storage.codec import decode
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from threading import Lock
+from itertools import islice
+from bisect import bisect_left, bisect_right
+
+
+class LazyItem(object):
+    """
+    Placeholder for a serialized item, only deserialized on first read. This
+    allows to load huge datasets from a memory mapped snapshot in no time.
+    See :py:mod:`ddbmock.database.snapshot`.
+    """
+    __slots__ = ('data', 'start', 'end', 'item')
+
+    def __init__(self, data, start, end):
+        """
+        :param data: buffer holding the serialized item, typically a ``mmap``
+        :param start: offset of the serialized item in ``data``
+        :param end: offset of the end of the serialized item in ``data``
+        """
+        self.data = data
+        self.start = start
+        self.end = end
+        self.item = None
+
+    def load(self):
+        """
+        Deserialize the item on first call. Later calls return the same item.
+
+        :return: deserialized :py:class:`ddbmock.database.item.Item`
+        """
+        if self.item is None:
+            self.item = decode(self.data[self.start:self.end])
+        return self.item
+
+
+class SortedKeys(object):
+    """
+    Sorted set of keys. Keys are stored in a list of sorted chunks of at most
+    ``2 * CHUNK_SIZE`` keys so that inserting or removing a key costs
+    O(log(n) + CHUNK_SIZE) instead of O(n) with a single sorted list. Random
+    order loads no longer take quadratic time.
+
+    Writes and readers may run in different threads: writes hold
+    :py:attr:`lock` and readers only hold it to copy the chunk they read.
+    """
+    __slots__ = ('chunks', 'maxes', 'length', 'version', 'lock')
+
+    CHUNK_SIZE = 512
+
+    def __init__(self, keys=()):
+        """
+        :param keys: initial keys, in any order
+        """
+        keys = sorted(keys)
+        size = self.CHUNK_SIZE
+        self.chunks = [keys[i:i+size] for i in xrange(0, len(keys), size)]
+        # last key of each chunk
+        self.maxes = [chunk[-1] for chunk in self.chunks]
+        self.length = len(keys)
+        # bumped on each insertion/removal so that iterators can detect it
+        self.version = 0
+        self.lock = Lock()
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return self.irange()
+
+    def add(self, key):
+        """
+        Insert ``key`` if not already present.
+        """
+        with self.lock:
+            chunks, maxes = self.chunks, self.maxes
+            if not chunks:
+                chunks.append([key])
+                maxes.append(key)
+            else:
+                i = bisect_left(maxes, key)
+                if i == len(maxes):
+                    i -= 1
+                chunk = chunks[i]
+                j = bisect_left(chunk, key)
+                if j < len(chunk) and chunk[j] == key:
+                    return
+                chunk.insert(j, key)
+                maxes[i] = chunk[-1]
+                if len(chunk) > 2 * self.CHUNK_SIZE:
+                    half = len(chunk) // 2
+                    chunks[i:i+1] = [chunk[:half], chunk[half:]]
+                    maxes[i:i+1] = [chunk[half-1], chunk[-1]]
+            self.length += 1
+            self.version += 1
+
+    def discard(self, key):
+        """
+        Remove ``key`` if present.
+        """
+        with self.lock:
+            chunks, maxes = self.chunks, self.maxes
+            i = bisect_left(maxes, key)
+            if i == len(maxes):
+                return
+            chunk = chunks[i]
+            j = bisect_left(chunk, key)
+            if chunk[j] != key:
+                return
+            del chunk[j]
+            if chunk:
+                maxes[i] = chunk[-1]
+            else:
+                del chunks[i]
+                del maxes[i]
+            self.length -= 1
+            self.version += 1
+
+    def _seek(self, low, high, last, reverse):
+        """
+        Get the position of the first key to read in iteration order. Caller
+        must hold :py:attr:`lock`.
+
+        :param low: inclusive lower bound or ``None``
+        :param high: exclusive upper bound or ``None``
+        :param last: last key read. Takes precedence over bounds if not ``None``
+        :param reverse: Set to ``True`` to seek backward
+
+        :return: (chunk index, index in chunk). Chunk index is out of range when there is nothing to read
+        """
+        chunks, maxes = self.chunks, self.maxes
+        if reverse:
+            bound = last if last is not None else high
+            if bound is None:
+                i = len(chunks) - 1
+                return i, len(chunks[i]) - 1 if i >= 0 else 0
+            i = bisect_left(maxes, bound)
+            if i == len(chunks):
+                i -= 1
+                return i, len(chunks[i]) - 1 if i >= 0 else 0
+            j = bisect_left(chunks[i], bound) - 1
+            if j < 0:
+                i -= 1
+                j = len(chunks[i]) - 1 if i >= 0 else 0
+            return i, j
+        if last is not None:
+            i = bisect_right(maxes, last)
+            return i, bisect_right(chunks[i], last) if i < len(chunks) else 0
+        if low is not None:
+            i = bisect_left(maxes, low)
+            return i, bisect_left(chunks[i], low) if i < len(chunks) else 0
+        return 0, 0
+
+    def irange(self, low=None, high=None, reverse=False, last=None):
+        """
+        Iterate over the keys in [``low``, ``high``[ in order. Each chunk is
+        copied before it is read so that concurrent insertions/removals can
+        not move keys under the reader. They are detected thanks to
+        :py:attr:`version`. When it happens, position is recomputed from the
+        last key read.
+
+        :param low: inclusive lower bound or ``None``
+        :param high: exclusive upper bound or ``None``
+        :param reverse: Set to ``True`` to iterate backward
+        :param last: if not ``None``, start right after this key
+        """
+        while True:
+            with self.lock:
+                version = self.version
+                i, j = self._seek(low, high, last, reverse)
+                if not 0 <= i < len(self.chunks):
+                    return
+                if reverse:
+                    keys = self.chunks[i][j::-1]
+                else:
+                    keys = self.chunks[i][j:]
+
+            for key in keys:
+                if reverse:
+                    if low is not None and key < low:
+                        return
+                elif high is not None and key >= high:
+                    return
+                last = key
+                yield key
+                if version != self.version:
+                    break
+
+
+class Bucket(dict):
+    """
+    All items sharing the same ``hash_key``, indexed by ``range_key``. On top
+    of regular dict behavior, the ``range_key`` are kept sorted in
+    :py:attr:`sorted_keys` so that ordered reads do not need to sort the whole
+    bucket on each call.
+
+    Buckets of a single item, like all the buckets of ``hash_key`` only
+    tables, need no ordering. :py:attr:`sorted_keys` is only built when a
+    second item is inserted, which keeps the creation of a bucket as cheap as
+    that of a dict.
+    """
+    # SortedKeys of the range_key, None until the bucket holds 2 items
+    sorted_keys = None
+
+    def __getitem__(self, range_key):
+        item = dict.__getitem__(self, range_key)
+        if type(item) is LazyItem:
+            return item.load()
+        return item
+
+    def __setitem__(self, range_key, item):
+        if range_key not in self:
+            if self.sorted_keys is not None:
+                self.sorted_keys.add(range_key)
+            elif self:
+                self.sorted_keys = SortedKeys(self.keys() + [range_key])
+        dict.__setitem__(self, range_key, item)
+
+    def __delitem__(self, range_key):
+        dict.__delitem__(self, range_key)
+        if self.sorted_keys is not None:
+            self.sorted_keys.discard(range_key)
+
+    def iter_range(self, low, high, reverse, last=None):
+        """
+        Iterate over the items whose ``range_key`` is in [``low``, ``high``[
+        in ``range_key`` order. Concurrent insertions/removals are supported,
+        see :py:meth:`SortedKeys.irange`.
+
+        :param low: inclusive lower bound or ``None``
+        :param high: exclusive upper bound or ``None``
+        :param reverse: Set to ``True`` to iterate backward
+        :param last: if not ``None``, start right after this key
+        """
+        keys = self.sorted_keys
+        if keys is None:
+            # at most one item. Might change in the mean time: take a snapshot
+            keys = SortedKeys(self.keys())
+        for range_key in keys.irange(low, high, reverse, last):
+            try:
+                yield self[range_key]
+            except KeyError:
+                # removed in the mean time
+                continue
+
 
 class Store(object):
-    def __init__(self, name):
+    def __init__(self, name, hash_key=None, range_key=None):
         """
         Initialize the in-memory store
 
         :param name: Table name.
+        :param hash_key: (optional) ``hash_key`` definition. Not used
+        :param range_key: (optional) ``range_key`` definition. Not used
         """
         self.name = name
-        self.data = defaultdict(dict)
+        self.data = defaultdict(Bucket)
+        # sorted (token, hash_key) of all buckets. This is the Scan order
+        self.hash_keys = SortedKeys()
+        # hash_key of the buckets created since the last Scan, see _merge_hash_keys
+        self.new_hash_keys = deque()
+        self.hash_keys_lock = Lock()
+
+    @contextmanager
+    def batch(self):
+        """
+        Group all writes of the current thread in the block. Writes are
+        immediate in memory, this is only for API compatibility.
+        """
+        yield
 
     def truncate(self):
         """Perform a full table cleanup. Might be a good idea in tests :)"""
-        self.data = defaultdict(dict)
+        self.data = defaultdict(Bucket)
+        self.hash_keys = SortedKeys()
+        self.new_hash_keys = deque()
+
+    def _merge_hash_keys(self):
+        """
+        Lay the buckets created since the last call out in :py:attr:`hash_keys`.
+        Scan order is only needed by Scan: writes only queue their new
+        ``hash_key`` so that loading a table does not pay for it. Big batches,
+        like a load, are merged with a single sort.
+        """
+        new_hash_keys = self.new_hash_keys
+        if not new_hash_keys:
+            return
+
+        with self.hash_keys_lock:
+            keys = []
+            while new_hash_keys:
+                hash_key = new_hash_keys.popleft()
+                # might have been dropped in the mean time
+                if hash_key in self.data:
+                    keys.append((hash_token(hash_key), hash_key))
+
+            if len(keys) > len(self.hash_keys):
+                # running Scans keep going on the previous layout
+                self.hash_keys = SortedKeys(set(keys).union(self.hash_keys))
+            else:
+                for key in keys:
+                    self.hash_keys.add(key)
 
     def __getitem__(self, (hash_key, range_key)):
         """
@@ -45,17 +335,30 @@ class Store(object):
         :param item: the actual ``Item`` data structure to store
         """
 
-        self.data[hash_key][range_key] = item
+        bucket = self.data.get(hash_key)
+        if bucket is None:
+            # the bucket must exist before Scan can see its hash_key
+            bucket = self.data[hash_key] = Bucket()
+            self.new_hash_keys.append(hash_key)
+        bucket[range_key] = item
 
     def __delitem__(self, (hash_key, range_key)):
         """
-        Delete item at key (``hash_key``, ``range_key``)
+        Delete item at key (``hash_key``, ``range_key``). Empty buckets are
+        dropped.
 
         :raises: KeyError if not found
         """
 
         # Let this line throw KeyError if needed. Checks needs to be performed by the caller
-        del self.data[hash_key][range_key]
+        bucket = self.data[hash_key]
+        del bucket[range_key]
+        if not bucket:
+            # Scan skips tokens without bucket. Running Scans read a copy of
+            # the chunk, the lock only keeps _merge_hash_keys from losing it
+            with self.hash_keys_lock:
+                del self.data[hash_key]
+                self.hash_keys.discard((hash_token(hash_key), hash_key))
 
     def __iter__(self):
         """
@@ -64,5 +367,69 @@ class Store(object):
         """
 
         for outer in self.data.values():
-            for item in outer.values():
+            for range_key in outer.keys():
+                try:
+                    yield outer[range_key]
+                except KeyError:
+                    # removed in the mean time
+                    continue
+
+    def range_query(self, hash_key, low=None, high=None, reverse=False, limit=None):
+        """
+        Iterate over the items at ``hash_key`` whose ``range_key`` is in
+        [``low``, ``high``[, in ``range_key`` order. Starting point is found by
+        dichotomy so that reading a page costs O(log(n) + page_size). Mostly
+        used for ``Query`` implementation.
+
+        :param hash_key: ``hash_key`` of the items to iterate over
+        :param low: inclusive lower ``range_key`` bound or ``None``
+        :param high: exclusive upper ``range_key`` bound or ``None``
+        :param reverse: Set to ``True`` to iterate backward
+        :param limit: maximum number of items to read or ``None``
+
+        :return: iterator over the items. Empty if ``hash_key`` is not found.
+        """
+        # do not let defaultdict create a bucket on lookup
+        if hash_key not in self.data:
+            return iter([])
+        return islice(self.data[hash_key].iter_range(low, high, reverse), limit)
+
+    def scan(self, hash_key=None, range_key=None, segment=0, total_segments=1):
+        """
+        Iterate all over the table in a stable order, starting right after
+        (``hash_key``, ``range_key``). ``hash_key`` are laid out by
+        :py:func:`ddbmock.database.key.hash_token` and ``range_key`` are
+        sorted. Resuming costs O(log(n)) no matter how far the previous page
+        went. Mostly used for ``Scan`` implementation.
+
+        When the table is split in segments, only the ``hash_key`` of
+        ``segment`` are read. As segments are contiguous in the layout, this
+        does not require to go through the other segments.
+
+        :param hash_key: ``hash_key`` of the last item read or ``None`` to start from the beginning
+        :param range_key: ``range_key`` of the last item read
+        :param segment: segment to read, see :py:func:`ddbmock.database.key.hash_segment`
+        :param total_segments: number of segments the table is split into
+
+        :return: iterator over the items
+        """
+        self._merge_hash_keys()
+        low, high = segment_tokens(segment, total_segments)
+        last = None
+
+        if hash_key is not None:
+            last = (hash_token(hash_key), hash_key)
+            if low <= last[0] < high and hash_key in self.data:
+                for item in self.data[hash_key].iter_range(None, None, False, range_key):
+                    yield item
+
+        if last is not None and last[0] < low:
+            last = None
+
+        # buckets may be inserted or dropped in the mean time, see SortedKeys.irange
+        for token, hash_key in self.hash_keys.irange((low, ), (high, ), False, last):
+            bucket = self.data.get(hash_key)  # might have been dropped
+            if bucket is None:
+                continue
+            for item in bucket.iter_range(None, None, False):
                 yield item
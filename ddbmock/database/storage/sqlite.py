@@ -1,68 +1,232 @@
 # -*- coding: utf-8 -*-
 
 from ddbmock import config
-from multiprocessing import Lock
-import sqlite3
-import cPickle as pickle
+from ddbmock.database.key import hash_token, segment_tokens, next_key, encode_key
+from ddbmock.database.storage.codec import encode, decode
+from multiprocessing import RLock
+from contextlib import contextmanager
+import os, sqlite3, threading
+
+
+def connect(path):
+    """
+    Open a new connection to the sqlite database at ``path``. Journal is
+    switched to WAL mode so that readers do not block the writer nor each other.
+    See :py:const:`ddbmock.config.STORAGE_SQLITE_GROUP_COMMIT` to trade
+    durability for write speed.
+
+    :param path: sqlite database location, ``:memory:`` for an in-memory database
+
+    :return: ``sqlite3.Connection`` instance
+    """
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+
+    # In WAL mode, commits are only synced on checkpoints: many commits, of
+    # concurrent writers or not, share a single fsync
+    if config.STORAGE_SQLITE_GROUP_COMMIT:
+        conn.execute('PRAGMA synchronous=NORMAL')
+
+    # fills the `token` column of tables created by a previous version
+    conn.create_function('hash_token', 1, lambda key: hash_token(_unblob(key)))
+    return conn
+
+
+class ConnectionPool(object):
+    """
+    Hand out one connection per thread, so that concurrent requests only
+    wait for each other when sqlite itself requires it.
+
+    In-memory databases can not be shared between connections. In this case,
+    all threads share a single connection and statements are serialized.
+    """
+    def __init__(self, path):
+        """
+        :param path: sqlite database location, ``:memory:`` for an in-memory database
+        """
+        self.path = path
+        self.local = threading.local()
+        self.lock = RLock()
+        self.shared = connect(path) if path == ':memory:' else None
+
+    @contextmanager
+    def connection(self):
+        """
+        Get the connection of the current thread. Connections are not reused
+        accross ``fork``.
+
+        :return: context manager over a ``sqlite3.Connection``
+        """
+        if self.shared is not None:
+            with self.lock:
+                yield self.shared
+            return
+
+        pid = os.getpid()
+        if getattr(self.local, 'pid', None) != pid:
+            self.local.conn = connect(self.path)
+            self.local.pid = pid
+        yield self.local.conn
+
+    @contextmanager
+    def batch(self):
+        """
+        Get the connection of the current thread and defer all commits to the
+        end of the block. Nested blocks are committed with the outermost one.
+        When the connection is shared, other threads wait for the whole block.
+
+        :return: context manager over a ``sqlite3.Connection``
+        """
+        with self.connection() as conn:
+            depth = getattr(self.local, 'batch', 0)
+            self.local.batch = depth + 1
+            try:
+                yield conn
+            finally:
+                self.local.batch = depth
+                if not depth:
+                    conn.commit()
+
+    def commit(self, conn):
+        """
+        Commit ``conn`` unless a :py:meth:`batch` is in progress in the current
+        thread.
+
+        :param conn: connection of the current thread
+        """
+        if not getattr(self.local, 'batch', 0):
+            conn.commit()
+
 
 # I know, using global "variable" for this kind of state *is* bad. But it helps
 # keeping execution times to a sane value. In particular, this allows to use
 # in-memory version of sqlite
-conn = sqlite3.connect(config.STORAGE_SQLITE_FILE, check_same_thread=False)
-conn_lock = Lock()
+pool = ConnectionPool(config.STORAGE_SQLITE_FILE)
+
+
+def _blob(key):
+    """
+    Keys are encoded as byte strings. Make sure they are bound as ``BLOB`` so
+    that sqlite compares them byte-wise. Other values (ie: ``False`` range_key)
+    are left untouched.
+    """
+    if isinstance(key, str):
+        return buffer(key)
+    return key
+
+
+def _unblob(key):
+    """Reverse operation of :py:func:`_blob`"""
+    if isinstance(key, buffer):
+        return str(key)
+    return key
 
 
 class Store(object):
 
-    def __init__(self, name):
+    def __init__(self, name, hash_key=None, range_key=None):
         """
         Initialize the sqlite store
 
         By contract, we know the table name will only contain alphanum chars,
         '_', '.' or '-' so that this is ~ safe
 
+        Rows hold the :py:func:`ddbmock.database.key.hash_token` of their
+        ``hash_key`` in an indexed `token` column. This is the Scan order, each
+        Scan segment being a range of this index.
+
+        Tables of a previous version have no `token` column and store raw key
+        values instead of their encoding. When the table keys are provided,
+        they are migrated on open.
+
         :param name: Table name.
+        :param hash_key: (optional) :py:class:`ddbmock.database.key.Key` of the table ``hash_key``, to migrate keys
+        :param range_key: (optional) :py:class:`ddbmock.database.key.Key` of the table ``range_key``, to migrate keys
         """
-        with conn_lock:
+        with pool.connection() as conn:
             conn.execute('''CREATE TABLE IF NOT EXISTS `{}` (
             `hash_key` blob NOT NULL,
             `range_key` blob NOT NULL,
             `data` blob NOT NULL,
+            `token` integer NOT NULL,
             PRIMARY KEY (`hash_key`,`range_key`)
             );'''.format(name))
-            conn.commit()
+
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(`{}`)'.format(name))]
+            if 'token' not in columns:
+                # table created by a previous version
+                conn.execute('ALTER TABLE `{}` ADD COLUMN `token` integer NOT NULL DEFAULT 0'.format(name))
+                if hash_key is not None:
+                    self._encode_keys(conn, name, hash_key, range_key)
+                conn.execute('UPDATE `{}` SET `token`=hash_token(`hash_key`)'.format(name))
+
+            conn.execute('''CREATE INDEX IF NOT EXISTS `{0}~token`
+                         ON `{0}` (`token`, `hash_key`, `range_key`)'''.format(name))
+            pool.commit(conn)
 
         self.name = name
 
+    @staticmethod
+    def _encode_keys(conn, name, hash_key, range_key):
+        """
+        Replace the raw key values of a table created by a previous version
+        with their encoding, see :py:meth:`ddbmock.database.key.Key.encode`.
+        Equal numbers written differently (``1``, ``1.0``) now are the same
+        key: only one of the items is kept.
+
+        :param conn: connection, in a transaction
+        :param name: Table name
+        :param hash_key: :py:class:`ddbmock.database.key.Key` of the table ``hash_key``
+        :param range_key: :py:class:`ddbmock.database.key.Key` of the table ``range_key`` or ``None``
+        """
+        rows = conn.execute('SELECT `rowid`, `hash_key`, `range_key` FROM `{}`'.format(name)).fetchall()
+        updates = []
+        for rowid, hash_value, range_value in rows:
+            hash_value = _blob(encode_key(hash_key.typename, hash_value))
+            if range_key is not None:
+                range_value = _blob(encode_key(range_key.typename, range_value))
+            updates.append((hash_value, range_value, rowid))
+
+        conn.executemany('''UPDATE OR REPLACE `{}` SET `hash_key`=?, `range_key`=?
+                         WHERE `rowid`=?'''.format(name), updates)
+
+    def batch(self):
+        """
+        Group all writes of the current thread in the block in a single
+        transaction, committed when the block exits, even on error.
+
+        :return: context manager
+        """
+        return pool.batch()
+
     def truncate(self):
         """
         Perform a full table cleanup. Might be a good idea in tests :)
         """
-        with conn_lock:
+        with pool.connection() as conn:
             conn.execute('DELETE FROM `{}`'.format(self.name))
-            conn.commit()
+            pool.commit(conn)
 
     def _get_by_hash_range(self, hash_key, range_key):
-        with conn_lock:
+        with pool.connection() as conn:
             request = conn.execute('''SELECT `data` FROM `{}`
                                 WHERE `hash_key`=? AND `range_key`=?'''
                                 .format(self.name),
-                                (hash_key, range_key))
+                                (_blob(hash_key), _blob(range_key)))
             item = request.fetchone()
 
         if item is None:
             raise KeyError("No item found at ({}, {})".format(hash_key,
                                                               range_key))
 
-        return pickle.loads(str(item[0]))
+        return decode(str(item[0]))
 
     def _get_by_hash(self, hash_key):
-        with conn_lock:
-            items = conn.execute('''SELECT * FROM `{}`
-                                 WHERE `hash_key`=? '''.format(self.name),
-                                 (hash_key, ))
+        # read all the rows while holding the connection
+        items = self._fetch('''SELECT `range_key`, `data` FROM `{}`
+                            WHERE `hash_key`=? ''', (_blob(hash_key), ))
 
-        ret = {item[1]: pickle.loads(str(item[2])) for item in items}
+        ret = {_unblob(item[0]): decode(str(item[1])) for item in items}
 
         if not ret:
             raise KeyError("No item found at hash_key={}".format(hash_key))
@@ -94,14 +258,14 @@ class Store(object):
         :param key: (``hash_key``, ``range_key``) Tuple.
         :param item: the actual ``Item`` data structure to store
         """
-        db_item = buffer(pickle.dumps(item, 2))
+        db_item = buffer(encode(item))
 
-        with conn_lock:
+        with pool.connection() as conn:
             conn.execute('''INSERT OR REPLACE INTO `{}`
-                         (`hash_key`,`range_key`, `data`)
-                         VALUES (?, ?, ?)'''.format(self.name),
-                         (hash_key, range_key, db_item))
-            conn.commit()
+                         (`hash_key`,`range_key`, `data`, `token`)
+                         VALUES (?, ?, ?, ?)'''.format(self.name),
+                         (_blob(hash_key), _blob(range_key), db_item, hash_token(hash_key)))
+            pool.commit(conn)
 
     def __delitem__(self, (hash_key, range_key)):
         """
@@ -109,19 +273,143 @@ class Store(object):
 
         :raises: KeyError if not found
         """
-        with conn_lock:
+        with pool.connection() as conn:
             conn.execute('DELETE FROM `{}` WHERE `hash_key`=? AND '
                          '`range_key`=?'
-                         .format(self.name), (hash_key, range_key))
+                         .format(self.name), (_blob(hash_key), _blob(range_key)))
+            pool.commit(conn)
+
+    def _fetch(self, query, params):
+        """
+        Run ``query`` and read all the rows at once so that no cursor is left
+        open. Callers bound the result size with a ``LIMIT``.
+        """
+        with pool.connection() as conn:
+            return conn.execute(query.format(self.name), params).fetchall()
 
     def __iter__(self):
         """
         Iterate all over the table, abstracting the ``hash_key`` and
-        ``range_key`` complexity. Mostly used for ``Scan`` implementation.
+        ``range_key`` complexity. Rows are read by batches of
+        :py:const:`ddbmock.config.STORAGE_SQLITE_BATCH_SIZE`.
         """
-        with conn_lock:
-            items = conn.execute('SELECT `data` FROM `{}`'.format(self.name))
+        batch_size = config.STORAGE_SQLITE_BATCH_SIZE
+        last = 0
+
+        while True:
+            rows = self._fetch('SELECT `rowid`, `data` FROM `{}` WHERE `rowid`>? '
+                               'ORDER BY `rowid` LIMIT ?', (last, batch_size))
+
+            for row in rows:
+                yield decode(str(row[1]))
+
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][0]
+
+    def range_query(self, hash_key, low=None, high=None, reverse=False, limit=None):
+        """
+        Iterate over the items at ``hash_key`` whose ``range_key`` is in
+        [``low``, ``high``[, in ``range_key`` order. Ordering, bounds and limit
+        are delegated to the primary key index so that only the rows to return
+        are read and deserialized. Mostly used for ``Query`` implementation.
+
+        Rows are read by batches of :py:const:`ddbmock.config.STORAGE_SQLITE_BATCH_SIZE`,
+        each batch resuming after the last ``range_key`` read.
+
+        :param hash_key: ``hash_key`` of the items to iterate over
+        :param low: inclusive lower ``range_key`` bound or ``None``
+        :param high: exclusive upper ``range_key`` bound or ``None``
+        :param reverse: Set to ``True`` to iterate backward
+        :param limit: maximum number of items to read or ``None``
+
+        :return: iterator over the items. Empty if ``hash_key`` is not found.
+        """
+        batch_size = config.STORAGE_SQLITE_BATCH_SIZE
+
+        while True:
+            query = 'SELECT `range_key`, `data` FROM `{}` WHERE `hash_key`=?'
+            params = [_blob(hash_key)]
+
+            if low is not None:
+                query += ' AND `range_key` >= ?'
+                params.append(_blob(low))
+            if high is not None:
+                query += ' AND `range_key` < ?'
+                params.append(_blob(high))
+
+            query += ' ORDER BY `range_key` {} LIMIT ?'.format('DESC' if reverse else 'ASC')
+            size = batch_size if limit is None else min(batch_size, limit)
+            params.append(size)
+
+            rows = self._fetch(query, params)
+
+            for row in rows:
+                yield decode(str(row[1]))
+
+            if len(rows) < size:
+                return
+            if limit is not None:
+                limit -= size
+                if not limit:
+                    return
+
+            # resume right after the last range_key read
+            if reverse:
+                high = _unblob(rows[-1][0])
+            else:
+                low = next_key(_unblob(rows[-1][0]))
+
+    def scan(self, hash_key=None, range_key=None, segment=0, total_segments=1):
+        """
+        Iterate all over the table in a stable order, starting right after
+        (``hash_key``, ``range_key``). Like in the memory store, ``hash_key``
+        are laid out by :py:func:`ddbmock.database.key.hash_token` and
+        ``range_key`` are sorted. Starting point is found thanks to the
+        `token` index. Mostly used for ``Scan`` implementation.
+
+        Rows are read by batches of :py:const:`ddbmock.config.STORAGE_SQLITE_BATCH_SIZE`,
+        each batch resuming after the last key read. Hence, memory usage does
+        not depend on the table size and concurrent writes are safe.
+
+        When the table is split in segments, only the index range of
+        ``segment`` is read.
+
+        :param hash_key: ``hash_key`` of the last item read or ``None`` to start from the beginning
+        :param range_key: ``range_key`` of the last item read
+        :param segment: segment to read, see :py:func:`ddbmock.database.key.hash_segment`
+        :param total_segments: number of segments the table is split into
+
+        :return: iterator over the items
+        """
+        batch_size = config.STORAGE_SQLITE_BATCH_SIZE
+        select = ('SELECT `token`, `hash_key`, `range_key`, `data` FROM `{{}}` WHERE {} AND `token`<? '
+                  'ORDER BY `token`, `hash_key`, `range_key` LIMIT ?')
+        low, high = segment_tokens(segment, total_segments)
+
+        if hash_key is not None:
+            token = hash_token(hash_key)
+            if token < low:
+                hash_key = None
+
+        while True:
+            if hash_key is None:
+                rows = self._fetch(select.format('`token`>=?'), [low, high, batch_size])
+            else:
+                # end of the current hash_key, then the following ones
+                rows = []
+                for where, params in [
+                    ('`token`=? AND `hash_key`=? AND `range_key`>?', [token, _blob(hash_key), _blob(range_key)]),
+                    ('`token`=? AND `hash_key`>?', [token, _blob(hash_key)]),
+                    ('`token`>?', [token]),
+                ]:
+                    rows += self._fetch(select.format(where), params + [high, batch_size - len(rows)])
+                    if len(rows) == batch_size:
+                        break
 
-        for item in items:
-            yield pickle.loads(str(item[0]))
+            for row in rows:
+                yield decode(str(row[3]))
 
+            if len(rows) < batch_size:
+                return
+            token, hash_key, range_key = rows[-1][0], _unblob(rows[-1][1]), _unblob(rows[-1][2])
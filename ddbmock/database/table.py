@@ -1,27 +1,31 @@
 # -*- coding: utf-8 -*-
 
-from .key import Key, PrimaryKey
+from .key import Key, PrimaryKey, next_key
 from .item import Item, ItemSize
-from .storage import Store
+from .lock import StripedLock
+from .storage import create_store, get_engine
+from .storage.cache import CachedStore
 from collections import defaultdict, namedtuple
+from contextlib import contextmanager
 from threading import Lock
 from ddbmock import config
 from ddbmock.errors import ValidationException, LimitExceededException, ResourceInUseException
 from ddbmock.utils import schedule_action
-import time, copy, datetime
+import time, datetime
 
 # All validations are performed on *incomming* data => already done :)
 
 # items: array
 # size: ItemSize
-Results = namedtuple('Results', ['items', 'size', 'last_key', 'scanned'])
+# count: number of matching items, even when not collected in items
+Results = namedtuple('Results', ['items', 'size', 'last_key', 'scanned', 'count'])
 
 class Table(object):
     """
     Table abstraction. Actual :py:class:`ddbmock.database.item.Item` are stored
     in :py:attr:`store`.
     """
-    def __init__(self, name, rt, wt, hash_key, range_key, status='CREATING'):
+    def __init__(self, name, rt, wt, hash_key, range_key, status='CREATING', engine=None):
         """
         Create a new ``Table``. When manually creating a table, make sure you
         registered it in :py:class:`ddbmock.database.db.DynamoDB` with a something
@@ -37,6 +41,7 @@ class Table(object):
         :param hash_key: :py:class:`ddbmock.database.key.Key` instance describe the ``hash_key``
         :param hash_key: :py:class:`ddbmock.database.key.Key` instance describe the ``range_key`` or ``None`` if table has no ``range_key``
         :param status: (optional) Valid initial table status. If Table needd to be avaible immediately, use ``ACTIVE``, otherwise, leave default value.
+        :param engine: (optional) Storage engine name. Defaults to :py:func:`ddbmock.database.storage.get_engine`
 
         .. note:: ``rt`` and ``wt`` are only used by ``DescribeTable`` and ``UpdateTable``. No throttling is nor will ever be done.
         """
@@ -46,14 +51,26 @@ class Table(object):
         self.hash_key = hash_key
         self.range_key = range_key
         self.status = status
+        self.engine = engine or get_engine(name)
 
-        self.store = Store(name)
-        self.write_lock = Lock()
+        self.store = create_store(name, self.engine, hash_key, range_key)
+        if config.STORAGE_CACHE_SIZE:
+            self.store = CachedStore(self.store, config.STORAGE_CACHE_SIZE)
+        self.write_lock = StripedLock(config.WRITE_LOCK_STRIPES)
+        self.stats_lock = Lock()
 
         self.creation_time = time.time()
         self.last_increase_time = 0
         self.last_decrease_time = 0
-        self.count = 0
+
+        # running item count and size. Persistent stores may already hold
+        # items: they are only counted when first needed, see _load_stats
+        self.count = None
+        self.size = None
+
+        # (count, size) as reported by DescribeTable
+        self.stats = (0, 0)
+        self.stats_time = 0
 
         schedule_action(config.DELAY_CREATING, self.activate)
 
@@ -62,7 +79,21 @@ class Table(object):
         Remove all Items from this table. This is like a reset. Might be very
         usefull in unit and functional tests.
         """
-        self.store.truncate()
+        with self.write_lock:
+            self.store.truncate()
+            self.count = 0
+            self.size = 0
+
+    @contextmanager
+    def batch(self):
+        """
+        Group all writes of the block in a single store transaction. This
+        blocks all other write operations on the table until the block exits.
+        Mostly used by ``BatchWriteItem``.
+        """
+        with self.write_lock:
+            with self.store.batch():
+                yield
 
     def delete(self):
         """
@@ -142,12 +173,13 @@ class Table(object):
         Delete item at ``key`` from the databse provided that it matches ``expected``
         values.
 
-        This operation is atomic and blocks all other pending write operations.
+        This operation is atomic and blocks all other pending write operations
+        on the same ``hash_key``.
 
         :param key: Raw DynamoDB request hash and range key dict.
         :param expected: Raw DynamoDB request conditions.
 
-        :return: deepcopy of :py:class:`ddbmock.database.item.Item` as it was before deletion.
+        :return: :py:class:`ddbmock.database.item.Item` as it was before deletion.
 
         :raises: :py:exc:`ddbmock.errors.ConditionalCheckFailedException` if conditions are not met.
         """
@@ -155,29 +187,30 @@ class Table(object):
         hash_key = key.read_key(self.hash_key, u'HashKeyElement')
         range_key = key.read_key(self.range_key, u'RangeKeyElement')
 
-        with self.write_lock:
+        with self.write_lock[hash_key]:
             try:
-                old = copy.deepcopy(self.store[hash_key, range_key])
+                old = self.store[hash_key, range_key]
             except KeyError:
                 return Item()
 
             old.assert_match_expected(expected)
             del self.store[hash_key, range_key]
+            self._update_stats(old, None)
 
-        self.count -= 1
         return old
 
     def update_item(self, key, actions, expected):
         """
         Apply ``actions`` to item at ``key`` provided that it matches ``expected``.
 
-        This operation is atomic and blocks all other pending write operations.
+        This operation is atomic and blocks all other pending write operations
+        on the same ``hash_key``.
 
         :param key: Raw DynamoDB request hash and range key dict.
         :param actions: Raw DynamoDB request actions.
         :param expected: Raw DynamoDB request conditions.
 
-        :return: both deepcopies of :py:class:`ddbmock.database.item.Item` as it was (before, after) the update.
+        :return: both versions of :py:class:`ddbmock.database.item.Item` as it was (before, after) the update. ``old`` is left untouched.
 
         :raises: :py:exc:`ddbmock.errors.ConditionalCheckFailedException` if conditions are not met.
         :raises: :py:exc:`ddbmock.errors.ValidationException` if ``actions`` attempted to modify the key or the resulting Item is biggere than :py:const:`config.MAX_ITEM_SIZE`
@@ -186,17 +219,16 @@ class Table(object):
         hash_key = key.read_key(self.hash_key, u'HashKeyElement', max_size=config.MAX_HK_SIZE)
         range_key = key.read_key(self.range_key, u'RangeKeyElement', max_size=config.MAX_RK_SIZE)
 
-        with self.write_lock:
-            # Need a deep copy as we will *modify* it
+        with self.write_lock[hash_key]:
+            # Items are copy on write: a shallow copy is enough to *modify* it
             try:
                 old = self.store[hash_key, range_key]
-                new = copy.deepcopy(old)
+                new = Item(old)
                 old.assert_match_expected(expected)
             except KeyError:
                 # Item was not in the DB yet
                 old = Item()
                 new = Item()
-                self.count += 1
                 # append the keys
                 new[self.hash_key.name] = key['HashKeyElement']
                 if self.range_key is not None:
@@ -218,6 +250,8 @@ class Table(object):
                 raise ValidationException(
                     "Item size has exceeded the maximum allowed size of {}".format(config.MAX_ITEM_SIZE))
 
+            self._update_stats(old, new)
+
         return old, new
 
     def put(self, item, expected):
@@ -228,12 +262,13 @@ class Table(object):
         throughput, computed in the view, takes the maximum of both size into
         account.
 
-        This operation is atomic and blocks all other pending write operations.
+        This operation is atomic and blocks all other pending write operations
+        on the same ``hash_key``.
 
         :param item: Raw DynamoDB request item.
         :param expected: Raw DynamoDB request conditions.
 
-        :return: both deepcopies of :py:class:`ddbmock.database.item.Item` as it was (before, after) the update or empty item if not found.
+        :return: both versions of :py:class:`ddbmock.database.item.Item` as it was (before, after) the update or empty item if not found.
 
         :raises: :py:exc:`ddbmock.errors.ConditionalCheckFailedException` if conditions are not met.
         """
@@ -246,19 +281,18 @@ class Table(object):
         hash_key = item.read_key(self.hash_key, max_size=config.MAX_HK_SIZE)
         range_key = item.read_key(self.range_key, max_size=config.MAX_RK_SIZE)
 
-        with self.write_lock:
+        with self.write_lock[hash_key]:
             try:
                 old = self.store[hash_key, range_key]
                 old.assert_match_expected(expected)
             except KeyError:
                 # Item was not in the DB yet
-                self.count += 1
                 old = Item()
 
             self.store[hash_key, range_key] = item
-            new = copy.deepcopy(item)
+            self._update_stats(old, item)
 
-        return old, new
+        return old, item
 
     def get(self, key, fields):
         """
@@ -285,10 +319,11 @@ class Table(object):
             # Item was not in the DB yet
             return None
 
-    def query(self, hash_key, rk_condition, fields, start, reverse, limit):
+    def query(self, hash_key, rk_condition, fields, start, reverse, limit, count=False):
         """
         Return ``fields`` of all items with provided ``hash_key`` whose ``range_key``
-        matches ``rk_condition``.
+        matches ``rk_condition``. Like DynamoDB, a page stops as soon as
+        :py:const:`ddbmock.config.MAX_PAGE_SIZE` bytes were read.
 
         :param hash_key: Raw DynamoDB request hash_key.
         :param rk_condition: Raw DynamoDB request ``range_key`` condition.
@@ -296,17 +331,13 @@ class Table(object):
         :param start: Raw DynamoDB request key of the first item to scan. Empty array to indicate first item.
         :param reverse: Set to ``True`` to parse the range keys backward.
         :param limit: Maximum number of items to return in this batch. Set to 0 or less for no maximum.
+        :param count: Set to ``True`` to only count the matching items. ``results`` is then left empty.
 
-        :return: Results(results, cumulated_size, last_key)
+        :return: Results(results, cumulated_size, last_key, -1, count)
 
-        :raises: :py:exc:`ddbmock.errors.ValidationException` if ``start['HashKeyElement']`` is not ``hash_key``
+        :raises: :py:exc:`ddbmock.errors.ValidationException` if ``start['HashKeyElement']`` is not ``hash_key`` or ``rk_condition`` values type does not match the ``range_key``
         """
-        #FIXME: naive implementation
-        #FIXME: what if an item disappears during the operation ?
-        #TODO:
-        # - size limit
-
-        hash_value = self.hash_key.read(hash_key)
+        hash_value = self.hash_key.encode(hash_key)
         rk_name = self.range_key.name
         size = ItemSize(0)
         good_item_count = 0
@@ -316,94 +347,100 @@ class Table(object):
         if start and start['HashKeyElement'] != hash_key:
             raise ValidationException("'HashKeyElement' element of 'ExclusiveStartKey' must be the same as the hash_key. Expected {}, got {}".format(hash_key, start['HashKeyElement']))
 
-        try:
-            data = self.store[hash_value, None]
-        except KeyError:
-            # fix #9: return empty result set if first key does not exist
-            return Results(results, size, lek, -1)
-
-        keys = sorted(data.keys())
-
-        if reverse:
-            keys.reverse()
+        # only iterate over the slice of range keys matching the condition
+        low, high = self.range_key.bounds(rk_condition)
 
         if start:
-            first_key = self.range_key.read(start['RangeKeyElement'])
-            index = keys.index(first_key) + 1  # May raise ValueError but that's OK
-            keys = keys[index:]
-
-        for key in keys:
-            item = data[key]
-
-            if item.field_match(rk_name, rk_condition):
-                good_item_count += 1
-                size += item.get_size()
+            first_key = self.range_key.encode(start['RangeKeyElement'])
+            if reverse:
+                high = first_key if high is None else min(high, first_key)
+            else:
+                low = next_key(first_key) if low is None else max(low, next_key(first_key))
+
+        # fix #9: empty result set if hash_key does not exist
+        items = self.store.range_query(hash_value, low, high, reverse,
+                                       limit if limit > 0 else None)
+
+        for item in items:
+            good_item_count += 1
+            size += item.get_size()
+            if not count:
                 results.append(item.filter(fields))
 
-            if good_item_count == limit:
+            if good_item_count == limit or size >= config.MAX_PAGE_SIZE:
                 lek = {
                     u'HashKeyElement': hash_key,
                     u'RangeKeyElement': item[rk_name],
                 }
                 break
 
-        return Results(results, size, lek, -1)
+        return Results(results, size, lek, -1, good_item_count)
 
-    def scan(self, scan_conditions, fields, start, limit):
+    def scan(self, scan_conditions, fields, start, limit, segment=0, total_segments=1, count=False):
         """
-        Return ``fields`` of all items matching ``scan_conditions``. No matter the
-        ``start`` key, ``scan`` allways starts from teh beginning so that it might
-        be quite slow.
+        Return ``fields`` of all items matching ``scan_conditions``. When a
+        ``start`` key is provided, ``scan`` resumes right after it without
+        reading the items before.
+
+        Like DynamoDB, a page stops as soon as :py:const:`ddbmock.config.MAX_PAGE_SIZE`
+        bytes were read, matching the ``scan_conditions`` or not.
+
+        For parallel scans, the table is split in ``total_segments`` segments
+        by ``hash_key``. Only the items of ``segment`` are read.
 
         :param scan_conditions: Raw DynamoDB request conditions.
         :param fields: Raw DynamoDB request array of field names to return. Empty to return all.
         :param start: Raw DynamoDB request key of the first item to scan. Empty array to indicate first item.
         :param limit: Maximum number of items to return in this batch. Set to 0 or less for no maximum.
+        :param segment: Segment to scan. Must be lower than ``total_segments``.
+        :param total_segments: Number of segments the table is split into.
+        :param count: Set to ``True`` to only count the matching items. ``results`` is then left empty.
 
-        :return: Results(results, cumulated_size, last_key, scanned_count)
-        """
-        #FIXME: naive implementation (too)
-        #TODO:
-        # - esk
-        # - size limit
+        :return: Results(results, cumulated_size, last_key, scanned_count, count)
 
+        :raises: :py:exc:`ddbmock.errors.ValidationException` if ``start`` does not match the table schema.
+        """
         size = ItemSize(0)
         scanned = 0
+        good_item_count = 0
         lek = {}
         results = []
-        skip = start is not None
         hk_name = self.hash_key.name
         rk_name = self.range_key.name if self.range_key else None
 
-        for item in self.store:
-            # first, skip all items before start
-            if skip:
-                if start['HashKeyElement'] != item[hk_name]:
-                    continue
-                if rk_name and start['RangeKeyElement'] != item[rk_name]:
-                    continue
-                skip = False
-                continue
+        if start:
+            start = Item(start)
+            items = self.store.scan(
+                start.read_key(self.hash_key, u'HashKeyElement'),
+                start.read_key(self.range_key, u'RangeKeyElement'),
+                segment,
+                total_segments,
+            )
+        else:
+            items = self.store.scan(None, None, segment, total_segments)
 
+        for item in items:
             # match filters ?
             if item.match(scan_conditions):
-                results.append(item.filter(fields))
+                good_item_count += 1
+                if not count:
+                    results.append(item.filter(fields))
 
             # update stats
             size += item.get_size()
             scanned += 1
 
             # quit ?
-            if scanned == limit:
+            if scanned == limit or size >= config.MAX_PAGE_SIZE:
                 lek[u'HashKeyElement'] = item[hk_name]
                 if rk_name:
                     lek[u'RangeKeyElement'] = item[rk_name]
                 break
 
-        return Results(results, size, lek, scanned)
+        return Results(results, size, lek, scanned, good_item_count)
 
     @classmethod
-    def from_dict(cls, data):
+    def from_dict(cls, data, engine=None):
         """
         Alternate constructor which deciphers raw DynamoDB request data before
         ultimately calling regular ``__init__`` method.
@@ -411,6 +448,7 @@ class Table(object):
         See :py:meth:`__init__` for more insight.
 
         :param data: raw DynamoDB request data.
+        :param engine: (optional) Storage engine name.
 
         :return: fully initialized :py:class:`Table` instance
         """
@@ -428,31 +466,92 @@ class Table(object):
                     data[u'ProvisionedThroughput'][u'WriteCapacityUnits'],
                     hash_key,
                     range_key,
+                    engine=engine,
                   )
 
-    def get_size(self):
+    def _load_stats(self):
+        """
+        Count the items already in the store and their size, on first call.
+        This reads the whole store, once, instead of on each start-up. Writes
+        wait meanwhile.
+        """
+        with self.write_lock:
+            if self.count is not None:
+                return
+            count, size = 0, 0
+            for item in self.store:
+                count += 1
+                size += item.get_size().with_indexing_overhead()
+            with self.stats_lock:
+                self.count, self.size = count, size
+
+    def _add_stats(self, count, size):
+        """
+        Add ``count`` items of cumulated ``size`` to the running item count and
+        size. Both may be negative. Nothing to do before :py:meth:`_load_stats`:
+        the store holds the change already.
+
+        :param count: number of items
+        :param size: cumulated size of the items, indexing overhead included
         """
-        Compute the whole table size using the same rules as the real DynamoDB.
-        Actual memory usage in ddbmock will be much higher due to dict and Python
-        overheadd.
+        with self.stats_lock:
+            if self.count is not None:
+                self.count += count
+                self.size += size
 
-        .. note:: Real DynamoDB updates this result every 6 hours or so while this is an "on demand" call.
+    def _update_stats(self, old, new):
+        """
+        Update running item count and size when ``old`` item is replaced by
+        ``new``. Either of them may be ``None`` or empty when the item is
+        created or deleted. Caller must hold the ``hash_key`` :py:attr:`write_lock`.
 
-        :return: cumulated size of all items following DynamoDB size computation.
+        :param old: :py:class:`ddbmock.database.item.Item` as it was before the write
+        :param new: :py:class:`ddbmock.database.item.Item` as it is after the write
+        """
+        count, size = 0, 0
+        if old:
+            count -= 1
+            size -= old.get_size().with_indexing_overhead()
+        if new:
+            count += 1
+            size += new.get_size().with_indexing_overhead()
+        self._add_stats(count, size)
+
+    def get_stats(self):
+        """
+        Get the item count and whole table size using the same rules as the
+        real DynamoDB. Actual memory usage in ddbmock will be much higher due
+        to dict and Python overheadd.
+
+        Both values are maintained on each write. Like real DynamoDB, they may
+        be only refreshed every :py:const:`ddbmock.config.TABLE_STATS_INTERVAL`
+        seconds. Default is to always return live values.
+
+        :return: (item count, cumulated size of all items following DynamoDB size computation)
         """
-        # TODO: update size only every 6 hours
-        size = 0
+        if self.count is None:
+            self._load_stats()
+
+        current_time = time.time()
+        if current_time - self.stats_time >= config.TABLE_STATS_INTERVAL:
+            self.stats = (self.count, self.size)
+            self.stats_time = current_time
+        return self.stats
 
-        for item in self.store:
-            size += item.get_size().with_indexing_overhead()
+    def get_size(self):
+        """
+        Get the whole table size using the same rules as the real DynamoDB.
+        See :py:meth:`get_stats`.
 
-        return size
+        :return: cumulated size of all items following DynamoDB size computation.
+        """
+        return self.get_stats()[1]
 
     def to_dict(self, verbose=True):
         """
         Serialize this table to DynamoDB compatible format. Every fields are
-        realistic, including the ``TableSizeBytes`` which relies on
-        :py:meth:`get_size.`
+        realistic, including the ``ItemCount`` and ``TableSizeBytes`` which rely on
+        :py:meth:`get_stats.`
 
         Some DynamoDB requests only send a minimal version of Table metadata. to
         reproduce this behavior, just set ``verbose`` to ``False``.
@@ -474,8 +573,7 @@ class Table(object):
         }
 
         if verbose:
-            ret[u'ItemCount'] = self.count
-            ret[u'TableSizeBytes'] = self.get_size()
+            ret[u'ItemCount'], ret[u'TableSizeBytes'] = self.get_stats()
 
         if self.last_increase_time:
             ret[u'ProvisionedThroughput'][u'LastIncreaseDateTime'] = self.last_increase_time
@@ -497,6 +595,7 @@ class Table(object):
             self.hash_key,
             self.range_key,
             'ACTIVE',
+            self.engine,
         )
 
     def __setstate__(self, state):
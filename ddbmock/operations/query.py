@@ -18,13 +18,14 @@ def query(post, table):
         post[u'ExclusiveStartKey'],
         not post[u'ScanIndexForward'],
         post[u'Limit'],
+        post[u'Count'],
     )
 
     capacity = base_capacity*results.size.as_units()
     push_write_throughput(table.name, capacity)
 
     ret = {
-        "Count": len(results.items),
+        "Count": results.count,
         "ConsumedCapacityUnits": capacity,
     }
 
@@ -9,18 +9,31 @@ def scan(post, table):
     if post[u'AttributesToGet'] and post[u'Count']:
         raise ValidationException("Can not filter fields when only count is requested")
 
+    segment = post[u'Segment']
+    total_segments = post[u'TotalSegments']
+
+    if (segment is None) != (total_segments is None):
+        raise ValidationException("Segment and TotalSegments must be specified together")
+    if segment is None:
+        segment, total_segments = 0, 1
+    elif segment >= total_segments:
+        raise ValidationException("Segment must be less than TotalSegments. Got Segment={} and TotalSegments={}".format(segment, total_segments))
+
     results = table.scan(
         post[u'ScanFilter'],
         post[u'AttributesToGet'],
         post[u'ExclusiveStartKey'],
         post[u'Limit'],
+        segment,
+        total_segments,
+        post[u'Count'],
     )
 
     capacity = 0.5*results.size.as_units()
     push_write_throughput(table.name, capacity)
 
     ret = {
-        "Count": len(results.items),
+        "Count": results.count,
         "ScannedCount": results.scanned,
         "ConsumedCapacityUnits": capacity,
     }
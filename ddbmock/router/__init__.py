@@ -1,22 +1,83 @@
 # -*- coding: utf-8 -*-
 
 from importlib import import_module
+from collections import namedtuple
 from ..utils import req_logger
 from ..errors import InternalFailure
-from ..validators import dynamodb_api_validate
+from ..validators import load_validator, compile_validator, validate
 from ..config import config_for_user
-import re, itertools, sys, traceback
+from .. import operations
+import re, itertools, pkgutil, sys, traceback
 
 request_counter = itertools.count()  # atomic counter
 
 first_cap_re = re.compile('(.)([A-Z][a-z]+)')
 all_cap_re = re.compile('([a-z0-9])([A-Z])')
 
+# name: underscore name of the action, used in logs and errors
+# func: operation, called with the validated post
+# validator: compiled ``post`` validator or ``None`` to skip validation
+# permissions: permission level required by the action
+Route = namedtuple('Route', ['name', 'func', 'validator', 'permissions'])
+
+# DynamoDB action name -> Route
+routes = {}
+
 
 def action_to_route(name):
     s1 = first_cap_re.sub(r'\1_\2', name)
     return all_cap_re.sub(r'\1_\2', s1).lower()
 
+def route_to_action(name):
+    return ''.join(word.capitalize() for word in name.split('_'))
+
+def register_route(action, func, schema=None, permissions=None):
+    """
+    Register ``func`` as the operation for DynamoDB ``action``. Replaces any
+    previous registration. ``schema`` is compiled once, here.
+
+    :param action: DynamoDB action name like ``GetItem``
+    :param func: operation, called with the validated post. Returns the response dict
+    :param schema: onctuous ``post`` schema. ``None`` to skip validation
+    :param permissions: permission level required by the action, like ``ddbmock.validators.types.WRITE_PERMISSION``
+
+    :return: the new :py:class:`Route`
+    """
+    validator = compile_validator(schema) if schema is not None else None
+    route = Route(action_to_route(action), func, validator, permissions)
+    routes[action] = route
+    return route
+
+def load_route(action):
+    """
+    Find and register the operation of ``action`` by introspection:
+    function ``ddbmock.operations.<name>.<name>`` and validator
+    ``ddbmock.validators.<name>`` where ``<name>`` is the underscore version
+    of ``action``.
+
+    :param action: DynamoDB action name like ``GetItem``
+
+    :return: the new :py:class:`Route` or ``None`` if there is no such operation
+    """
+    target = action_to_route(action)
+    try:
+        mod = import_module('ddbmock.operations.{}'.format(target))
+        func = getattr(mod, target)
+    except (ImportError, AttributeError):
+        return None
+
+    validator, permissions = load_validator(target)
+    route = Route(target, func, validator, permissions)
+    routes[action] = route
+    return route
+
+def load_routes():
+    """
+    Register all the operations shipped in ``ddbmock.operations``.
+    """
+    for _, name, _ in pkgutil.iter_modules(operations.__path__):
+        load_route(route_to_action(name))
+
 def router(action, post, user = None):
     if user == None:
         user = config_for_user()
@@ -25,26 +86,26 @@ def router(action, post, user = None):
     req_logger.debug("user=%s request_id=%s action=%s body=%s", user["name"], request_id, action, post)
 
     # Find route
-    try:
-        target = action_to_route(action)
-        mod = import_module('ddbmock.operations.{}'.format(target))
-        func = getattr(mod, target)
-    except ImportError:
+    route = routes.get(action) or load_route(action)
+    if route is None:
         req_logger.error('request_id=%s action=%s No such action', request_id, action)
         raise InternalFailure("Method: {} does not exist".format(action))
 
     # Validate the input
-    try:
-        post = dynamodb_api_validate(target, post, user)
-    except Exception as e:
-        req_logger.error('request_id=%s action=%s exception=%s body=%s stack=%s', request_id, action, type(e).__name__, str(e.args), traceback.format_exc(sys.exc_info()[2]))
-        raise
+    if route.validator is not None:
+        try:
+            post = validate(route.name, route.validator, route.permissions, post, user)
+        except Exception as e:
+            req_logger.error('request_id=%s action=%s exception=%s body=%s stack=%s', request_id, action, type(e).__name__, str(e.args), traceback.format_exc(sys.exc_info()[2]))
+            raise
 
     # Run request and translate engine errors to DynamoDB errors
     try:
-        answer = func(post)
+        answer = route.func(post)
         #req_logger.debug("request_id=%s action=%s answer=%s", post['request_id'], action, answer)
         return answer
     except (TypeError, ValueError, KeyError) as e:
         req_logger.error('request_id=%s action=%s exception=%s body=%s stack=%s', request_id, action, type(e).__name__, str(e.args), traceback.format_exc(sys.exc_info()[2]))
         raise InternalFailure("{}: {}".format(type(e).__name__, str(e.args)))
+
+load_routes()
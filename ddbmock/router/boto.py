@@ -24,6 +24,31 @@ def _ddbmock_exception_to_boto_exception(err):
     else:
         return DynamoDBResponseError(err.status, err.status_str, err.to_dict())
 
+# DDB answer to Boto answer
+
+# JSON types decoded as is. Checked by exact type, subclasses go the long way
+_JSON_SCALARS = frozenset([unicode, int, long, float, bool, type(None)])
+
+def _ddbmock_result_to_boto_result(value, object_hook=None):
+    """Deep copy ``value`` as ``json.loads(json.dumps(value))`` would: strings
+    are unicode, tuples are lists and ``object_hook`` is called on each dict,
+    innermost first. Without the serialization."""
+    if isinstance(value, dict):
+        out = {}
+        for key, field in value.iteritems():
+            if type(key) is str:
+                key = key.decode('utf-8')
+            if type(field) not in _JSON_SCALARS:
+                field = _ddbmock_result_to_boto_result(field, object_hook)
+            out[key] = field
+        return object_hook(out) if object_hook is not None else out
+    if isinstance(value, (list, tuple)):
+        return [field if type(field) in _JSON_SCALARS
+                else _ddbmock_result_to_boto_result(field, object_hook)
+                for field in value]
+    if isinstance(value, str):
+        return value.decode('utf-8')
+    return value
 
 # Boto lib version entry point
 def boto_router(self, action, body='', object_hook=None):
@@ -33,9 +58,12 @@ def boto_router(self, action, body='', object_hook=None):
     start = time.time()
 
     post = json.loads(body)
+    user = config_for_user(self.aws_access_key_id)
+    if getattr(self, 'trusted', False):
+        user["TRUSTED"] = True
 
     try:
-        ret = router(action, post, config_for_user(self.aws_access_key_id))
+        ret = router(action, post, user)
     except DDBError as e:
         raise _ddbmock_exception_to_boto_exception(e)
     finally:
@@ -44,6 +72,4 @@ def boto_router(self, action, body='', object_hook=None):
             elapsed = (time.time() - start) * 1000
             boto.perflog.info('dynamodb %s: id=%s time=%sms', target, post['request_id'], int(elapsed))
 
-    # FIXME: dump followed by load... can be better...
-    ret = json.dumps(ret)
-    return json.loads(ret, object_hook=object_hook)
+    return _ddbmock_result_to_boto_result(ret, object_hook)
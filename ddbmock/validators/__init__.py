@@ -1,40 +1,270 @@
 # -*- coding: utf-8 -*-
 
-from onctuous import Schema, Invalid
+from onctuous import Schema, Invalid, InvalidList, Required, Optional, Extra
+# CompiledSchema relies on these internals. onctuous is pinned accordingly
+# in setup.cfg, see test_onctuous_internals
+from onctuous.validators import Marker
+from onctuous.errors import UNDEFINED
 from importlib import import_module
+from threading import Lock
 from ..errors import ValidationException, AccessDeniedException
+from ..config import config_for_user
 from logging import getLogger
 from types import WRITE_PERMISSION
+from fast import fast_validator
 
 log = getLogger(__name__)
 
-def dynamodb_api_validate(action, post, user = None):
-    """ Find validator for ``action`` and run it on ``post``. If no validator
-        are found, return False.
+# route name -> (validator, permissions)
+validators = {}
+validators_lock = Lock()
+
+class CompiledSchema(Schema):
+    """ onctuous ``Schema`` whose dictionaries are analysed once, when the
+        schema is built. Literal keys, the vast majority, are then matched
+        with a dict lookup instead of trying each key of the schema in turn.
+        Validation results and errors are the same as with ``Schema``.
+
+        The schema must not be altered once compiled.
+    """
+    def __init__(self, schema, required=False, extra=False):
+        super(CompiledSchema, self).__init__(schema, required, extra)
+        self._dicts = {}
+        self._with_defaults = set()
+        self._compile(schema)
+        self._find_defaults(schema)
+
+    def _compile(self, schema):
+        if isinstance(schema, list):
+            for rule in schema:
+                self._compile(rule)
+            return
+        if not isinstance(schema, dict) or id(schema) in self._dicts:
+            return
+
+        literals = {}
+        patterns = []
+        required = []
+        extra = self.extra
+
+        for skey, rule in schema.iteritems():
+            if (isinstance(skey, Required)
+            or self.required and not isinstance(skey, Optional)):
+                required.append(skey)
+
+            if skey is Extra:
+                extra = True
+                continue
+
+            literal = skey.schema if isinstance(skey, Marker) else skey
+            if isinstance(literal, basestring):
+                literals.setdefault(literal, (skey, rule))
+            else:
+                patterns.append((skey, rule))
+
+        self._dicts[id(schema)] = (schema, literals, patterns, required, extra)
+
+        for rule in schema.itervalues():
+            self._compile(rule)
+
+    def _find_defaults(self, schema):
+        # mark the dicts and lists holding a default value, at any depth
+        if isinstance(schema, list):
+            found = [self._find_defaults(rule) for rule in schema]
+        elif isinstance(schema, dict):
+            found = [self._find_defaults(rule) for rule in schema.itervalues()]
+            found += [getattr(key, 'default', UNDEFINED) is not UNDEFINED for key in schema]
+        else:
+            return False
+
+        if any(found):
+            self._with_defaults.add(id(schema))
+            return True
+        return False
+
+    def defaults(self, data):
+        """ Apply the default values of ``Required`` keys to ``data`` but do
+            *not* validate it. This is only meant for trusted, well formed,
+            requests.
+
+            Only the dicts and lists of the schema are walked, defaults nested
+            in validator functions like ``Any`` are not applied. Keys matching
+            no literal key of the schema take the first pattern key, if any.
+            Branches without defaults are returned as is.
+        """
+        return self._apply_defaults(self.schema, data)
+
+    def _apply_defaults(self, schema, data):
+        if id(schema) not in self._with_defaults:
+            return data
+
+        if isinstance(schema, list):
+            if len(schema) != 1 or not isinstance(data, list):
+                return data
+            return [self._apply_defaults(schema[0], value) for value in data]
+
+        if not isinstance(data, dict):
+            return data
+
+        _, literals, patterns, required, _ = self._dicts[id(schema)]
+        out = type(data)()
+
+        for key, value in data.iteritems():
+            try:
+                _, rule = literals[key]
+            except (KeyError, TypeError):
+                if not patterns:
+                    out[key] = value
+                    continue
+                _, rule = patterns[0]
+            out[key] = self._apply_defaults(rule, value)
+
+        for key in required:
+            default = getattr(key, 'default', UNDEFINED)
+            if default is not UNDEFINED and key.schema not in out:
+                out[key.schema] = default
+
+        return out
+
+    def _validate_dict(self, path, schema, data):
+        compiled = self._dicts.get(id(schema))
+        if compiled is None or compiled[0] is not schema:
+            return super(CompiledSchema, self)._validate_dict(path, schema, data)
+        _, literals, patterns, required, extra = compiled
+
+        # Empty schema when extra allowed, allow any data list.
+        if (not schema and self.extra):
+            return data # shortcut
+
+        out = type(data)()
+        required_keys = set(required)
+        errors = []
+
+        for key, value in data.iteritems():
+            key_path = path + [key]
+
+            # First, select a validator key. Literal first, then patterns
+            try:
+                skey, rule = literals[key]
+                new_key = key
+            except (KeyError, TypeError):
+                for skey, rule in patterns:
+                    try:
+                        new_key = self.validate(key_path, skey, key)
+                        break  # Match found !
+                    except Invalid:
+                        pass
+                # No matching rule ?
+                else:
+                    if extra:
+                        out[key] = value
+                    else:
+                        errors.append(Invalid('extra keys not allowed. Got unknown \'%s\'' % str(key), key_path))
+                    continue
+
+            # Second, validate data against the rule we just found
+            try:
+                out[new_key] = self.validate(key_path, rule, value)
+            except Invalid, e:
+                if len(e.path) > len(key_path):
+                    errors.append(e)
+                else:
+                    errors.append(Invalid(e.msg + ' for dictionary value', e.path))
+                break
+
+            # Last, mark any required() fields as found.
+            required_keys.discard(skey)
+
+        # Check that all required keys are supplied or have default values
+        for key in required_keys:
+            if getattr(key, 'default', UNDEFINED) is not UNDEFINED:
+                out[key.schema] = key.default
+            else:
+                errors.append(Invalid('required keys %s not provided' % repr(required_keys), path + [key]))
+
+        # handle errors and return
+        if errors:
+            raise InvalidList(errors)
+
+        return out
+
+def compile_validator(schema):
+    """ Build the validator of a ``post`` schema. The schema itself is left
+        untouched.
+
+        :schema: onctuous schema of a route
+        :return: validator, called with the post to validate
+    """
+    schema = dict(schema)
+    # ignore the 'request_id' key but propagate it
+    schema['request_id'] = str
+    return CompiledSchema(schema, required=True)
+
+def load_validator(action):
+    """ Find and compile validator for ``action``. Validators are compiled
+        once and cached.
+
+        :action: name of the route after translation to underscores
+        :return: (validator, permissions). validator is ``None`` when no validator is found
+    """
+    try:
+        return validators[action]
+    except KeyError:
+        pass
+
+    with validators_lock:
+        if action in validators:
+            return validators[action]
+
+        try:
+            mod = import_module('.{}'.format(action), __name__)
+            schema = getattr(mod, 'post')
+        except (ImportError, AttributeError):
+            return None, None  # Fixme: should log
+
+        permissions = getattr(mod, 'permissions', None)
+        if permissions == None:
+            log.warning("No permissions set on %s" % action)
+
+        validators[action] = fast_validator(action, compile_validator(schema)), permissions
+        return validators[action]
+
+def validate(action, validator, permissions, post, user = None):
+    """ Check ``user`` ``permissions`` and run ``validator`` on ``post``.
+        ``TRUSTED`` users only get the default values applied.
 
         :action: name of the route after translation to underscores
+        :validator: compiled validator of ``action``
+        :permissions: permission level of ``action``
         :post: data to validate
-        :return: False when no validator found, True on success
+        :user: user profile, see :py:func:`ddbmock.config.config_for_user`. ``None`` for the default user
+        :return: validated data
         :raises: any onctuous exception
     """
-    try:
-        mod = import_module('.{}'.format(action), __name__)
-        schema = getattr(mod, 'post')
-    except (ImportError, AttributeError):
-        return post  # Fixme: should log
-
-    permissions = getattr(mod, 'permissions', None)
-    if permissions == None:
-        log.warning("No permissions set on %s" % action)
-    else:
-        if permissions == WRITE_PERMISSION and user["READ_ONLY"]:
-            raise AccessDeniedException("User: %s is not authorized to perform: dynamodb:%s on resource: *"%(user["name"], action))
+    if user is None:
+        user = config_for_user()
 
-    # ignore the 'request_id' key but propagate it
-    schema['request_id'] = str
+    if permissions == WRITE_PERMISSION and user["READ_ONLY"]:
+        raise AccessDeniedException("User: %s is not authorized to perform: dynamodb:%s on resource: *"%(user["name"], action))
+
+    if user.get("TRUSTED"):
+        return validator.defaults(post)
 
     try:
-        validate = Schema(schema, required=True)
-        return validate(post)
+        return validator(post)
     except Invalid as e:
         raise ValidationException(str(e))
+
+def dynamodb_api_validate(action, post, user = None):
+    """ Find validator for ``action`` and run it on ``post``. If no validator
+        are found, return ``post`` unchanged.
+
+        :action: name of the route after translation to underscores
+        :post: data to validate
+        :return: validated data
+        :raises: any onctuous exception
+    """
+    validator, permissions = load_validator(action)
+    if validator is None:
+        return post
+    return validate(action, validator, permissions, post, user)
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from .types import table_name, Required, get_key_schema, attributes_to_get_schema,consistent_read
+from .types import table_name, Required, get_key_schema, attributes_to_get_schema,consistent_read, READ_PERMISSION
 
 post = {
     u"RequestItems": {
@@ -11,3 +11,5 @@ post = {
         },
     },
 }
+
+permissions = READ_PERMISSION
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 
-from .types import table_name
+from .types import table_name, READ_PERMISSION
 
 post = {
     u'TableName': table_name,
-}
\ No newline at end of file
+}
+
+permissions = READ_PERMISSION
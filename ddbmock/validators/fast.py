@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+
+# Hand written validators of the hot operations. They only recognize valid
+# requests and then return the very same result as the onctuous schema of the
+# operation, in a single pass and without exceptions. Anything else, including
+# all errors, is handed over to the schema so that the error messages do not
+# change.
+#
+# Each check mirrors the schema of the same name in ``types``. Keep them in sync.
+
+from ddbmock import config
+from decimal import Decimal
+from .types import base_64, table_name_re
+
+class Fallback(Exception):
+    """Request is not handled by the fast path. Validate it with the schema"""
+
+def check_table_name(v):
+    if not (isinstance(v, unicode) and 3 <= len(v) <= 255 and table_name_re.match(v)):
+        raise Fallback
+    return v
+
+def check_number(v):
+    d = Decimal(v).as_tuple()
+    # NaN and Infinity have a string exponent
+    if type(d.exponent) is not int or len(d.digits) > 38 or not -128 <= d.exponent <= 126:
+        raise Fallback
+    return v
+
+def check_string(v):
+    if not (isinstance(v, unicode) and v):
+        raise Fallback
+    return v
+
+def check_binary(v):
+    if not (isinstance(v, unicode) and v and base_64.match(v)):
+        raise Fallback
+    return v
+
+def check_set(check):
+    def f(v):
+        if not (isinstance(v, list) and v):
+            raise Fallback
+        for value in v:
+            check(value)
+        return v
+    return f
+
+def check_bool(v):
+    if v is not True and v is not False:
+        raise Fallback
+    return v
+
+def check_request_id(v):
+    if not isinstance(v, str):
+        raise Fallback
+    return v
+
+SIMPLE_FIELD = {
+    u'N': check_number,
+    u'S': check_string,
+    u'B': check_binary,
+}
+
+SET_FIELD = {
+    u'NS': check_set(check_number),
+    u'SS': check_set(check_string),
+    u'BS': check_set(check_binary),
+}
+
+FIELD = dict(SIMPLE_FIELD, **SET_FIELD)
+
+STR_BIN_FIELD = {
+    u'S': check_string,
+    u'B': check_binary,
+}
+
+def check_field(v, fields=FIELD):
+    # all types are optional: unknown ones raise KeyError
+    if not isinstance(v, dict):
+        raise Fallback
+    for key, value in v.iteritems():
+        fields[key](value)
+    return v
+
+def check_key_field(v):
+    return check_field(v, SIMPLE_FIELD)
+
+def check_item(v):
+    if not (isinstance(v, dict) and v):
+        raise Fallback
+    for name, value in v.iteritems():
+        if not isinstance(name, unicode):
+            raise Fallback
+        check_field(value)
+    return v
+
+def check_key(v):
+    if not isinstance(v, dict) or u'HashKeyElement' not in v:
+        raise Fallback
+    for key, value in v.iteritems():
+        if key != u'HashKeyElement' and key != u'RangeKeyElement':
+            raise Fallback
+        check_field(value, SIMPLE_FIELD)
+    return v
+
+def check_attributes_to_get(v):
+    if not v:
+        return v
+    if not isinstance(v, list):
+        raise Fallback
+    for name in v:
+        if not isinstance(name, unicode):
+            raise Fallback
+    return v
+
+def check_expected(v):
+    if not (isinstance(v, dict) and v):
+        raise Fallback
+    for name, condition in v.iteritems():
+        if not (isinstance(name, unicode) and isinstance(condition, dict)):
+            raise Fallback
+        for key in condition:
+            if key != u'Exists' and key != u'Value':
+                raise Fallback
+        # {"Exists": False}, {"Exists": True} or {"Value": ..., ["Exists": True]}
+        if u'Value' in condition:
+            if u'Exists' in condition and not condition[u'Exists']:
+                raise Fallback
+            check_field(condition[u'Value'])
+    return v
+
+def check_update_action(v):
+    if not isinstance(v, dict):
+        raise Fallback
+    for key in v:
+        if key != u'Action' and key != u'Value':
+            raise Fallback
+
+    if u'Action' not in v:
+        if u'Value' in v:
+            check_field(v[u'Value'])
+        v = dict(v)
+        v["Action"] = "PUT"
+    elif v[u'Action'] in (u'PUT', u'ADD'):
+        if u'Value' in v:
+            check_field(v[u'Value'])
+    elif v[u'Action'] == u'DELETE':
+        if u'Value' in v:
+            check_field(v[u'Value'], SET_FIELD)
+    else:
+        raise Fallback
+    return v
+
+def check_attribute_updates(v):
+    if not (isinstance(v, dict) and v):
+        raise Fallback
+    out = {}
+    for name, action in v.iteritems():
+        if not isinstance(name, unicode):
+            raise Fallback
+        out[name] = check_update_action(action)
+    return out
+
+def check_return_values(v):
+    if v not in (u'NONE', u'ALL_OLD'):
+        raise Fallback
+    return v
+
+def check_return_values_all(v):
+    if v not in (u'NONE', u'ALL_OLD', u'UPDATED_OLD', u'ALL_NEW', u'UPDATED_NEW'):
+        raise Fallback
+    return v
+
+def check_limit(v):
+    if not (isinstance(v, int) and v >= 1):
+        raise Fallback
+    return v
+
+def check_range_key_condition(v):
+    if not isinstance(v, dict):
+        raise Fallback
+    for key in v:
+        if key != u'ComparisonOperator' and key != u'AttributeValueList':
+            raise Fallback
+
+    operator = v[u'ComparisonOperator']
+    if operator in (u'EQ', u'GT', u'GE', u'LT', u'LE'):
+        length, fields = 1, SIMPLE_FIELD
+    elif operator == u'BETWEEN':
+        length, fields = 2, SIMPLE_FIELD
+    elif operator == u'BEGINS_WITH':
+        length, fields = 1, STR_BIN_FIELD
+    else:
+        raise Fallback
+
+    if u'AttributeValueList' in v:
+        values = v[u'AttributeValueList']
+        if not (isinstance(values, list) and len(values) == length):
+            raise Fallback
+        for value in values:
+            check_field(value, fields)
+    return v
+
+def check_dict(rules, defaults):
+    """
+    Build the check of a dict with literal keys. Keys of ``rules`` are
+    required unless they have a value in ``defaults``. Like in the schemas,
+    defaults are not validated.
+    """
+    required = set(rules) - set(defaults)
+
+    def f(post):
+        out = {}
+        for key, value in post.iteritems():
+            out[key] = rules[key](value)
+        for key in required:
+            if key not in out:
+                raise Fallback
+        for key, default in defaults.iteritems():
+            if key not in out:
+                out[key] = default
+        return out
+    return f
+
+def check_post(rules, defaults):
+    """
+    Build the check of a request. Same as :py:func:`check_dict`, with the
+    ``request_id`` added by the router.
+    """
+    return check_dict(dict(rules, request_id=check_request_id), defaults)
+
+def check_keys(v):
+    if not v:
+        return v
+    if not isinstance(v, list):
+        raise Fallback
+    return [check_key(key) for key in v]
+
+get_item = check_post({
+    u'TableName': check_table_name,
+    u'Key': check_key,
+    u'AttributesToGet': check_attributes_to_get,
+    u'ConsistentRead': check_bool,
+}, {
+    u'AttributesToGet': [],
+    u'ConsistentRead': False,
+})
+
+put_item = check_post({
+    u'TableName': check_table_name,
+    u'Item': check_item,
+    u'Expected': check_expected,
+    u'ReturnValues': check_return_values,
+}, {
+    u'Expected': {},
+    u'ReturnValues': u'NONE',
+})
+
+update_item = check_post({
+    u'TableName': check_table_name,
+    u'Key': check_key,
+    u'AttributeUpdates': check_attribute_updates,
+    u'Expected': check_expected,
+    u'ReturnValues': check_return_values_all,
+}, {
+    u'Expected': {},
+    u'ReturnValues': u'NONE',
+})
+
+query = check_post({
+    u'TableName': check_table_name,
+    u'HashKeyValue': check_key_field,
+    u'RangeKeyCondition': check_range_key_condition,
+    u'ScanIndexForward': check_bool,
+    u'Count': check_bool,
+    u'Limit': check_limit,
+    u'ExclusiveStartKey': check_key,
+    u'AttributesToGet': check_attributes_to_get,
+    u'ConsistentRead': check_bool,
+}, {
+    u'RangeKeyCondition': None,
+    u'ScanIndexForward': True,
+    u'Count': False,
+    u'Limit': None,
+    u'ExclusiveStartKey': None,
+    u'AttributesToGet': [],
+    u'ConsistentRead': False,
+})
+
+check_batch_get_table = check_dict({
+    u'Keys': check_keys,
+    u'AttributesToGet': check_attributes_to_get,
+    u'ConsistentRead': check_bool,
+}, {
+    u'AttributesToGet': [],
+    u'ConsistentRead': False,
+})
+
+def check_request_items(v):
+    if not (isinstance(v, dict) and v):
+        raise Fallback
+    out = {}
+    for name, request in v.iteritems():
+        check_table_name(name)
+        out[name] = check_batch_get_table(request)
+    return out
+
+batch_get_item = check_post({
+    u'RequestItems': check_request_items,
+}, {})
+
+# route name -> check
+CHECKS = {
+    'get_item': get_item,
+    'put_item': put_item,
+    'update_item': update_item,
+    'query': query,
+    'batch_get_item': batch_get_item,
+}
+
+def fast_validator(action, validator):
+    """ Wrap ``validator`` of ``action`` with its fast path, if any. The fast
+        path is used when :py:const:`ddbmock.config.FAST_VALIDATORS` is set.
+
+        :action: name of the route after translation to underscores
+        :validator: compiled schema validator of ``action``
+        :return: validator
+    """
+    check = CHECKS.get(action)
+    if check is None:
+        return validator
+
+    def validate(post):
+        if config.FAST_VALIDATORS:
+            try:
+                return check(post)
+            except Exception:
+                pass
+        return validator(post)
+    validate.schema = validator.schema
+    validate.defaults = validator.defaults
+    return validate
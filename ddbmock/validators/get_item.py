@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from .types import table_name, Required, item_schema, get_key_schema, consistent_read, attributes_to_get_schema
+from .types import table_name, Required, item_schema, get_key_schema, consistent_read, attributes_to_get_schema, READ_PERMISSION
 
 post = {
     u'TableName': table_name,
@@ -8,3 +8,5 @@ post = {
     Required(u'AttributesToGet', []): attributes_to_get_schema,
     Required(u'ConsistentRead', False): consistent_read,
 }
+
+permissions = READ_PERMISSION
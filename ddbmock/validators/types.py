@@ -22,11 +22,12 @@ def Precision(min_exp=None, max_exp=None, max_digits=None, msg=None):
 # Elementary types
 
 base_64 = re.compile(r'^(?:[A-Za-z0-9+/]{4})*(?:[A-Za-z0-9+/]{2}==|[A-Za-z0-9+/]{3}=)?$')
+table_name_re = re.compile(r'^[a-zA-Z0-9\-_\.]*$')
 
 table_name = All(
     unicode,
     Length(min=3, max=255, msg="Table name Length must be between 3 and 255"),
-    Match(re.compile(r'^[a-zA-Z0-9\-_\.]*$'), msg="Table name may only contain alphanumeric chars and '-' '_' '.'"),
+    Match(table_name_re, msg="Table name may only contain alphanumeric chars and '-' '_' '.'"),
 )
 
 table_page = All(
@@ -66,10 +67,24 @@ limit = All(
     InRange(min=1, msg="Limit parameter must be a positive integer"),
 )
 
+segment = All(
+    int,
+    InRange(0, 999999, msg="Segment must be between 0 and 999999"),
+)
+
+total_segments = All(
+    int,
+    InRange(1, 1000000, msg="TotalSegments must be between 1 and 1000000"),
+)
+
 scan_index_forward = All(
     Boolean(msg="ScanIndexForward must be either True either False"),
 )
 
+count = All(
+    Boolean(msg="Count must be either True either False"),
+)
+
 # DynamoDB data types
 
 field_name = unicode
@@ -12,5 +12,7 @@ setup(
     entry_points="""\
     [paste.app_factory]
     main = ddbmock:main
+    [console_scripts]
+    ddbmock-bulk = ddbmock.bulk:main
     """,
 )
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+# Compare the conversion of Query answers for boto: JSON dump followed by load,
+# as before, and direct walk. With the object hook of boto Layer2, which
+# decodes the fields, and without, like Layer1. The Query itself is timed for
+# reference.
+# Run with: python -m tests.benchmark.bench_boto_router
+
+import timeit, json
+
+TABLE_NAME = u'Table-HR'
+TABLE_RT = 45
+TABLE_WT = 123
+HK_VALUE = u'123'
+
+SIZES = [1, 10, 100, 1000]
+NUMBER = 20
+
+def item(i):
+    return {
+        u'hash_key': {u'N': HK_VALUE},
+        u'range_key': {u'S': u'Waldo-%06d' % i},
+        u'relevant_data': {u'S': u'tata'},
+        u'counter': {u'N': unicode(i)},
+        u'tags': {u'SS': [u'a', u'b', u'c']},
+    }
+
+def main():
+    from ddbmock.database.db import dynamodb
+    from ddbmock.database.table import Table
+    from ddbmock.database.key import PrimaryKey
+    from ddbmock.router import router
+    from ddbmock.router.boto import _ddbmock_result_to_boto_result
+    from boto.dynamodb.types import Dynamizer
+
+    object_hook = Dynamizer().decode
+    hash_key = PrimaryKey(u'hash_key', u'N')
+    range_key = PrimaryKey(u'range_key', u'S')
+
+    print "{:>6} {:>12} {:>12} {:>12} {:>12} {:>12}".format(
+        "items", "query (ms)", "json (ms)", "walk (ms)", "json L1 (ms)", "walk L1 (ms)")
+    for size in SIZES:
+        dynamodb.hard_reset()
+        table = Table(TABLE_NAME, TABLE_RT, TABLE_WT, hash_key, range_key)
+        dynamodb.data[TABLE_NAME] = table
+        for i in range(size):
+            table.put(item(i), {})
+
+        post = {u'TableName': TABLE_NAME, u'HashKeyValue': {u'N': HK_VALUE}}
+        ret = router('Query', dict(post))
+        assert ret['Count'] == size
+
+        t_query = timeit.timeit(lambda: router('Query', dict(post)), number=NUMBER)
+        t_json = timeit.timeit(lambda: json.loads(json.dumps(ret), object_hook=object_hook), number=NUMBER)
+        t_walk = timeit.timeit(lambda: _ddbmock_result_to_boto_result(ret, object_hook), number=NUMBER)
+        t_json_l1 = timeit.timeit(lambda: json.loads(json.dumps(ret)), number=NUMBER)
+        t_walk_l1 = timeit.timeit(lambda: _ddbmock_result_to_boto_result(ret), number=NUMBER)
+        print "{:>6} {:>12.3f} {:>12.3f} {:>12.3f} {:>12.3f} {:>12.3f}".format(
+            size, t_query/NUMBER*1e3, t_json/NUMBER*1e3, t_walk/NUMBER*1e3,
+            t_json_l1/NUMBER*1e3, t_walk_l1/NUMBER*1e3)
+
+    dynamodb.hard_reset()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+# Compare item codecs of persistent stores: encode/decode time and size.
+# Run with: python -m tests.benchmark.bench_codec
+
+import timeit
+
+ITEMS = {
+    'small': {
+        u'hash_key': {u'N': u'123'},
+        u'range_key': {u'S': u'Waldo-1'},
+        u'relevant_data': {u'S': u'tata'},
+    },
+    'medium': dict(
+        [(u'field_%d' % i, {u'S': u'value %d' % i}) for i in range(20)] +
+        [(u'set_%d' % i, {u'NS': [unicode(j) for j in range(10)]}) for i in range(5)]
+    ),
+    'big': {
+        u'hash_key': {u'N': u'123'},
+        u'big field': {u'S': u'abcd'*8000},
+    },
+}
+
+NUMBER = 10000
+
+def main():
+    from ddbmock.database.storage.codec import encode, decode, CODECS
+    from ddbmock.database.item import Item
+
+    print "{:<8} {:<8} {:>12} {:>12} {:>8}".format("item", "codec", "encode (us)", "decode (us)", "bytes")
+    for name, raw in sorted(ITEMS.items()):
+        item = Item(raw)
+        for codec in ['pickle'] + sorted(CODECS):
+            data = encode(item, codec)
+            t_encode = timeit.timeit(lambda: encode(item, codec), number=NUMBER)
+            t_decode = timeit.timeit(lambda: decode(data), number=NUMBER)
+            print "{:<8} {:<8} {:>12.2f} {:>12.2f} {:>8}".format(
+                name, codec, t_encode/NUMBER*1e6, t_decode/NUMBER*1e6, len(data))
+
+if __name__ == '__main__':
+    main()
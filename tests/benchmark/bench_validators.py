@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+# Measure request validation cost per operation: schema built on each call,
+# as before, compiled once and hand written fast path, when available.
+# Run with: python -m tests.benchmark.bench_validators
+
+import timeit
+
+TABLE_NAME = u'Table-HR'
+KEY = {u'HashKeyElement': {u'N': u'123'}, u'RangeKeyElement': {u'S': u'Waldo-1'}}
+ITEM = {
+    u'hash_key': {u'N': u'123'},
+    u'range_key': {u'S': u'Waldo-1'},
+    u'relevant_data': {u'S': u'tata'},
+}
+
+POSTS = {
+    'get_item': {
+        u'TableName': TABLE_NAME,
+        u'Key': KEY,
+        u'AttributesToGet': [u'relevant_data'],
+    },
+    'put_item': {
+        u'TableName': TABLE_NAME,
+        u'Item': ITEM,
+        u'Expected': {u'relevant_data': {u'Exists': False}},
+    },
+    'update_item': {
+        u'TableName': TABLE_NAME,
+        u'Key': KEY,
+        u'AttributeUpdates': {
+            u'relevant_data': {u'Action': u'PUT', u'Value': {u'S': u'titi'}},
+            u'counter': {u'Action': u'ADD', u'Value': {u'N': u'1'}},
+        },
+        u'ReturnValues': u'ALL_NEW',
+    },
+    'delete_item': {
+        u'TableName': TABLE_NAME,
+        u'Key': KEY,
+    },
+    'query': {
+        u'TableName': TABLE_NAME,
+        u'HashKeyValue': {u'N': u'123'},
+        u'RangeKeyCondition': {
+            u'AttributeValueList': [{u'S': u'Waldo'}],
+            u'ComparisonOperator': u'BEGINS_WITH',
+        },
+        u'Limit': 10,
+    },
+    'scan': {
+        u'TableName': TABLE_NAME,
+        u'ScanFilter': {
+            u'relevant_data': {
+                u'AttributeValueList': [{u'S': u'tata'}],
+                u'ComparisonOperator': u'EQ',
+            },
+        },
+    },
+    'batch_get_item': {
+        u'RequestItems': {
+            TABLE_NAME: {u'Keys': [KEY] * 10},
+        },
+    },
+    'batch_write_item': {
+        u'RequestItems': {
+            TABLE_NAME: [{u'PutRequest': {u'Item': ITEM}}] * 10,
+        },
+    },
+}
+
+NUMBER = 5000
+
+def main():
+    from onctuous import Schema
+    from ddbmock.validators import compile_validator
+    from ddbmock.validators.fast import CHECKS
+    from importlib import import_module
+
+    print "{:<18} {:>14} {:>14} {:>14}".format("operation", "schema (us)", "compiled (us)", "fast (us)")
+    for name, post in sorted(POSTS.items()):
+        post = dict(post, request_id='42')
+        schema = dict(import_module('ddbmock.validators.' + name).post, request_id=str)
+        validator = compile_validator(schema)
+
+        t_schema = timeit.timeit(lambda: Schema(schema, required=True)(post), number=NUMBER)
+        t_compiled = timeit.timeit(lambda: validator(post), number=NUMBER)
+        if name in CHECKS:
+            check = CHECKS[name]
+            t_fast = "{:>14.2f}".format(timeit.timeit(lambda: check(post), number=NUMBER)/NUMBER*1e6)
+        else:
+            t_fast = "{:>14}".format("-")
+        print "{:<18} {:>14.2f} {:>14.2f} {}".format(name, t_schema/NUMBER*1e6, t_compiled/NUMBER*1e6, t_fast)
+
+if __name__ == '__main__':
+    main()
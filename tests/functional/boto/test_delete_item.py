@@ -2,6 +2,7 @@
 
 import unittest
 import boto
+from ddbmock.database.key import encode_key
 
 TABLE_NAME = 'Table-HR'
 TABLE_NAME2 = 'Table-H'
@@ -20,6 +21,11 @@ HK_VALUE2 = u'456'
 HK_VALUE_404 = u'404'
 RK_VALUE = u'Decode this data if you are a coder'
 
+# keys as stored in the table's store
+HK_KEY = encode_key(TABLE_HK_TYPE, HK_VALUE)
+HK_KEY2 = encode_key(TABLE_HK_TYPE, HK_VALUE2)
+RK_KEY = encode_key(TABLE_RK_TYPE, RK_VALUE)
+
 
 ITEM = {
     TABLE_HK_NAME: {TABLE_HK_TYPE: HK_VALUE},
@@ -249,4 +255,4 @@ class TestDeleteItem(unittest.TestCase):
             db.layer1.delete_item,
             TABLE_NAME, key, expected=ddb_expected
         )
-        self.assertEqual(ITEM, self.t1.store[HK_VALUE, RK_VALUE])
+        self.assertEqual(ITEM, self.t1.store[HK_KEY, RK_KEY])
@@ -2,6 +2,7 @@
 
 import unittest
 import boto
+from ddbmock.database.key import encode_key
 
 TABLE_NAME = 'Table-HR'
 TABLE_NAME2 = 'Table-H'
@@ -19,6 +20,10 @@ TABLE_RK_TYPE = u'S'
 HK_VALUE = u'123'
 RK_VALUE = u'Decode this data if you are a coder'
 
+# keys as stored in the table's store
+HK_KEY = encode_key(TABLE_HK_TYPE, HK_VALUE)
+RK_KEY = encode_key(TABLE_RK_TYPE, RK_VALUE)
+
 
 ITEM = {
     TABLE_HK_NAME: {TABLE_HK_TYPE: HK_VALUE},
@@ -130,7 +135,7 @@ class TestPutItem(unittest.TestCase):
             },
             db.layer1.put_item(TABLE_NAME, ITEM),
         )
-        self.assertEqual(ITEM, self.t1.store[HK_VALUE, RK_VALUE])
+        self.assertEqual(ITEM, self.t1.store[HK_KEY, RK_KEY])
 
         self.assertEqual({
                 u'ConsumedCapacityUnits': 1,
@@ -150,7 +155,7 @@ class TestPutItem(unittest.TestCase):
             },
             db.layer1.put_item(TABLE_NAME2, ITEM3),
         )
-        self.assertEqual(ITEM3, self.t2.store[HK_VALUE, False])
+        self.assertEqual(ITEM3, self.t2.store[HK_KEY, False])
 
         self.assertEqual({
                 u'ConsumedCapacityUnits': 1,
@@ -260,7 +265,7 @@ class TestPutItem(unittest.TestCase):
             db.layer1.put_item,
             TABLE_NAME2, ITEM4, expected=ddb_expected
         )
-        self.assertEqual(ITEM3, self.t2.store[HK_VALUE, False])
+        self.assertEqual(ITEM3, self.t2.store[HK_KEY, False])
 
     def test_put_h_expect_field_value(self):
         from ddbmock import connect_boto_patch
@@ -277,9 +282,9 @@ class TestPutItem(unittest.TestCase):
         }
 
         db.layer1.put_item(TABLE_NAME2, ITEM3)
-        self.assertEqual(ITEM3, self.t2.store[HK_VALUE, False])
+        self.assertEqual(ITEM3, self.t2.store[HK_KEY, False])
         db.layer1.put_item(TABLE_NAME2, ITEM4, expected=ddb_expected)
-        self.assertEqual(ITEM4, self.t2.store[HK_VALUE, False])
+        self.assertEqual(ITEM4, self.t2.store[HK_KEY, False])
         self.assertRaisesRegexp(DynamoDBResponseError, 'ConditionalCheckFailedException',
             db.layer1.put_item,
             TABLE_NAME2, ITEM4, expected=ddb_expected
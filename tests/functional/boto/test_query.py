@@ -92,6 +92,26 @@ class TestQuery(unittest.TestCase):
         ret = db.layer1.query(TABLE_NAME, {TABLE_HK_TYPE: HK_VALUE})
         self.assertEqual(expected, ret)
 
+    def test_query_count(self):
+        from ddbmock import connect_boto_patch
+        from ddbmock.database.db import dynamodb
+
+        expected = {
+            u"Count": 3,
+            u"ConsumedCapacityUnits": 0.5,
+            u'LastEvaluatedKey': {
+                u'HashKeyElement': {u'N': u'123'},
+                u'RangeKeyElement': {u'S': u'Waldo-4'},
+            },
+        }
+
+        db = connect_boto_patch()
+
+        ret = db.layer1.query(TABLE_NAME, {TABLE_HK_TYPE: HK_VALUE},
+            {"AttributeValueList":[{"S":RK_VALUE2}],"ComparisonOperator":"GE"},
+            limit=3, count=True)
+        self.assertEqual(expected, ret)
+
     # Regression test for #9
     def test_query_all_404(self):
         from ddbmock import connect_boto_patch
@@ -263,3 +283,90 @@ class TestQuery(unittest.TestCase):
                           db.layer1.query,
                           TABLE_NAME, {TABLE_HK_TYPE: HK_VALUE}, condition, fields)
 
+
+    def test_query_condition_between_reverse_paged(self):
+        from ddbmock import connect_boto_patch
+        from ddbmock.database.db import dynamodb
+
+        esk = {
+            u'HashKeyElement': {u'N': u'123'},
+            u'RangeKeyElement': {u'S': u'Waldo-4'},
+        }
+
+        expected1 = {
+            u"Count": 1,
+            u"Items": [ITEM4],
+            u"ConsumedCapacityUnits": 0.5,
+            u'LastEvaluatedKey': esk,
+        }
+        expected2 = {
+            u"Count": 2,
+            u"Items": [ITEM3, ITEM2],
+            u"ConsumedCapacityUnits": 0.5,
+        }
+
+        condition = {
+            "AttributeValueList": [{"S": "Waldo-2"}, {"S": "Waldo-4"}],
+            "ComparisonOperator": "BETWEEN",
+        }
+
+        db = connect_boto_patch()
+
+        ret = db.layer1.query(TABLE_NAME, {TABLE_HK_TYPE: HK_VALUE}, condition,
+                              limit=1, scan_index_forward=False)
+        self.assertEqual(expected1, ret)
+        ret = db.layer1.query(TABLE_NAME, {TABLE_HK_TYPE: HK_VALUE}, condition,
+                              scan_index_forward=False, exclusive_start_key=esk)
+        self.assertEqual(expected2, ret)
+
+    def test_query_condition_begins_with(self):
+        from ddbmock import connect_boto_patch
+        from ddbmock.database.db import dynamodb
+
+        expected = {
+            u"Count": 5,
+            u"Items": [ITEM1, ITEM2, ITEM3, ITEM4, ITEM5],
+            u"ConsumedCapacityUnits": 0.5,
+        }
+
+        condition = {"AttributeValueList":[{"S":"Waldo-"}],"ComparisonOperator":"BEGINS_WITH"}
+
+        db = connect_boto_patch()
+
+        ret = db.layer1.query(TABLE_NAME, {TABLE_HK_TYPE: HK_VALUE}, condition)
+        self.assertEqual(expected, ret)
+
+    def test_query_condition_bad_type(self):
+        from ddbmock import connect_boto_patch
+        from ddbmock.database.db import dynamodb
+        from boto.dynamodb.exceptions import DynamoDBValidationError
+
+        condition = {"AttributeValueList":[{"N":"2"}],"ComparisonOperator":"GT"}
+
+        db = connect_boto_patch()
+
+        self.assertRaises(DynamoDBValidationError,
+                          db.layer1.query,
+                          TABLE_NAME, {TABLE_HK_TYPE: HK_VALUE}, condition)
+
+    def test_query_page_size_limit(self):
+        from ddbmock import connect_boto_patch
+        from ddbmock import config
+        import mock
+
+        expected = {
+            u"Count": 3,
+            u"Items": [ITEM1, ITEM2, ITEM3],
+            u"ConsumedCapacityUnits": 0.5,
+            u'LastEvaluatedKey': {
+                u'HashKeyElement': {u'N': u'123'},
+                u'RangeKeyElement': {u'S': u'Waldo-3'},
+            },
+        }
+
+        db = connect_boto_patch()
+
+        # each item is 49 bytes
+        with mock.patch.object(config, 'MAX_PAGE_SIZE', 100):
+            ret = db.layer1.query(TABLE_NAME, {TABLE_HK_TYPE: HK_VALUE})
+        self.assertEqual(expected, ret)
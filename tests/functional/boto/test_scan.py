@@ -93,7 +93,7 @@ class TestScan(unittest.TestCase):
         expected = {
             u"Count": 6,
             u"ScannedCount": 6,
-            u"Items": [ITEM2, ITEM1, ITEM6, ITEM5, ITEM4, ITEM3],
+            u"Items": [ITEM3, ITEM1, ITEM2, ITEM4, ITEM5, ITEM6],
             u"ConsumedCapacityUnits": 1.5,
         }
 
@@ -109,21 +109,21 @@ class TestScan(unittest.TestCase):
 
         esk = {
             u'HashKeyElement': {u'N': u'789'},
-            u'RangeKeyElement': {u'S': u'Waldo-5'},
+            u'RangeKeyElement': {u'S': u'Waldo-4'},
         }
 
         expected1 = {
             u"Count": 4,
             u"ScannedCount": 4,
-            u"Items": [ITEM2, ITEM1, ITEM6, ITEM5],
-            u"ConsumedCapacityUnits": 1.5,
+            u"Items": [ITEM3, ITEM1, ITEM2, ITEM4],
+            u"ConsumedCapacityUnits": 0.5,
             u'LastEvaluatedKey': esk,
         }
         expected2 = {
             u"Count": 2,
             u"ScannedCount": 2,
-            u"Items": [ITEM4, ITEM3],
-            u"ConsumedCapacityUnits": 0.5,
+            u"Items": [ITEM5, ITEM6],
+            u"ConsumedCapacityUnits": 1.5,
         }
 
         db = connect_boto_patch()
@@ -143,12 +143,12 @@ class TestScan(unittest.TestCase):
             u"Count": 6,
             u"ScannedCount": 6,
             u"Items": [
-                {u"relevant_data": {u"S": u"tete"}},
+                {u"relevant_data": {u"S": u"titi"}},
                 {u"relevant_data": {u"S": u"tata"}},
-                {u"relevant_data": {u"S": u"tyty"}},
-                {u"relevant_data": {u"S": u"tutu"}},
+                {u"relevant_data": {u"S": u"tete"}},
                 {u"relevant_data": {u"S": u"toto"}},
-                {u"relevant_data": {u"S": u"titi"}},
+                {u"relevant_data": {u"S": u"tutu"}},
+                {u"relevant_data": {u"S": u"tyty"}},
             ],
             u"ConsumedCapacityUnits": 1.5,
         }
@@ -168,9 +168,9 @@ class TestScan(unittest.TestCase):
             u"Count": 3,
             u"ScannedCount": 6,
             u"Items": [
+                {u"relevant_data": {u"S": u"titi"}},
                 {u"relevant_data": {u"S": u"tata"}},
                 {u"relevant_data": {u"S": u"toto"}},
-                {u"relevant_data": {u"S": u"titi"}},
             ],
             u"ConsumedCapacityUnits": 1.5,
         }
@@ -265,3 +265,33 @@ class TestScan(unittest.TestCase):
         self.assertRaises(DynamoDBValidationError, db.layer1.scan,
             TABLE_NAME, conditions, fields
         )
+
+    def test_scan_page_size_limit(self):
+        from ddbmock import connect_boto_patch
+        from ddbmock import config
+        import mock
+
+        expected = {
+            u"Count": 1,
+            u"ScannedCount": 3,
+            u"Items": [ITEM1],
+            u"ConsumedCapacityUnits": 0.5,
+            u'LastEvaluatedKey': {
+                u'HashKeyElement': {u'N': u'123'},
+                u'RangeKeyElement': {u'S': u'Waldo-2'},
+            },
+        }
+
+        conditions = {
+            "relevant_data": {
+                "AttributeValueList": [{"S":"tata"}],
+                "ComparisonOperator": "EQ",
+            },
+        }
+
+        db = connect_boto_patch()
+
+        # each small item is 49 bytes
+        with mock.patch.object(config, 'MAX_PAGE_SIZE', 100):
+            ret = db.layer1.scan(TABLE_NAME, conditions)
+        self.assertEqual(expected, ret)
@@ -14,7 +14,7 @@ HASH_KEY = {"AttributeName":"hash_key","KeyType":"N"}
 RANGE_KEY = {"AttributeName":"range_key","KeyType":"S"}
 
 class TestDBSchemaPersist(unittest.TestCase):
-    @mock.patch('ddbmock.database.db.Store')
+    @mock.patch('ddbmock.database.db.create_store')
     def test_db_schema_persistence(self, m_store):
         from ddbmock.database.db import DynamoDB
         from ddbmock.database import storage
@@ -1,5 +1,6 @@
 import json
 import unittest
+from ddbmock.database.key import encode_key
 
 TABLE_NAME = 'Table-HR'
 TABLE_NAME_404 = 'Waldo'
@@ -13,6 +14,10 @@ TABLE_RK_TYPE = u'S'
 HK_VALUE = u'123'
 RK_VALUE = u'Decode this data if you are a coder'
 
+# keys as stored in the table's store
+HK_KEY = encode_key(TABLE_HK_TYPE, HK_VALUE)
+RK_KEY = encode_key(TABLE_RK_TYPE, RK_VALUE)
+
 HK = {TABLE_HK_TYPE: HK_VALUE}
 RK = {TABLE_RK_TYPE: RK_VALUE}
 
@@ -63,4 +68,4 @@ class TestTODO(unittest.TestCase):
                          res.headers['Content-Type'])
 
         # Live data check
-        self.assertEqual(ITEM, self.t1.store[HK_VALUE, RK_VALUE])
+        self.assertEqual(ITEM, self.t1.store[HK_KEY, RK_KEY])
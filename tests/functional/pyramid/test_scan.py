@@ -106,9 +106,9 @@ class TestScan(unittest.TestCase):
             u"Count": 3,
             u"ScannedCount": 5,
             u"Items": [
+                {u"relevant_data": {u"S": u"titi"}},
                 {u"relevant_data": {u"S": u"tata"}},
                 {u"relevant_data": {u"S": u"toto"}},
-                {u"relevant_data": {u"S": u"titi"}},
             ],
             u"ConsumedCapacityUnits": 0.5,
         }
@@ -146,3 +146,79 @@ class TestScan(unittest.TestCase):
         self.assertEqual(expected, json.loads(res.body))
         self.assertEqual('application/x-amz-json-1.0; charset=UTF-8',
                          res.headers['Content-Type'])
+
+    def test_scan_count(self):
+        request = {
+            "TableName": TABLE_NAME,
+            "ScanFilter": {
+                "relevant_data": {
+                    "AttributeValueList": [
+                        {"S":"toto"},
+                        {"S":"titi"},
+                        {"S":"tata"},
+                        ],
+                    "ComparisonOperator": "IN",
+                },
+            },
+            "Count": True,
+        }
+
+        expected = {
+            u"Count": 3,
+            u"ScannedCount": 5,
+            u"ConsumedCapacityUnits": 0.5,
+        }
+
+        res = self.app.post_json('/', request, headers=HEADERS, status=200)
+        self.assertEqual(expected, json.loads(res.body))
+
+    def test_scan_segments(self):
+        items = []
+        for segment in range(3):
+            request = {
+                "TableName": TABLE_NAME,
+                "Segment": segment,
+                "TotalSegments": 3,
+            }
+
+            res = self.app.post_json('/', request, headers=HEADERS, status=200)
+            items.extend(json.loads(res.body)[u'Items'])
+
+        key = lambda item: item[u'relevant_data'][u'S']
+        self.assertEqual(sorted([ITEM1, ITEM2, ITEM3, ITEM4, ITEM5], key=key),
+                         sorted(items, key=key))
+
+    def test_scan_segment_without_total_fails(self):
+        request = {
+            "TableName": TABLE_NAME,
+            "Segment": 1,
+        }
+
+        expected = {
+            u'__type': u'com.amazonaws.dynamodb.v20120810#ValidationException',
+            u'message': u'Segment and TotalSegments must be specified together'
+        }
+
+        res = self.app.post_json('/', request, headers=HEADERS, status=400)
+        self.assertEqual(expected, json.loads(res.body))
+
+    def test_scan_segment_out_of_range_fails(self):
+        request = {
+            "TableName": TABLE_NAME,
+            "Segment": 3,
+            "TotalSegments": 3,
+        }
+
+        res = self.app.post_json('/', request, headers=HEADERS, status=400)
+        self.assertIn(u'ValidationException', json.loads(res.body)[u'__type'])
+
+    def test_scan_count_false(self):
+        request = {
+            "TableName": TABLE_NAME,
+            "Count": False,
+        }
+
+        res = self.app.post_json('/', request, headers=HEADERS, status=200)
+        body = json.loads(res.body)
+        self.assertEqual(5, body[u'Count'])
+        self.assertEqual(5, len(body[u'Items']))
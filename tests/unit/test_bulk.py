@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+import unittest, mock, json
+from StringIO import StringIO
+
+# tests
+# - import
+# - import by batches
+# - import DynamoDB export format
+# - export
+# - command line
+
+TABLE_NAME = 'Table-HR'
+
+ITEM1 = {u'hash_key': {u'N': u'1'}, u'range_key': {u'S': u'Waldo-1'}, u'relevant_data': {u'S': u'tata'}}
+ITEM2 = {u'hash_key': {u'N': u'1'}, u'range_key': {u'S': u'Waldo-2'}, u'relevant_data': {u'S': u'titi'}}
+ITEM3 = {u'hash_key': {u'N': u'2'}, u'range_key': {u'S': u'Waldo-3'}, u'relevant_data': {u'SS': [u'toto', u'tutu']}}
+ITEMS = [ITEM1, ITEM2, ITEM3]
+
+def dump(items):
+    return StringIO(''.join(json.dumps(item) + '\n' for item in items))
+
+class TestBulk(unittest.TestCase):
+    def setUp(self):
+        from ddbmock.database.db import dynamodb
+        from ddbmock.database.table import Table
+        from ddbmock.database.key import PrimaryKey
+
+        dynamodb.hard_reset()
+        self.t1 = Table(TABLE_NAME, 10, 10, PrimaryKey(u'hash_key', u'N'), PrimaryKey(u'range_key', u'S'))
+        dynamodb.data[TABLE_NAME] = self.t1
+
+    def tearDown(self):
+        from ddbmock.database.db import dynamodb
+        dynamodb.hard_reset()
+
+    def sorted_items(self):
+        key = lambda item: item[u'range_key'][u'S']
+        return sorted(self.t1.scan({}, [], None, 0).items, key=key)
+
+    def test_import(self):
+        from ddbmock.bulk import import_items
+
+        self.assertEqual(3, import_items(self.t1, dump(ITEMS)))
+        self.assertEqual(ITEMS, self.sorted_items())
+        self.assertEqual(3, self.t1.get_stats()[0])
+
+    def test_import_batches(self):
+        from ddbmock.bulk import import_items
+
+        with mock.patch.object(self.t1, 'batch', wraps=self.t1.batch) as m_batch:
+            self.assertEqual(3, import_items(self.t1, dump(ITEMS), batch_size=2))
+
+        self.assertEqual(2, m_batch.call_count)
+        self.assertEqual(ITEMS, self.sorted_items())
+
+    def test_import_export_format(self):
+        from ddbmock.bulk import import_items
+
+        lines = StringIO(dump({u'Item': item} for item in ITEMS).getvalue() + '\n')
+
+        self.assertEqual(3, import_items(self.t1, lines))
+        self.assertEqual(ITEMS, self.sorted_items())
+
+    def test_import_invalid(self):
+        from ddbmock.bulk import import_items
+        from ddbmock.errors import ValidationException
+
+        lines = dump([{u'relevant_data': {u'S': u'tata'}}])
+        self.assertRaises(ValidationException, import_items, self.t1, lines)
+
+    def test_export(self):
+        from ddbmock.bulk import import_items, export_items
+
+        import_items(self.t1, dump(ITEMS))
+        out = StringIO()
+
+        self.assertEqual(3, export_items(self.t1, out))
+
+        lines = out.getvalue().splitlines()
+        key = lambda item: item[u'range_key'][u'S']
+        self.assertEqual(ITEMS, sorted(map(json.loads, lines), key=key))
+
+    def test_main(self):
+        from ddbmock.database.db import dynamodb
+        from ddbmock.bulk import main
+        import tempfile, shutil, os
+
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, 'items.jsonl')
+            snapshot = os.path.join(tmp, 'dynamo.snapshot')
+            with open(path, 'wb') as f:
+                f.write(dump(ITEMS).getvalue())
+            dynamodb.snapshot(snapshot)
+
+            with mock.patch('sys.stderr'):
+                main(['import', TABLE_NAME, path, '--snapshot', snapshot])
+                self.t1 = dynamodb.get_table(TABLE_NAME)
+                self.assertEqual(ITEMS, self.sorted_items())
+
+                out = os.path.join(tmp, 'out.jsonl')
+                main(['export', TABLE_NAME, out, '--snapshot', snapshot])
+                with open(out, 'rb') as f:
+                    self.assertEqual(3, len(f.readlines()))
+
+                # memory engine, no snapshot: no table
+                self.assertRaises(SystemExit, main, ['export', TABLE_NAME, out])
+        finally:
+            shutil.rmtree(tmp)
+
+    def assertMainEngine(self, engine, options, create_store):
+        from ddbmock.database.db import dynamodb
+        from ddbmock.database.table import Table
+        from ddbmock.database.key import PrimaryKey
+        from ddbmock.database.storage import sqlite
+        from ddbmock.bulk import main
+        from ddbmock import config
+        import tempfile, shutil, os
+
+        tmp = tempfile.mkdtemp()
+        options = [option.format(tmp) for option in options]
+        try:
+            path = os.path.join(tmp, 'items.jsonl')
+            with open(path, 'wb') as f:
+                f.write(dump(ITEMS).getvalue())
+
+            with mock.patch.multiple(config, STORAGE_ENGINE_NAME=config.STORAGE_ENGINE_NAME,
+                                     STORAGE_SQLITE_FILE=config.STORAGE_SQLITE_FILE,
+                                     STORAGE_LOG_DIR=config.STORAGE_LOG_DIR), \
+                 mock.patch.object(sqlite, 'pool', sqlite.pool):
+                # table persisted by the engine, but not loaded
+                with mock.patch.multiple(config, STORAGE_SQLITE_FILE=os.path.join(tmp, 'dynamo.db'),
+                                         STORAGE_LOG_DIR=tmp):
+                    sqlite.pool = sqlite.ConnectionPool(config.STORAGE_SQLITE_FILE)
+                    table = Table(TABLE_NAME, 10, 10, PrimaryKey(u'hash_key', u'N'),
+                                  PrimaryKey(u'range_key', u'S'), engine=engine)
+                    create_store('~*schema*~')[TABLE_NAME, False] = table
+                sqlite.pool = sqlite.ConnectionPool(':memory:')
+
+                with mock.patch('sys.stderr'):
+                    main(['import', TABLE_NAME, path, '--engine', engine] + options)
+
+                table = dynamodb.get_table(TABLE_NAME)
+                self.assertEqual(engine, table.engine)
+                self.assertEqual(3, len(list(table.store.scan())))
+                dynamodb.hard_reset()
+        finally:
+            dynamodb.load()
+            shutil.rmtree(tmp)
+
+    def test_main_sqlite(self):
+        from ddbmock.database.storage import sqlite
+        self.assertMainEngine('sqlite', ['--sqlite-file', '{}/dynamo.db'], sqlite.Store)
+
+    def test_main_log(self):
+        from ddbmock.database.storage import log
+        self.assertMainEngine('log', ['--log-dir', '{}'], log.Store)
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from threading import Thread
+
+# tests
+# - hash_key to stripe mapping
+# - lock all stripes
+
+class TestStripedLock(unittest.TestCase):
+    def test_stripe(self):
+        from ddbmock.database.lock import StripedLock
+
+        lock = StripedLock(4)
+
+        self.assertEqual(4, len(lock.locks))
+        self.assertIs(lock['toto'], lock['toto'])
+        self.assertIn(lock['toto'], lock.locks)
+
+        # all hash_keys share the only lock
+        lock = StripedLock(1)
+        self.assertIs(lock['toto'], lock['titi'])
+
+    def test_lock_all(self):
+        from ddbmock.database.lock import StripedLock
+
+        lock = StripedLock(4)
+
+        def locked():
+            # from an other thread as locks are reentrant
+            ret = []
+            def worker():
+                for l in lock.locks:
+                    if l.acquire(False):
+                        l.release()
+                        ret.append(False)
+                    else:
+                        ret.append(True)
+            thread = Thread(target=worker)
+            thread.start()
+            thread.join()
+            return ret
+
+        with lock:
+            self.assertEqual([True]*4, locked())
+            # reentrant
+            with lock['toto']:
+                pass
+        self.assertEqual([False]*4, locked())
+
+        # released on error too
+        try:
+            with lock:
+                raise ValueError()
+        except ValueError:
+            pass
+        self.assertEqual([False]*4, locked())
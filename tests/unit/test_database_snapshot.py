@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import unittest, mock
+
+# tests
+# - snapshot / restore round trip
+# - items are loaded lazily
+# - stores without lazy loading
+# - invalid file
+
+TABLE_NAME1 = 'Table-1'
+TABLE_NAME2 = 'Table-2'
+
+
+ITEM1 = {u'hash_key': {u'N': u'1'}, u'range_key': {u'S': u'Waldo-1'}, u'relevant_data': {u'S': u'tata'}}
+ITEM2 = {u'hash_key': {u'N': u'1'}, u'range_key': {u'S': u'Waldo-2'}, u'relevant_data': {u'S': u'titi'}}
+ITEM3 = {u'hash_key': {u'S': u'toto'}, u'relevant_data': {u'SS': [u'tata', u'titi']}}
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        from ddbmock.database.db import dynamodb
+        from ddbmock.database.table import Table
+        from ddbmock.database.key import PrimaryKey
+        import tempfile, os
+
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'dynamo.snapshot')
+
+        dynamodb.hard_reset()
+        t1 = Table(TABLE_NAME1, 10, 10, PrimaryKey(u'hash_key', u'N'), PrimaryKey(u'range_key', u'S'))
+        t2 = Table(TABLE_NAME2, 10, 10, PrimaryKey(u'hash_key', u'S'), None)
+        dynamodb.data[TABLE_NAME1] = t1
+        dynamodb.data[TABLE_NAME2] = t2
+        t1.put(ITEM1, {})
+        t1.put(ITEM2, {})
+        t2.put(ITEM3, {})
+
+    def tearDown(self):
+        from ddbmock.database.db import dynamodb
+        import shutil
+
+        dynamodb.hard_reset()
+        shutil.rmtree(self.dir)
+
+    def assertRestored(self):
+        from ddbmock.database.db import dynamodb
+
+        t1 = dynamodb.get_table(TABLE_NAME1)
+        t2 = dynamodb.get_table(TABLE_NAME2)
+
+        self.assertEqual(u'ACTIVE', t1.status)
+        self.assertEqual([ITEM1, ITEM2], list(t1.query({u'N': u'1'}, None, [], None, False, None).items))
+        self.assertEqual(ITEM3, t2.get({u'HashKeyElement': {u'S': u'toto'}}, []))
+        self.assertEqual((2, self.stats1), t1.get_stats())
+        self.assertEqual((1, self.stats2), t2.get_stats())
+
+    def test_round_trip(self):
+        from ddbmock.database.db import dynamodb
+        from ddbmock.database.storage.memory import LazyItem
+
+        self.stats1 = dynamodb.get_table(TABLE_NAME1).get_size()
+        self.stats2 = dynamodb.get_table(TABLE_NAME2).get_size()
+
+        dynamodb.snapshot(self.path)
+        dynamodb.hard_reset()
+        dynamodb.restore(self.path)
+
+        self.assertEqual(sorted([TABLE_NAME1, TABLE_NAME2]), sorted(dynamodb.list_tables()))
+
+        # nothing deserialized yet, stats come from the snapshot index
+        bucket = dynamodb.get_table(TABLE_NAME2).store.data.values()[0]
+        self.assertEqual((1, self.stats2), dynamodb.get_table(TABLE_NAME2).get_stats())
+        self.assertIsInstance(dict.values(bucket)[0], LazyItem)
+
+        self.assertRestored()
+
+
+    def test_restore_eager(self):
+        from ddbmock.database.db import dynamodb
+
+        self.stats1 = dynamodb.get_table(TABLE_NAME1).get_size()
+        self.stats2 = dynamodb.get_table(TABLE_NAME2).get_size()
+        dynamodb.snapshot(self.path)
+
+        # cached store is not a memory store
+        with mock.patch('ddbmock.config.STORAGE_CACHE_SIZE', 1024):
+            dynamodb.restore(self.path)
+            self.assertRestored()
+
+    def test_restore_invalid(self):
+        from ddbmock.database.db import dynamodb
+
+        with open(self.path, 'wb') as f:
+            f.write('Waldo was here')
+
+        self.assertRaises(ValueError, dynamodb.restore, self.path)
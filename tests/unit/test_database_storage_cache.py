@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+import unittest, mock
+
+# tests
+# - hits and misses
+# - LRU eviction by size
+# - invalidation
+# - read racing with a write
+
+NAME = 'test_table'
+HASH = 'hash_key'
+RANGE1 = 'range_key 1'
+RANGE2 = 'range_key 2'
+RANGE3 = 'range_key 3'
+RANGE_404 = 'range_key 404'
+
+ITEM1 = {u'relevant_data': {u'S': u'tata'}}
+ITEM2 = {u'relevant_data': {u'S': u'titi'}}
+ITEM3 = {u'relevant_data': {u'S': u'toto'}}
+
+class TestCachedStore(unittest.TestCase):
+    def setUp(self):
+        from ddbmock.database.storage.memory import Store
+        from ddbmock.database.storage.cache import CachedStore
+        from ddbmock.database.item import Item
+
+        self.items = [Item(ITEM1), Item(ITEM2), Item(ITEM3)]
+        self.item_size = self.items[0].get_size()
+
+        self.backend = Store(NAME)
+        self.backend[HASH, RANGE1] = self.items[0]
+        self.backend[HASH, RANGE2] = self.items[1]
+        self.backend[HASH, RANGE3] = self.items[2]
+
+        # room for 2 items
+        self.store = CachedStore(self.backend, 2*self.item_size)
+
+    def test_hits_misses(self):
+        self.assertEqual(ITEM1, self.store[HASH, RANGE1])
+        self.assertEqual(ITEM1, self.store[HASH, RANGE1])
+        self.assertRaises(KeyError, self.store.__getitem__, (HASH, RANGE_404))
+
+        self.assertEqual(1, self.store.hits)
+        self.assertEqual(2, self.store.misses)
+        self.assertEqual(self.item_size, self.store.size)
+
+        # whole hash_key reads are not cached
+        self.assertEqual(3, len(self.store[HASH, None]))
+        self.assertEqual(1, self.store.hits)
+
+    def test_lru_eviction(self):
+        self.store[HASH, RANGE1]
+        self.store[HASH, RANGE2]
+        self.store[HASH, RANGE1]  # RANGE2 is now the least recently used
+        self.store[HASH, RANGE3]
+
+        self.assertEqual([(HASH, RANGE1), (HASH, RANGE3)], self.store.items.keys())
+        self.assertEqual(2*self.item_size, self.store.size)
+
+    def test_too_big(self):
+        from ddbmock.database.storage.cache import CachedStore
+
+        store = CachedStore(self.backend, self.item_size - 1)
+        self.assertEqual(ITEM1, store[HASH, RANGE1])
+        self.assertEqual(0, len(store.items))
+        self.assertEqual(0, store.size)
+
+    def test_invalidation(self):
+        from ddbmock.database.item import Item
+
+        self.store[HASH, RANGE1]
+        self.store[HASH, RANGE2]
+
+        self.store[HASH, RANGE1] = Item(ITEM3)
+        self.assertEqual(ITEM3, self.store[HASH, RANGE1])
+        self.assertEqual(ITEM3, self.backend[HASH, RANGE1])
+
+        del self.store[HASH, RANGE2]
+        self.assertRaises(KeyError, self.store.__getitem__, (HASH, RANGE2))
+
+        self.store.truncate()
+        self.assertEqual(0, self.store.size)
+        self.assertRaises(KeyError, self.store.__getitem__, (HASH, RANGE1))
+
+    def test_read_racing_write(self):
+        from ddbmock.database.item import Item
+
+        backend_get = self.backend.__class__.__getitem__
+
+        def slow_get(store, key):
+            # a write completes while the item is being read
+            item = backend_get(store, key)
+            self.store[key] = Item(ITEM3)
+            return item
+
+        with mock.patch.object(self.backend.__class__, '__getitem__', slow_get):
+            self.assertEqual(ITEM1, self.store[HASH, RANGE1])
+
+        # stale item was not cached
+        self.assertEqual(ITEM3, self.store[HASH, RANGE1])
+
+    def test_delegation(self):
+        self.assertEqual(self.items, list(self.store.range_query(HASH)))
+        self.assertEqual(self.items[:1], list(self.store.range_query(HASH, limit=1)))
+        self.assertEqual(self.items, list(self.store.scan()))
+        self.assertEqual(self.items, sorted(self.store, key=lambda item: item[u'relevant_data'][u'S']))
+        with self.store.batch():
+            pass
+
+    @mock.patch('ddbmock.config.STORAGE_CACHE_SIZE', 1024)
+    def test_table_cache(self):
+        from ddbmock.database.table import Table
+        from ddbmock.database.key import PrimaryKey
+        from ddbmock.database.storage.cache import CachedStore
+
+        table = Table(NAME, 10, 10, PrimaryKey(u'hash_key', u'N'), None)
+        self.assertIsInstance(table.store, CachedStore)
+
+        key = {u'HashKeyElement': {u'N': u'1'}}
+        item = {u'hash_key': {u'N': u'1'}}
+        table.put(item, {})
+        self.assertEqual(item, table.get(key, []))
+        self.assertEqual(item, table.get(key, []))
+        self.assertEqual(1, table.store.hits)
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import unittest, mock
+
+# tests
+# - round trip with all codecs
+# - non Item values
+# - codec registration
+
+ITEM = {
+    u'hash_key': {u'N': u'123'},
+    u'range_key': {u'S': u'Waldo ç'},
+    u'relevant_data': {u'SS': [u'tata', u'titi']},
+}
+
+class TestCodec(unittest.TestCase):
+    def test_round_trip(self):
+        from ddbmock.database.storage.codec import encode, decode, CODECS
+        from ddbmock.database.item import Item
+
+        for codec in ['pickle'] + CODECS.keys():
+            data = encode(Item(ITEM), codec)
+            self.assertIsInstance(data, str)
+
+            item = decode(data)
+            self.assertIsInstance(item, Item)
+            self.assertEqual(ITEM, item)
+
+    @mock.patch('ddbmock.config.STORAGE_ITEM_CODEC', 'json')
+    def test_default_codec(self):
+        from ddbmock.database.storage.codec import encode
+        from ddbmock.database.item import Item
+
+        self.assertEqual('j', encode(Item(ITEM))[0])
+
+    def test_not_item(self):
+        from ddbmock.database.storage.codec import encode, decode, PICKLE_TAG
+
+        data = encode(ITEM, 'marshal')
+        self.assertEqual(PICKLE_TAG, data[0])
+        self.assertEqual(ITEM, decode(data))
+
+    def test_register_codec(self):
+        from ddbmock.database.storage.codec import register_codec, encode, decode, CODECS, _DECODERS
+        from ddbmock.database.item import Item
+
+        self.assertRaises(ValueError, register_codec, 'other', 'm', repr, eval)
+
+        with mock.patch.dict(CODECS), mock.patch.dict(_DECODERS):
+            register_codec('repr', 'r', repr, eval)
+            data = encode(Item(ITEM), 'repr')
+            self.assertEqual('r', data[0])
+            self.assertEqual(ITEM, decode(data))
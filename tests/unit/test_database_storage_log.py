@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+import unittest, mock
+
+# tests
+# - writes are replayed
+# - compaction
+# - incomplete trailing record
+# - truncate
+# - batch
+
+TABLE_NAME = 'test_table'
+HASH1 = 'hash_key 1'
+HASH2 = 'hash_key 2'
+RANGE1 = 'range_key 1'
+RANGE2 = 'range_key 2'
+
+ITEM1 = {u'relevant_data': {u'S': u'tata'}}
+ITEM2 = {u'relevant_data': {u'S': u'titi'}}
+ITEM3 = {u'relevant_data': {u'S': u'toto'}}
+
+class TestLogStore(unittest.TestCase):
+    def setUp(self):
+        import tempfile, os
+        self.dir = tempfile.mkdtemp()
+        self.patch = mock.patch('ddbmock.config.STORAGE_LOG_DIR', os.path.join(self.dir, 'log'))
+        self.patch.start()
+
+    def tearDown(self):
+        import shutil
+        self.patch.stop()
+        shutil.rmtree(self.dir)
+
+    def fill(self):
+        from ddbmock.database.storage.log import Store
+        from ddbmock.database.item import Item
+
+        store = Store(TABLE_NAME)
+        store[HASH1, RANGE1] = Item(ITEM1)
+        store[HASH1, RANGE2] = Item(ITEM2)
+        store[HASH2, False] = Item(ITEM2)
+        store[HASH2, False] = Item(ITEM3)
+        del store[HASH1, RANGE2]
+        return store
+
+    def test_replay(self):
+        from ddbmock.database.storage.log import Store
+        from ddbmock.database.item import Item
+
+        expected = list(self.fill().scan())
+
+        store = Store(TABLE_NAME)
+        self.assertEqual(expected, list(store.scan()))
+        self.assertEqual(ITEM1, store[HASH1, RANGE1])
+        self.assertIsInstance(store[HASH1, RANGE1], Item)
+        self.assertEqual(ITEM3, store[HASH2, False])
+        self.assertRaises(KeyError, store.__getitem__, (HASH1, RANGE2))
+
+        # tables do not share files
+        self.assertEqual([], list(Store('other_table')))
+
+    def test_compact(self):
+        from ddbmock.database.storage.log import Store
+        import os
+
+        with mock.patch('ddbmock.config.STORAGE_LOG_COMPACT_SIZE', 200):
+            store = self.fill()
+            self.assertTrue(os.path.exists(store.snapshot_path))
+            self.assertLess(store.log_size, 200)
+            self.assertEqual(store.log_size, os.path.getsize(store.log_path))
+
+        store.compact()
+        self.assertEqual(0, os.path.getsize(store.log_path))
+
+        store = Store(TABLE_NAME)
+        self.assertEqual(ITEM1, store[HASH1, RANGE1])
+        self.assertEqual(ITEM3, store[HASH2, False])
+        self.assertRaises(KeyError, store.__getitem__, (HASH1, RANGE2))
+
+    def test_incomplete_record(self):
+        from ddbmock.database.storage.log import Store
+        from ddbmock.database.item import Item
+
+        store = self.fill()
+        size = store.log_size
+        store.log.write('\x00\x00\x01\x00garbage')
+        store.log.flush()
+
+        store = Store(TABLE_NAME)
+        self.assertEqual(size, store.log_size)
+        store[HASH1, RANGE2] = Item(ITEM2)
+
+        store = Store(TABLE_NAME)
+        self.assertEqual(ITEM2, store[HASH1, RANGE2])
+
+    def test_truncate(self):
+        from ddbmock.database.storage.log import Store
+
+        self.fill().truncate()
+        self.assertEqual([], list(Store(TABLE_NAME)))
+
+    def test_batch(self):
+        from ddbmock.database.item import Item
+        import os
+
+        store = self.fill()
+        size = os.path.getsize(store.log_path)
+
+        with store.batch():
+            store[HASH1, RANGE2] = Item(ITEM2)
+            with store.batch():
+                store[HASH1, RANGE1] = Item(ITEM2)
+            # not flushed yet
+            self.assertEqual(size, os.path.getsize(store.log_path))
+        self.assertEqual(store.log_size, os.path.getsize(store.log_path))
+
+    def test_schema(self):
+        from ddbmock.database.storage.log import Store
+        from ddbmock.database.table import Table
+        from ddbmock.database.key import PrimaryKey
+
+        table = Table(TABLE_NAME, 10, 10, PrimaryKey(u'hash_key', u'N'), None, engine='log')
+        table.put({u'hash_key': {u'N': u'1'}}, {})
+
+        schema = Store('~*schema*~')
+        schema[TABLE_NAME, False] = table
+
+        table = list(Store('~*schema*~'))[0]
+        self.assertEqual(TABLE_NAME, table.name)
+        self.assertEqual('log', table.engine)
+        self.assertEqual(1, table.get_stats()[0])
@@ -79,3 +79,252 @@ class TestMemoryStore(unittest.TestCase):
         ms.data[HASH][RANGE2] = DATA2
 
         self.assertEqual([DATA1, DATA2], list(ms))
+
+    def test_range_query(self):
+        from ddbmock.database.storage.memory import Store
+
+        ms = Store(NAME)
+
+        ms[HASH, RANGE2] = DATA2
+        ms[HASH, RANGE_404] = DATA1
+        ms[HASH, RANGE1] = DATA1
+        del ms[HASH, RANGE_404]
+
+        self.assertEqual([RANGE1, RANGE2], list(ms.data[HASH].sorted_keys))
+        self.assertEqual([DATA1, DATA2], list(ms.range_query(HASH)))
+        self.assertEqual([DATA2, DATA1], list(ms.range_query(HASH, reverse=True)))
+        self.assertEqual([DATA2], list(ms.range_query(HASH, RANGE2)))
+        self.assertEqual([DATA1], list(ms.range_query(HASH, None, RANGE2)))
+        self.assertEqual([DATA1], list(ms.range_query(HASH, None, RANGE2, True)))
+        self.assertEqual([DATA2], list(ms.range_query(HASH, RANGE2, None, True)))
+        self.assertEqual([DATA2], list(ms.range_query(HASH, RANGE1 + "a", RANGE2 + "a")))
+        self.assertEqual([], list(ms.range_query(HASH, RANGE1 + "a", RANGE2)))
+        self.assertEqual([DATA1], list(ms.range_query(HASH, limit=1)))
+        self.assertEqual([DATA2], list(ms.range_query(HASH, reverse=True, limit=1)))
+        self.assertEqual([], list(ms.range_query(HASH_404)))
+        self.assertNotIn(HASH_404, ms.data)
+
+    def test_range_query_concurrent_update(self):
+        from ddbmock.database.storage.memory import Store
+
+        ms = Store(NAME)
+
+        ms[HASH, RANGE1] = DATA1
+        ms[HASH, RANGE_404] = DATA2
+
+        items = ms.range_query(HASH)
+        self.assertEqual(DATA1, next(items))
+
+        # insert before the cursor, remove after it
+        ms[HASH, "range_key 0"] = DATA2
+        del ms[HASH, RANGE_404]
+        ms[HASH, RANGE2] = DATA2
+
+        self.assertEqual([DATA2], list(items))
+
+    def test_scan(self):
+        from ddbmock.database.storage.memory import Store
+        from ddbmock.database.key import hash_token
+
+        ms = Store(NAME)
+
+        ms[HASH, RANGE2] = (HASH, RANGE2)
+        ms[HASH, RANGE1] = (HASH, RANGE1)
+        ms[HASH_404, RANGE1] = (HASH_404, RANGE1)
+
+        expected = sorted([(HASH, RANGE1), (HASH, RANGE2), (HASH_404, RANGE1)],
+                          key=lambda (h, r): (hash_token(h), h, r))
+        self.assertEqual(expected, list(ms.scan()))
+
+    def test_scan_resume(self):
+        from ddbmock.database.storage.memory import Store
+
+        ms = Store(NAME)
+
+        keys = [(h, r) for h in ["h1", "h2", "h3"] for r in ["r1", "r2"]]
+        for key in keys:
+            ms[key] = key
+
+        expected = list(ms.scan())
+        self.assertEqual(sorted(keys), sorted(expected))
+
+        # resume after each item, including a deleted one
+        for i, key in enumerate(expected):
+            self.assertEqual(expected[i+1:], list(ms.scan(*key)))
+        del ms[expected[2]]
+        self.assertEqual(expected[3:], list(ms.scan(*expected[2])))
+
+    def test_scan_missing_bucket(self):
+        from ddbmock.database.storage.memory import Store
+        from ddbmock.database.key import hash_token
+
+        ms = Store(NAME)
+
+        keys = [("h%d" % h, "r") for h in range(50)]
+        for key in keys:
+            ms[key] = key
+
+        # token registered, bucket not there (yet or anymore)
+        expected = list(ms.scan())
+        ms.hash_keys.add((hash_token(HASH_404), HASH_404))
+        self.assertEqual(expected, list(ms.scan()))
+
+        del ms.data[expected[0][0]]
+        self.assertEqual(expected[1:], list(ms.scan()))
+
+    def test_drop_empty_bucket(self):
+        from ddbmock.database.storage.memory import Store
+
+        ms = Store(NAME)
+
+        ms[HASH, RANGE1] = DATA1
+        ms[HASH_404, RANGE1] = DATA2
+        items = ms.scan()
+        del ms[HASH, RANGE1]
+        del ms[HASH_404, RANGE1]
+
+        self.assertNotIn(HASH, ms.data)
+        self.assertEqual(0, len(ms.hash_keys))
+        self.assertEqual([], list(items))
+
+        ms[HASH, RANGE2] = DATA2
+        self.assertEqual([DATA2], list(ms.scan()))
+
+    @mock.patch("ddbmock.database.storage.memory.SortedKeys.CHUNK_SIZE", 4)
+    def test_concurrent_reads_and_writes(self):
+        from ddbmock.database.storage.memory import Store
+        from threading import Thread
+        import random, sys, time
+
+        ms = Store(NAME)
+        range_keys = range(200)
+        hash_keys = ["h%d" % h for h in range(200)]
+        for range_key in range_keys:
+            ms[HASH, range_key] = range_key
+        for hash_key in hash_keys:
+            ms[hash_key, 0] = 0
+
+        errors = []
+        stop = time.time() + 0.5
+
+        def run(target):
+            def worker():
+                try:
+                    while time.time() < stop:
+                        target()
+                except Exception:
+                    errors.append(sys.exc_info())
+            return Thread(target=worker)
+
+        def write():
+            rand = random.Random(42)
+            while time.time() < stop:
+                key = (HASH, rand.choice(range_keys))
+                if key[1] in ms.data.get(HASH, ()):
+                    del ms[key]
+                else:
+                    ms[key] = key[1]
+                # create and drop whole buckets for Scan
+                key = (rand.choice(hash_keys), 0)
+                if key[0] in ms.data:
+                    del ms[key]
+                else:
+                    ms[key] = 0
+
+        def query():
+            found = list(ms.range_query(HASH, 10, 190))
+            self.assertEqual(sorted(set(found)), found)
+            found = list(ms.range_query(HASH, reverse=True))
+            self.assertEqual(sorted(set(found), reverse=True), found)
+
+        def scan():
+            list(ms.scan())
+
+        threads = [run(write), run(query), run(scan)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0][0], errors[0][1], errors[0][2]
+
+    def test_scan_segments(self):
+        from ddbmock.database.storage.memory import Store
+        from ddbmock.database.key import hash_segment
+
+        ms = Store(NAME)
+
+        keys = [("h%d" % h, r) for h in range(20) for r in ["r1", "r2"]]
+        for key in keys:
+            ms[key] = key
+
+        items = []
+        for segment in range(4):
+            segment_items = list(ms.scan(segment=segment, total_segments=4))
+            for h, r in segment_items:
+                self.assertEqual(segment, hash_segment(h, 4))
+            # resume in the segment
+            self.assertEqual(segment_items[1:],
+                             list(ms.scan(*segment_items[0], segment=segment, total_segments=4)))
+            items.extend(segment_items)
+
+        self.assertEqual(sorted(keys), sorted(items))
+
+    def test_lazy_item(self):
+        from ddbmock.database.storage.memory import Store, LazyItem
+        from ddbmock.database.storage.codec import encode
+        from ddbmock.database.item import Item
+
+        ms = Store(NAME)
+        data = 'garbage' + encode(Item(DATA1))
+        ms[HASH, RANGE1] = LazyItem(data, 7, len(data))
+
+        lazy = dict.__getitem__(ms.data[HASH], RANGE1)
+        self.assertIsNone(lazy.item)
+
+        self.assertEqual(DATA1, ms[HASH, RANGE1])
+        self.assertIs(ms[HASH, RANGE1], ms[HASH, RANGE1])
+        self.assertEqual([DATA1], list(ms))
+
+    def test_sorted_keys(self):
+        from ddbmock.database.storage.memory import SortedKeys
+        import random
+
+        rand = random.Random(42)
+        values = range(500)
+        rand.shuffle(values)
+
+        class SmallKeys(SortedKeys):
+            __slots__ = ()
+            CHUNK_SIZE = 4  # many chunks, many splits
+
+        keys = SmallKeys(values[:100])
+        expected = set(values[:100])
+        for value in values[100:] + values[100:110]:
+            keys.add(value)
+            expected.add(value)
+        for value in values[:300:2]:
+            keys.discard(value)
+            expected.discard(value)
+        keys.discard(-1)
+
+        expected = sorted(expected)
+        self.assertEqual(len(expected), len(keys))
+        self.assertEqual(expected, list(keys))
+        self.assertTrue(len(keys.chunks) > 10)
+
+        for low, high, last in [(None, None, None), (10, 20, None), (10.5, 200.5, None),
+                                (None, 30, 15), (None, None, 499), (600, None, None),
+                                (None, -5, None), (None, None, 200.5)]:
+            self.assertEqual([k for k in expected
+                              if (low is None or k >= low) and (high is None or k < high)
+                              and (last is None or k > last)],
+                             list(keys.irange(low, high, False, last)))
+            self.assertEqual([k for k in reversed(expected)
+                              if (low is None or k >= low) and (high is None or k < high)
+                              and (last is None or k < last)],
+                             list(keys.irange(low, high, True, last)))
+
+        self.assertEqual([], list(SortedKeys().irange()))
+        self.assertEqual([], list(SortedKeys().irange(1, 2, True)))
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
-import unittest
+import unittest, mock
+from threading import Thread
 import cPickle as pickle
 import multiprocessing
 from itertools import izip
@@ -20,28 +21,31 @@ ITEM6 = {"key": "value 6"}
 
 class TestSQLiteStore(unittest.TestCase):
     def setUp(self):
-        from ddbmock.database.storage.sqlite import conn
+        from ddbmock.database.storage.sqlite import pool
+
+        with pool.connection() as conn:
+            self.conn = conn
 
         conn.execute('DROP TABLE IF EXISTS `test_table`')
         conn.execute('''CREATE TABLE `test_table` (
           `hash_key` blob NOT NULL,
           `range_key` blob NOT NULL,
           `data` blob NOT NULL,
+          `token` integer NOT NULL,
           PRIMARY KEY (`hash_key`,`range_key`)
         );''')
 
-        conn.executemany('''INSERT INTO `test_table` VALUES (?, ?, ?)''',
+        # hash_token('123') < hash_token('456')
+        conn.executemany('''INSERT INTO `test_table` VALUES (?, ?, ?, ?)''',
                          [
-                            (123, 'toto', buffer(pickle.dumps(ITEM1, 2))),
-                            (123, 'titi', buffer(pickle.dumps(ITEM2, 2))),
-                            (123, 'tata', buffer(pickle.dumps(ITEM3, 2))),
-                            (456, 'toto', buffer(pickle.dumps(ITEM4, 2))),
+                            (buffer('123'), buffer('toto'), buffer(pickle.dumps(ITEM1, 2)), 2286445522),
+                            (buffer('123'), buffer('titi'), buffer(pickle.dumps(ITEM2, 2)), 2286445522),
+                            (buffer('123'), buffer('tata'), buffer(pickle.dumps(ITEM3, 2)), 2286445522),
+                            (buffer('456'), buffer('toto'), buffer(pickle.dumps(ITEM4, 2)), 2980627313),
                          ])
 
         conn.commit()
 
-        self.conn = conn
-
     def tearDown(self):
         self.conn.execute('DROP TABLE `test_table`')
         self.conn.commit()
@@ -74,9 +78,9 @@ class TestSQLiteStore(unittest.TestCase):
             return [p.recv() for (p, c) in pipe]
 
         def insert(pnum):
-            tup = (pnum + 100, ("process_%d" % pnum), 'val')
+            tup = (pnum + 100, ("process_%d" % pnum), 'val', 0)
             return self.conn.execute('INSERT INTO `test_table` VALUES '
-                                     '(?, ?, ?)', tup)
+                                     '(?, ?, ?, ?)', tup)
 
         parmap(insert, range(NUM_PROCS))
 
@@ -105,26 +109,26 @@ class TestSQLiteStore(unittest.TestCase):
         from ddbmock.database.storage.sqlite import Store
 
         store = Store(TABLE_NAME)
-        self.assertEqual(ITEM2, store[(123, 'titi')])
-        self.assertEqual(ITEM4, store[(456, 'toto')])
+        self.assertEqual(ITEM2, store[('123', 'titi')])
+        self.assertEqual(ITEM4, store[('456', 'toto')])
 
         self.assertEqual({
                             'toto': ITEM1,
                             'titi': ITEM2,
                             'tata': ITEM3,
-                         }, store[(123, None)])
+                         }, store[('123', None)])
 
-        self.assertRaises(KeyError, store.__getitem__, (404, None))
-        self.assertRaises(KeyError, store.__getitem__, (132, '404'))
+        self.assertRaises(KeyError, store.__getitem__, ('404', None))
+        self.assertRaises(KeyError, store.__getitem__, ('132', '404'))
 
     def test_del_item(self):
         from ddbmock.database.storage.sqlite import Store
 
         store = Store(TABLE_NAME)
-        del store[123, 'toto']
-        del store[123, 'titi']
-        del store[404, 'titi']
-        del store[456, 'toto']
+        del store['123', 'toto']
+        del store['123', 'titi']
+        del store['404', 'titi']
+        del store['456', 'toto']
 
         # it's not real unit test: I use __iter__ to check
         self.assertEqual([ITEM3], list(store))
@@ -134,8 +138,308 @@ class TestSQLiteStore(unittest.TestCase):
 
         store = Store(TABLE_NAME)
 
-        store[123, 'titi'] = ITEM5
-        store[456, 'titi'] = ITEM6
+        store['123', 'titi'] = ITEM5
+        store['456', 'titi'] = ITEM6
 
         # it's not real unit test: I use __iter__ to check
         self.assertEqual([ITEM1, ITEM3, ITEM4, ITEM5, ITEM6], list(store))
+
+    def test_range_query(self):
+        from ddbmock.database.storage.sqlite import Store
+
+        store = Store(TABLE_NAME)
+
+        self.assertEqual([ITEM3, ITEM2, ITEM1], list(store.range_query('123')))
+        self.assertEqual([ITEM1, ITEM2, ITEM3],
+                         list(store.range_query('123', reverse=True)))
+        self.assertEqual([ITEM2, ITEM1], list(store.range_query('123', 'tb')))
+        self.assertEqual([ITEM2, ITEM3],
+                         list(store.range_query('123', None, 'toto', True)))
+        self.assertEqual([ITEM2], list(store.range_query('123', 'titi', 'titj')))
+        self.assertEqual([], list(store.range_query('404')))
+
+    def test_range_query_limit(self):
+        from ddbmock.database.storage.sqlite import Store
+
+        store = Store(TABLE_NAME)
+
+        self.assertEqual([ITEM3, ITEM2], list(store.range_query('123', limit=2)))
+        self.assertEqual([ITEM1], list(store.range_query('123', reverse=True, limit=1)))
+        self.assertEqual([ITEM1], list(store.range_query('123', 'titj', limit=2)))
+
+        # only the returned rows are read
+        with mock.patch('ddbmock.database.storage.sqlite.decode') as m_decode:
+            list(store.range_query('123', limit=2))
+        self.assertEqual(2, m_decode.call_count)
+
+    def test_scan(self):
+        from ddbmock.database.storage.sqlite import Store
+
+        store = Store(TABLE_NAME)
+
+        self.assertEqual([ITEM3, ITEM2, ITEM1, ITEM4], list(store.scan()))
+        self.assertEqual([ITEM1, ITEM4], list(store.scan('123', 'titi')))
+        self.assertEqual([ITEM4], list(store.scan('123', 'toto')))
+        self.assertEqual([], list(store.scan('456', 'toto')))
+
+    @mock.patch('ddbmock.config.STORAGE_SQLITE_BATCH_SIZE', 2)
+    def test_batches(self):
+        from ddbmock.database.storage.sqlite import Store
+
+        store = Store(TABLE_NAME)
+
+        self.assertEqual([ITEM1, ITEM2, ITEM3, ITEM4], list(store))
+        self.assertEqual([ITEM3, ITEM2, ITEM1, ITEM4], list(store.scan()))
+        self.assertEqual([ITEM2, ITEM1, ITEM4], list(store.scan('123', 'tata')))
+        self.assertEqual([ITEM3, ITEM2, ITEM1], list(store.range_query('123')))
+        self.assertEqual([ITEM1, ITEM2, ITEM3], list(store.range_query('123', reverse=True)))
+        self.assertEqual([ITEM3, ITEM2], list(store.range_query('123', limit=2)))
+        self.assertEqual([ITEM3, ITEM2, ITEM1], list(store.range_query('123', limit=3)))
+
+        # each batch only holds batch size rows
+        with mock.patch('ddbmock.database.storage.sqlite.decode') as m_decode:
+            items = store.scan()
+            next(items)
+        self.assertEqual(1, m_decode.call_count)
+
+    @mock.patch('ddbmock.config.STORAGE_SQLITE_BATCH_SIZE', 2)
+    def test_scan_concurrent_writes(self):
+        from ddbmock.database.storage.sqlite import Store
+
+        store = Store(TABLE_NAME)
+
+        items = store.scan()
+        self.assertEqual(ITEM3, next(items))
+
+        # commits between 2 batches do not break the iteration
+        del store['123', 'tata']
+        store['123', 'tutu'] = ITEM5
+        store['123', 'titj'] = ITEM6
+        self.assertEqual([ITEM2, ITEM6, ITEM1, ITEM5, ITEM4], list(items))
+
+    def test_scan_segments(self):
+        from ddbmock.database.storage.sqlite import Store
+        from ddbmock.database.key import hash_segment
+
+        store = Store(TABLE_NAME)
+        store.truncate()
+
+        keys = [("h%d" % h, "r") for h in range(20)]
+        for key in keys:
+            store[key] = key
+
+        items = []
+        for segment in range(4):
+            segment_items = list(store.scan(segment=segment, total_segments=4))
+            for h, r in segment_items:
+                self.assertEqual(segment, hash_segment(h, 4))
+            items.extend(segment_items)
+
+        self.assertEqual(sorted(keys), sorted(items))
+
+    @mock.patch('ddbmock.config.STORAGE_SQLITE_BATCH_SIZE', 2)
+    def test_scan_segments_index(self):
+        from ddbmock.database.storage.sqlite import Store
+
+        store = Store(TABLE_NAME)
+        store.truncate()
+
+        keys = [("h%d" % h, r) for h in range(20) for r in ["r1", "r2"]]
+        for key in keys:
+            store[key] = key
+
+        # segments are ranges of the token index: other rows are not read
+        plan = self.conn.execute('EXPLAIN QUERY PLAN SELECT `data` FROM `test_table` '
+                                 'WHERE `token`>=? AND `token`<? ORDER BY `token`, `hash_key`, `range_key`',
+                                 (0, 1)).fetchall()
+        self.assertIn('test_table~token', str(plan))
+
+        for segment in range(4):
+            segment_items = list(store.scan(segment=segment, total_segments=4))
+            for i, key in enumerate(segment_items):
+                self.assertEqual(segment_items[i+1:],
+                                 list(store.scan(*key, segment=segment, total_segments=4)))
+
+    def test_token_migration(self):
+        from ddbmock.database.storage.sqlite import Store
+        from ddbmock.database.key import hash_token
+
+        # table of a previous version
+        self.conn.execute('DROP TABLE `test_table`')
+        self.conn.execute('''CREATE TABLE `test_table` (
+          `hash_key` blob NOT NULL,
+          `range_key` blob NOT NULL,
+          `data` blob NOT NULL,
+          PRIMARY KEY (`hash_key`,`range_key`)
+        );''')
+        self.conn.execute('INSERT INTO `test_table` VALUES (?, ?, ?)',
+                          (buffer('456'), buffer('toto'), buffer(pickle.dumps(ITEM4, 2))))
+
+        store = Store(TABLE_NAME)
+        store['123', 'toto'] = ITEM1
+
+        self.assertEqual([(hash_token('123'), ), (hash_token('456'), )],
+                         self.conn.execute('SELECT `token` FROM `test_table` ORDER BY `token`').fetchall())
+        self.assertEqual([ITEM1, ITEM4], list(store.scan()))
+
+    def test_key_migration(self):
+        from ddbmock.database.storage.sqlite import Store
+        from ddbmock.database.key import PrimaryKey, encode_number, encode_string
+
+        # raw key values, as written by a previous version
+        self.conn.execute('DROP TABLE `test_table`')
+        self.conn.execute('''CREATE TABLE `test_table` (
+          `hash_key` blob NOT NULL,
+          `range_key` blob NOT NULL,
+          `data` blob NOT NULL,
+          PRIMARY KEY (`hash_key`,`range_key`)
+        );''')
+        self.conn.executemany('INSERT INTO `test_table` VALUES (?, ?, ?)', [
+            (u'10', u'toto', buffer(pickle.dumps(ITEM1, 2))),
+            (u'10', u'titi', buffer(pickle.dumps(ITEM2, 2))),
+            (u'9', u'toto', buffer(pickle.dumps(ITEM3, 2))),
+        ])
+
+        store = Store(TABLE_NAME, PrimaryKey(u'hash_key', u'N'), PrimaryKey(u'range_key', u'S'))
+        HASH10, HASH9 = encode_number(u'10'), encode_number(u'9')
+
+        self.assertEqual(ITEM1, store[HASH10, encode_string(u'toto')])
+        self.assertEqual([ITEM2, ITEM1], list(store.range_query(HASH10)))
+        self.assertEqual([ITEM3], list(store.range_query(HASH9)))
+
+        # writes replace the migrated rows
+        store[HASH9, encode_string(u'toto')] = ITEM4
+        self.assertEqual(3, self.conn.execute('SELECT COUNT(*) FROM `test_table`').fetchone()[0])
+        self.assertEqual(ITEM4, store[HASH9, encode_string(u'toto')])
+
+
+class TestSQLiteConnectionPool(unittest.TestCase):
+    def setUp(self):
+        import tempfile, os
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'dynamo.db')
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.dir)
+
+    def test_connection_per_thread(self):
+        from ddbmock.database.storage.sqlite import ConnectionPool
+
+        pool = ConnectionPool(self.path)
+        conns = []
+
+        def worker():
+            with pool.connection() as conn:
+                conns.append(conn)
+            with pool.connection() as conn:
+                conns.append(conn)
+
+        threads = [Thread(target=worker) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # one connection per thread, reused
+        self.assertIs(conns[0], conns[1])
+        self.assertIs(conns[2], conns[3])
+        self.assertIsNot(conns[0], conns[2])
+
+        mode = conns[0].execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual('wal', mode)
+
+    def test_shared_memory_connection(self):
+        from ddbmock.database.storage.sqlite import ConnectionPool
+
+        pool = ConnectionPool(':memory:')
+
+        def try_lock(ret):
+            if pool.lock.acquire(False):
+                pool.lock.release()
+                ret.append(True)
+            else:
+                ret.append(False)
+
+        # statements are serialized
+        ret = []
+        with pool.connection() as conn1:
+            thread = Thread(target=try_lock, args=(ret,))
+            thread.start()
+            thread.join()
+        with pool.connection() as conn2:
+            pass
+
+        self.assertEqual([False], ret)
+
+        self.assertIs(conn1, conn2)
+
+    def test_concurrent_writes(self):
+        from ddbmock.database.storage import sqlite
+
+        with mock.patch.object(sqlite, 'pool', sqlite.ConnectionPool(self.path)):
+            store = sqlite.Store(TABLE_NAME)
+
+            def worker(h):
+                for r in range(20):
+                    store['h%d' % h, 'r%d' % r] = (h, r)
+                    self.assertEqual((h, r), store['h%d' % h, 'r%d' % r])
+
+            threads = [Thread(target=worker, args=(h,)) for h in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(80, len(list(store)))
+
+    def test_batch(self):
+        from ddbmock.database.storage import sqlite
+
+        with mock.patch.object(sqlite, 'pool', sqlite.ConnectionPool(self.path)):
+            store = sqlite.Store(TABLE_NAME)
+            other = sqlite.connect(self.path)
+            count = lambda: other.execute('SELECT Count(*) FROM `{}`'.format(TABLE_NAME)).fetchone()[0]
+
+            with store.batch():
+                store['h1', 'r1'] = ITEM1
+                with store.batch():
+                    store['h2', 'r2'] = ITEM2
+                # not visible outside the transaction
+                self.assertEqual(0, count())
+                self.assertEqual(ITEM2, store['h2', 'r2'])
+            self.assertEqual(2, count())
+
+            # committed on error too
+            try:
+                with store.batch():
+                    del store['h1', 'r1']
+                    raise ValueError()
+            except ValueError:
+                pass
+            self.assertEqual(1, count())
+
+            with store.batch():
+                del store['h2', 'r2']
+            self.assertEqual(0, count())
+
+    def test_rows_read_with_the_connection(self):
+        from ddbmock.database.storage import sqlite
+        from contextlib import contextmanager
+
+        @contextmanager
+        def closing_connection():
+            conn = sqlite.connect(self.path)
+            yield conn
+            conn.close()  # rows left unread are lost
+
+        pool = sqlite.ConnectionPool(self.path)
+        with mock.patch.object(sqlite, 'pool', pool):
+            store = sqlite.Store(TABLE_NAME)
+            store['h1', 'r1'] = ITEM1
+            store['h1', 'r2'] = ITEM2
+
+            with mock.patch.object(pool, 'connection', closing_connection):
+                self.assertEqual({'r1': ITEM1, 'r2': ITEM2}, store['h1', None])
+                self.assertEqual(ITEM1, store['h1', 'r1'])
+                self.assertEqual([ITEM1, ITEM2], list(store.scan()))
@@ -5,6 +5,8 @@ import unittest, mock
 # tests
 # - delete callback
 # - create table persist schema
+# - write batch grouped by table
+# - per table storage engine
 
 TABLE_NAME = "tabloid"
 TABLE_NAME2 = "razoroid"
@@ -67,7 +69,7 @@ class TestDB(unittest.TestCase):
                                                dynamodb.data[TABLE_NAME2],
                                               )
 
-    @mock.patch('ddbmock.database.db.Store')
+    @mock.patch('ddbmock.database.db.create_store')
     def test_init_reloads_schema(self, m_store):
         from ddbmock.database.db import DynamoDB
         old_internal_state = DynamoDB._shared_data
@@ -89,3 +91,69 @@ class TestDB(unittest.TestCase):
 
 
         DynamoDB._shared_data = old_internal_state
+
+    def test_write_batch_groups_writes(self):
+        from ddbmock.database import dynamodb
+        from ddbmock.database.item import Item
+
+        calls = []
+        self.t1.batch = mock.MagicMock()
+        self.t1.batch.return_value.__enter__.side_effect = lambda: calls.append('begin')
+        self.t1.batch.return_value.__exit__.side_effect = lambda *args: calls.append('end')
+        self.t1.put.side_effect = lambda item, expected: calls.append('put') or (Item(), Item(item))
+        self.t1.delete_item.side_effect = lambda key, expected: calls.append('delete') or Item()
+
+        dynamodb.write_batch({TABLE_NAME: [
+            {u'PutRequest': {u'Item': {u'hash_key': {u'N': u'1'}}}},
+            {u'DeleteRequest': {u'Key': {u'HashKeyElement': {u'N': u'2'}}}},
+        ]})
+
+        self.assertEqual(['begin', 'put', 'delete', 'end'], calls)
+
+    @mock.patch('ddbmock.database.db.dynamodb.store')
+    def test_create_table_engine(self, m_store):
+        from ddbmock.database.db import dynamodb
+        from ddbmock.database.storage import memory, log
+        import tempfile, shutil
+
+        data = {
+            "TableName": TABLE_NAME2,
+            "KeySchema": [HASH_KEY],
+            "ProvisionedThroughput": {
+                "ReadCapacityUnits": TABLE_RT,
+                "WriteCapacityUnits": TABLE_WT,
+            }
+        }
+        engines = [('raz*', 'log')]
+        tmp = tempfile.mkdtemp()
+
+        try:
+            with mock.patch('ddbmock.config.STORAGE_LOG_DIR', tmp):
+                # explicit
+                table = dynamodb.create_table(TABLE_NAME2, data, 'log')
+                self.assertEqual('log', table.engine)
+                self.assertIs(log.Store, type(table.store))
+                del dynamodb.data[TABLE_NAME2]
+
+                # from config
+                with mock.patch('ddbmock.config.STORAGE_ENGINES', engines):
+                    table = dynamodb.create_table(TABLE_NAME2, data)
+                    self.assertEqual('log', table.engine)
+                    del dynamodb.data[TABLE_NAME2]
+
+                    data["TableName"] = TABLE_NAME
+                    table = dynamodb.create_table(TABLE_NAME2 + '-bis', data)
+                    self.assertEqual('memory', table.engine)
+                    self.assertIs(memory.Store, type(table.store))
+                    del dynamodb.data[TABLE_NAME2 + '-bis']
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_get_engine(self):
+        from ddbmock.database.storage import get_engine
+
+        engines = [('ref-*', 'sqlite'), ('*', 'log')]
+        with mock.patch('ddbmock.config.STORAGE_ENGINES', engines):
+            self.assertEqual('sqlite', get_engine('ref-users'))
+            self.assertEqual('log', get_engine('users'))
+        self.assertEqual('memory', get_engine('ref-users'))
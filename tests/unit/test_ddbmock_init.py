@@ -31,6 +31,12 @@ class TestDdbmockInit(unittest.TestCase):
         self.assertNotEqual(real_boto['Layer1.make_request'], boto_router)
         self.assertNotEqual(real_boto['Layer1.__init__'], layer1_mock_init)
 
+    def test_connect_boto_patch_trusted(self):
+        from ddbmock import connect_boto_patch
+
+        self.assertFalse(connect_boto_patch().layer1.trusted)
+        self.assertTrue(connect_boto_patch(trusted=True).layer1.trusted)
+
     def test_connect_boto_patch_network(self):
         try:
             socket.gethostbyname(HOST)
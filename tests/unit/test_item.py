@@ -65,7 +65,8 @@ class TestItem(unittest.TestCase):
             FIELDNAME: VALUE_SS,
         })
         item._apply_action(FIELDNAME, {"Action": "DELETE", "Value": VALUE_SS_DEL})
-        self.assertEqual([(FIELDNAME, VALUE_SS_SUR)], item.items())
+        self.assertEqual([FIELDNAME], item.keys())
+        self.assertEqual(sorted(VALUE_SS_SUR[u"SS"]), sorted(item[FIELDNAME][u"SS"]))
 
         # delete set all from set
         item = Item({
@@ -97,6 +98,17 @@ class TestItem(unittest.TestCase):
         item._apply_action(FIELDNAME, {"Action": "ADD", "Value": VALUE_SS})
         self.assertEqual([(FIELDNAME, VALUE_SS)], item.items())
 
+    def test_action_copy_on_write(self):
+        from ddbmock.database.item import Item
+
+        # a shallow copy is not altered by actions
+        for value, add in [(VALUE_N, VALUE_N), (VALUE_SS, VALUE_SS_DEL)]:
+            old = Item({FIELDNAME: value})
+            new = Item(old)
+            new.apply_actions({FIELDNAME: {"Action": "ADD", "Value": add}})
+            self.assertEqual([(FIELDNAME, value)], old.items())
+            self.assertIsNot(old[FIELDNAME], new[FIELDNAME])
+
     def test_action_type_mismatch(self):
         from ddbmock.database.item import Item
         from ddbmock.errors import ValidationException
@@ -193,7 +205,7 @@ class TestItem(unittest.TestCase):
         self.assertEqual(15, item.get_field_size(u"S"))
         self.assertEqual(12, item.get_field_size(u"B"))
         self.assertEqual(16, item.get_field_size(u"NS"))
-        self.assertEqual(30, item.get_field_size(u"SS"))
+        self.assertEqual(25, item.get_field_size(u"SS"))
         self.assertEqual(24, item.get_field_size(u"BS"))
 
     def test_item_size_computation(self):
@@ -211,7 +223,7 @@ class TestItem(unittest.TestCase):
         s2 = item2.get_size()
 
         self.assertEqual(0, s1)
-        self.assertEqual(114, s2)
+        self.assertEqual(109, s2)
 
         # check cache
         self.assertEqual(s1, item1.size)
@@ -52,3 +52,75 @@ class TestKey(unittest.TestCase):
         }
 
         self.assertEqual(expected, k.to_dict())
+
+    def test_encode_number_order(self):
+        from ddbmock.database.key import encode_key
+
+        numbers = [u'-1E+126', u'-100', u'-12.5', u'-12', u'-9', u'-0.001',
+                   u'0', u'1E-128', u'0.001', u'9', u'10', u'12', u'12.5',
+                   u'100', u'1E+126']
+        encoded = [encode_key(u'N', n) for n in numbers]
+
+        self.assertEqual(encoded, sorted(encoded))
+
+    def test_encode_number_normalized(self):
+        from ddbmock.database.key import encode_key
+
+        self.assertEqual(encode_key(u'N', u'1'), encode_key(u'N', u'1.00'))
+        self.assertEqual(encode_key(u'N', u'1'), encode_key(u'N', u'10E-1'))
+        self.assertEqual(encode_key(u'N', u'0'), encode_key(u'N', u'-0.0'))
+        self.assertNotEqual(encode_key(u'N', u'1'), encode_key(u'N', u'-1'))
+
+    def test_encode_string_binary(self):
+        from ddbmock.database.key import encode_key
+
+        self.assertEqual('caf\xc3\xa9', encode_key(u'S', u'café'))
+        self.assertLess(encode_key(u'S', u'z'), encode_key(u'S', u'é'))
+        self.assertEqual('\xff\x00', encode_key(u'B', u'/wA='))
+
+    def test_key_encode(self):
+        from ddbmock.database.key import Key
+        from ddbmock.errors import ValidationException
+
+        k = Key(KEY_NAME, u'N')
+        self.assertEqual('\x03\x80\x011\x00', k.encode({u'N': u'10'}))
+        self.assertRaises(ValidationException, k.encode, {u'S': u'10'})
+
+    def test_key_bounds(self):
+        from ddbmock.database.key import Key
+
+        k = Key(KEY_NAME, u'S')
+
+        def cond(operator, *values):
+            return {
+                u'ComparisonOperator': operator,
+                u'AttributeValueList': [{u'S': v} for v in values],
+            }
+
+        self.assertEqual((None, None), k.bounds(None))
+        self.assertEqual(('b', 'b\x00'), k.bounds(cond(u'EQ', u'b')))
+        self.assertEqual(('b\x00', None), k.bounds(cond(u'GT', u'b')))
+        self.assertEqual(('b', None), k.bounds(cond(u'GE', u'b')))
+        self.assertEqual((None, 'b'), k.bounds(cond(u'LT', u'b')))
+        self.assertEqual((None, 'b\x00'), k.bounds(cond(u'LE', u'b')))
+        self.assertEqual(('a', 'c\x00'), k.bounds(cond(u'BETWEEN', u'a', u'c')))
+        self.assertEqual(('ab', 'ac'), k.bounds(cond(u'BEGINS_WITH', u'ab')))
+
+    def test_prefix_end(self):
+        from ddbmock.database.key import prefix_end
+
+        self.assertEqual('ac', prefix_end('ab'))
+        self.assertEqual('b', prefix_end('a\xff\xff'))
+        self.assertEqual(None, prefix_end('\xff'))
+
+    def test_hash_segment(self):
+        from ddbmock.database.key import hash_segment, segment_tokens, hash_token
+
+        for total in [1, 3, 16, 1000000]:
+            self.assertEqual((0, 1 << 32), (segment_tokens(0, total)[0],
+                                            segment_tokens(total - 1, total)[1]))
+            for key in ['a', 'b', 'waldo', '\x03\x80\x011\x00']:
+                segment = hash_segment(key, total)
+                low, high = segment_tokens(segment, total)
+                self.assertTrue(0 <= segment < total)
+                self.assertTrue(low <= hash_token(key) < high)
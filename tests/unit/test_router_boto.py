@@ -29,3 +29,32 @@ class TestRouterBoto(unittest.TestCase):
         self.assertIsInstance(_ddbmock_exception_to_boto_exception(
                               ConditionalCheckFailedException('taratata')),
                               DynamoDBConditionalCheckFailedError)
+
+    def test_result_conversion(self):
+        from ddbmock.router.boto import _ddbmock_result_to_boto_result
+        from ddbmock.database.item import Item
+        from boto.dynamodb.types import Dynamizer
+        import json
+
+        item = Item({u'hash_key': {u'N': u'123'}, u'data': {u'SS': [u'a', u'b']}, u'é': {u'S': u'ô'}})
+        ret = {
+            'Items': [item, item],
+            'Count': 2,
+            'ConsumedCapacityUnits': 0.5,
+            'LastEvaluatedKey': {'HashKeyElement': {u'N': u'123'}},
+            'Tuple': ('a', u'b'),
+            'Nothing': None,
+            'Empty': {},
+        }
+
+        for object_hook in [None, Dynamizer().decode, lambda d: sorted(d.items())]:
+            expected = json.loads(json.dumps(ret), object_hook=object_hook)
+            got = _ddbmock_result_to_boto_result(ret, object_hook)
+            self.assertEqual(expected, got)
+            self.assertEqual(repr(expected), repr(got))  # same types
+
+        # a copy, like a decoded answer
+        got = _ddbmock_result_to_boto_result(ret)
+        got['Items'][0][u'hash_key'][u'N'] = u'456'
+        self.assertEqual(u'123', item[u'hash_key'][u'N'])
+        self.assertIs(dict, type(got['Items'][0]))
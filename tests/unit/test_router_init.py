@@ -4,53 +4,105 @@ import unittest, mock
 
 ACTION = "CreateTable"
 ACTION_404 = "!~I bet this route won't ever exist~!"
+ACTION_CUSTOM = "HelloWorld"
 ROUTE = "create_table"
 POST = {"toto":"titi"}
-USER = {"name": None}
+USER = {"name": None, "READ_ONLY": False}
 
 class TestRouterInit(unittest.TestCase):
+    def setUp(self):
+        from ddbmock.router import routes
+        self.routes = routes.copy()
+
+    def tearDown(self):
+        from ddbmock.router import routes
+        routes.clear()
+        routes.update(self.routes)
+
+    def test_routes_loaded(self):
+        from ddbmock.router import routes
+        from ddbmock.operations.create_table import create_table
+        from ddbmock.validators import create_table as validator
+
+        route = routes[ACTION]
+        self.assertEqual(ROUTE, route.name)
+        self.assertIs(create_table, route.func)
+        self.assertEqual(validator.permissions, route.permissions)
+
+        # compiled once, without altering the schema
+        self.assertNotIn('request_id', validator.post)
+        self.assertIn('request_id', route.validator.schema)
+        for key in validator.post:
+            self.assertIn(key, route.validator.schema)
+
+        self.assertIn("BatchGetItem", routes)
+        self.assertIn("Query", routes)
+
     @mock.patch("ddbmock.router.import_module")
-    @mock.patch("ddbmock.router.dynamodb_api_validate")
+    @mock.patch("ddbmock.router.validate")
     def test_do_request_nominal(self, m_validate, m_import):
-        from ddbmock.router import router
+        from ddbmock.router import router, register_route
 
-        m_module = m_import.return_value
-        m_route = m_module.create_table
+        m_route = mock.Mock()
         m_route.return_value = {}
         m_validated = m_validate.return_value
+        route = register_route(ACTION, m_route, {}, "write")
 
         router(ACTION, POST, USER)
 
-        m_import.assert_called_with("ddbmock.operations.{}".format(ROUTE))
-        m_validate.assert_called_with(ROUTE, POST, USER)
+        # no introspection on registered routes
+        self.assertFalse(m_import.called)
+        m_validate.assert_called_with(ROUTE, route.validator, "write", POST, USER)
         m_route.assert_called_with(m_validated)
 
+    def test_do_request_no_validator(self):
+        from ddbmock.router import router, register_route
+
+        m_route = mock.Mock()
+        m_route.return_value = {'Hello': 'World'}
+        register_route(ACTION_CUSTOM, m_route)
+
+        self.assertEqual({'Hello': 'World'}, router(ACTION_CUSTOM, POST.copy(), USER))
+        self.assertEqual("titi", m_route.call_args[0][0]["toto"])
+
+    @mock.patch("ddbmock.router.import_module")
+    def test_do_request_load_route(self, m_import):
+        from ddbmock.router import router, routes
+
+        m_route = m_import.return_value.hello_world
+        m_route.return_value = {}
+
+        router(ACTION_CUSTOM, POST.copy(), USER)
+        router(ACTION_CUSTOM, POST.copy(), USER)
+
+        # loaded once then registered
+        m_import.assert_called_once_with("ddbmock.operations.hello_world")
+        self.assertEqual(2, m_route.call_count)
+        self.assertIs(m_route, routes[ACTION_CUSTOM].func)
+
     def test_do_request_route_404(self):
-        from ddbmock.router import router
+        from ddbmock.router import router, routes
         from ddbmock.errors import InternalFailure
 
         self.assertRaisesRegexp(InternalFailure,
                                 'exist',
                                 router,
                                 ACTION_404, POST)
+        self.assertNotIn(ACTION_404, routes)
 
-    @mock.patch("ddbmock.router.import_module")
-    @mock.patch("ddbmock.router.dynamodb_api_validate")
-    def test_internal_server_error(self, m_validate, m_import):
-        from ddbmock.router import router
+    @mock.patch("ddbmock.router.validate")
+    def test_internal_server_error(self, m_validate):
+        from ddbmock.router import router, register_route
         from ddbmock.errors import InternalFailure
 
-        m_module = m_import.return_value
-        m_route = m_module.create_table
-        m_route.return_value = {}
+        m_route = mock.Mock()
         m_route.side_effect = ValueError
         m_validated = m_validate.return_value
+        register_route(ACTION, m_route, {}, "write")
 
         self.assertRaisesRegexp(InternalFailure,
                                 'ValueError',
                                 router,
                                 ACTION, POST, USER)
 
-        m_import.assert_called_with("ddbmock.operations.{}".format(ROUTE))
-        m_validate.assert_called_with(ROUTE, POST, USER)
         m_route.assert_called_with(m_validated)
@@ -4,6 +4,8 @@ import unittest, mock
 
 # tests
 # - update throughput
+# - item count and size
+# - concurrent writes
 
 NAME = "tabloid"
 RT = 100
@@ -20,6 +22,12 @@ RT100 = 201
 WT100 = 201
 CREATION = 2*24*3600  # day 2 of our era (UNIX) (avoids stupid side effects of 0 in the test)
 
+HK_NAME = u'hash_key'
+ITEM1 = {HK_NAME: {u'N': u'1'}, u'relevant_data': {u'S': u'tata'}}
+ITEM2 = {HK_NAME: {u'N': u'2'}, u'relevant_data': {u'S': u'titi'}}
+ITEM2_BIG = {HK_NAME: {u'N': u'2'}, u'relevant_data': {u'S': u'titititi'}}
+KEY2 = {u'HashKeyElement': {u'N': u'2'}}
+
 class TestTable(unittest.TestCase):
     def setUp(self):
         from ddbmock.database.table import Table
@@ -76,5 +84,130 @@ class TestTable(unittest.TestCase):
         self.assertEqual(WT3, self.table.wt)
 
 
+class TestTableStats(unittest.TestCase):
+    def setUp(self):
+        from ddbmock.database.table import Table
+        from ddbmock.database.key import PrimaryKey
+        from ddbmock.database.item import Item
+
+        hash_key = PrimaryKey(HK_NAME, u'N')
+        self.table = Table(NAME, RT, WT, hash_key, None, status="ACTIVE")
+        self.size1 = Item(ITEM1).get_size().with_indexing_overhead()
+        self.size2 = Item(ITEM2).get_size().with_indexing_overhead()
+        self.size2_big = Item(ITEM2_BIG).get_size().with_indexing_overhead()
+
+    def tearDown(self):
+        self.table = None
+
+    def test_stats_follow_writes(self):
+        self.assertEqual((0, 0), self.table.get_stats())
+
+        self.table.put(ITEM1, {})
+        self.table.put(ITEM2, {})
+        self.assertEqual((2, self.size1 + self.size2), self.table.get_stats())
+
+        # overwrite
+        self.table.put(ITEM2_BIG, {})
+        self.assertEqual((2, self.size1 + self.size2_big), self.table.get_stats())
+
+        # update
+        self.table.update_item(KEY2, {u'relevant_data': {u'Action': u'PUT', u'Value': {u'S': u'titi'}}}, {})
+        self.assertEqual((2, self.size1 + self.size2), self.table.get_stats())
+
+        # delete, including non existing
+        self.table.delete_item(KEY2, {})
+        self.table.delete_item(KEY2, {})
+        self.assertEqual((1, self.size1), self.table.get_stats())
+        self.assertEqual(self.size1, self.table.get_size())
+
+        self.table.truncate()
+        self.assertEqual((0, 0), self.table.get_stats())
+
+    def test_update_item_keeps_old(self):
+        self.table.put(ITEM2, {})
+
+        old, new = self.table.update_item(KEY2, {u'relevant_data': {u'Action': u'PUT', u'Value': {u'S': u'titititi'}}}, {})
+
+        self.assertEqual(ITEM2, old)
+        self.assertEqual(ITEM2_BIG, new)
+        self.assertEqual(ITEM2_BIG, self.table.get(KEY2, []))
+
+    def test_concurrent_updates(self):
+        from threading import Thread
+
+        add = {u'counter': {u'Action': u'ADD', u'Value': {u'N': u'1'}}}
+        keys = [{u'HashKeyElement': {u'N': unicode(i)}} for i in range(4)]
+
+        def worker(key):
+            for i in range(100):
+                self.table.update_item(key, add, {})
 
+        threads = [Thread(target=worker, args=(key,)) for key in keys*2]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for key in keys:
+            self.assertEqual({u'N': u'200'}, self.table.get(key, [u'counter'])[u'counter'])
+        self.assertEqual(4, self.table.get_stats()[0])
+
+    def test_stats_failed_write(self):
+        from ddbmock.errors import ConditionalCheckFailedException
+
+        self.table.put(ITEM1, {})
+        self.assertRaises(ConditionalCheckFailedException,
+                          self.table.put,
+                          ITEM1, {u'relevant_data': {u'Exists': False}})
+        self.assertEqual((1, self.size1), self.table.get_stats())
+
+    def test_stats_init_from_store(self):
+        from ddbmock.database.table import Table
+
+        self.table.put(ITEM1, {})
+
+        # simulate a persistent store
+        with mock.patch("ddbmock.database.table.create_store") as m_store:
+            m_store.return_value = self.table.store
+            table = Table(NAME, RT, WT, self.table.hash_key, None)
+
+        self.assertEqual((1, self.size1), table.get_stats())
+
+    def test_stats_loaded_on_first_get(self):
+        from ddbmock.database.table import Table
+        from ddbmock.database.storage.memory import Store
+
+        self.table.put(ITEM1, {})
+
+        # the store is not read when the table is created
+        with mock.patch("ddbmock.database.table.create_store") as m_store:
+            m_store.return_value = self.table.store
+            with mock.patch.object(Store, "__iter__") as m_iter:
+                table = Table(NAME, RT, WT, self.table.hash_key, None)
+        self.assertFalse(m_iter.called)
+
+        # writes before the first read are counted once, from the store
+        table.put(ITEM2, {})
+        self.assertEqual((2, self.size1 + self.size2), table.get_stats())
+
+        # then follow the writes
+        table.delete_item(KEY2, {})
+        table.delete_item(KEY2, {})
+        self.assertEqual((1, self.size1), table.get_stats())
+
+    @mock.patch("ddbmock.database.table.time")
+    @mock.patch("ddbmock.config.TABLE_STATS_INTERVAL", 6*3600)
+    def test_stats_refresh_interval(self, m_time):
+
+        m_time.time.return_value = CREATION
+        self.table.put(ITEM1, {})
+        self.assertEqual((1, self.size1), self.table.get_stats())
+
+        # not refreshed yet
+        m_time.time.return_value = CREATION + 1*3600
+        self.table.put(ITEM2, {})
+        self.assertEqual((1, self.size1), self.table.get_stats())
 
+        # refreshed
+        m_time.time.return_value = CREATION + 6*3600
+        self.assertEqual((2, self.size1 + self.size2), self.table.get_stats())
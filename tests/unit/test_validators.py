@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 
-import unittest
+import unittest, mock, re
 from decimal import Decimal
 
 # tests
 # - number validator
 # - dynamodb_api_validate errors
+# - compiled schemas
+# - trusted users
 
 ACTION_404 = "!~I bet this route won't ever exist~!"
 POST = {"toto":"titi"}
@@ -42,3 +44,139 @@ class TestValidators(unittest.TestCase):
         from ddbmock.validators import dynamodb_api_validate
 
         self.assertEqual(POST, dynamodb_api_validate(ACTION_404, POST))
+
+    def test_compiled_schema_parity(self):
+        from ddbmock.validators import CompiledSchema
+        from onctuous import Schema, Invalid, Required, Optional, Extra, Any
+
+        schema = {
+            u'name': unicode,
+            Required(u'limit', 10): int,
+            Optional(u'tags'): [unicode],
+            u'nested': {u'value': Any({u'S': unicode}, {u'N': unicode})},
+            int: {u'hop': int},
+        }
+        posts = [
+            {u'name': u'waldo', u'nested': {u'value': {u'S': u'x'}}},
+            {u'name': u'waldo', u'limit': 5, u'tags': [u'a'], u'nested': {u'value': {u'N': u'1'}}, 7: {u'hop': 1}},
+            {u'name': 42, u'nested': {u'value': {u'S': u'x'}}},
+            {u'name': u'waldo', u'nested': {u'value': {u'B': u'x'}}},
+            {u'name': u'waldo', u'nested': {u'value': {u'S': u'x'}, u'extra': 1}},
+            {u'name': u'waldo', u'nested': {u'value': {u'S': u'x'}}, 3.5: 1},
+            {u'name': u'waldo', u'nested': {u'value': {u'S': u'x'}}, 7: {u'hop': u'1'}},
+            {u'limit': 5},
+        ]
+
+        for required in [True, False]:
+            reference = Schema(schema, required=required)
+            compiled = CompiledSchema(schema, required=required)
+            for post in posts:
+                try:
+                    expected = reference(post)
+                except Invalid as e:
+                    self.assertRaisesRegexp(Invalid, re.escape(str(e)), compiled, post)
+                else:
+                    self.assertEqual(expected, compiled(post))
+
+        # extra keys
+        schema = {u'name': unicode, Extra: object}
+        self.assertEqual({u'name': u'waldo', u'x': 1},
+                         CompiledSchema(schema)({u'name': u'waldo', u'x': 1}))
+
+    def test_onctuous_internals(self):
+        # CompiledSchema overrides and reads these. Update it along with the
+        # onctuous version pinned in setup.cfg if this fails
+        from onctuous import Schema, Required, Optional, Extra
+        from onctuous.validators import Marker
+        from onctuous.errors import UNDEFINED
+
+        schema = {u'name': unicode}
+        reference = Schema(schema, required=True, extra=False)
+        self.assertEqual((schema, True, False), (reference.schema, reference.required, reference.extra))
+
+        with mock.patch.object(Schema, '_validate_dict') as m_validate:
+            reference({u'name': u'waldo'})
+        m_validate.assert_called_once_with([], schema, {u'name': u'waldo'})
+
+        self.assertTrue(issubclass(Required, Marker))
+        self.assertTrue(issubclass(Optional, Marker))
+        self.assertNotIsInstance(Extra, Marker)
+        self.assertEqual(u'name', Required(u'name').schema)
+        self.assertIs(UNDEFINED, Required(u'name').default)
+        self.assertEqual(10, Required(u'name', 10).default)
+
+    def test_load_validator_cached(self):
+        from ddbmock.validators import load_validator
+        from ddbmock.validators import put_item
+
+        validator, permissions = load_validator('put_item')
+
+        self.assertIs(validator, load_validator('put_item')[0])
+        self.assertEqual(put_item.permissions, permissions)
+        self.assertNotIn('request_id', put_item.post)
+        self.assertEqual((None, None), load_validator(ACTION_404))
+
+    def test_compiled_schema_defaults(self):
+        from ddbmock.validators import CompiledSchema
+        from onctuous import Required, Any
+
+        nested = {u'hop': int}
+        schema = {
+            u'name': unicode,
+            Required(u'limit', 10): int,
+            Required(u'start', None): int,
+            u'tables': {unicode: {u'Keys': [int], Required(u'Count', False): bool}},
+            u'list': [{Required(u'x', 1): int}],
+            u'nested': nested,
+            u'any': Any({Required(u'Action', u'PUT'): unicode}),
+        }
+        compiled = CompiledSchema(schema, required=True)
+
+        post = {
+            u'name': 42,  # not validated
+            u'tables': {u'a': {u'Keys': [1]}, u'b': {u'Keys': [2], u'Count': True}},
+            u'list': [{}, {u'x': 2}],
+            u'nested': {u'hop': u'1'},
+            u'any': {},
+            u'unknown': 1,
+        }
+
+        self.assertEqual({
+            u'name': 42,
+            u'limit': 10,
+            u'start': None,
+            u'tables': {u'a': {u'Keys': [1], u'Count': False}, u'b': {u'Keys': [2], u'Count': True}},
+            u'list': [{u'x': 1}, {u'x': 2}],
+            u'nested': {u'hop': u'1'},
+            u'any': {},  # validator functions are not walked
+            u'unknown': 1,
+        }, compiled.defaults(post))
+
+        # branches without defaults are not copied
+        self.assertIs(post[u'nested'], compiled.defaults(post)[u'nested'])
+        self.assertIs(post, CompiledSchema(nested).defaults(post))
+
+    def test_validate_trusted(self):
+        from ddbmock.validators import dynamodb_api_validate
+        from ddbmock.errors import ValidationException, AccessDeniedException
+
+        post = {u'TableName': u'!', u'Key': {}, 'request_id': '42'}
+        user = {"name": None, "READ_ONLY": False, "TRUSTED": False}
+        trusted = dict(user, TRUSTED=True)
+
+        self.assertRaises(ValidationException, dynamodb_api_validate, 'get_item', post, user)
+        self.assertEqual(dict(post, AttributesToGet=[], ConsistentRead=False),
+                         dynamodb_api_validate('get_item', post, trusted))
+
+        # permissions are still enforced
+        self.assertRaises(AccessDeniedException, dynamodb_api_validate,
+                          'put_item', post, dict(trusted, READ_ONLY=True))
+
+    def test_validate_default_user(self):
+        from ddbmock.validators import dynamodb_api_validate
+
+        post = {u'TableName': u'Table-HR', u'Key': {u'HashKeyElement': {u'N': u'1'}}, 'request_id': '42'}
+
+        # same as the router: no user means the default profile
+        self.assertEqual(u'NONE', dynamodb_api_validate('delete_item', dict(post))[u'ReturnValues'])
+        self.assertEqual(False, dynamodb_api_validate('get_item', dict(post))[u'ConsistentRead'])
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+import unittest, mock, copy, re
+
+# tests
+# - fast path accepts valid requests with the schema result
+# - fast path never accepts a request the schema rejects (mutated requests)
+# - errors are reported by the schema
+# - config switch
+
+TABLE_NAME = u'Table-HR'
+KEY = {u'HashKeyElement': {u'N': u'123'}, u'RangeKeyElement': {u'S': u'Waldo-1'}}
+ITEM = {
+    u'hash_key': {u'N': u'123'},
+    u'range_key': {u'S': u'Waldo-1'},
+    u'relevant_data': {u'B': u'THVkaWEgaXMgdGhlIGJlc3QgY29tcGFueSBldmVyIQ=='},
+    u'sets': {u'SS': [u'a', u'b'], u'NS': [u'1', u'-1.5E10']},
+}
+
+VALID = {
+    'get_item': [
+        {u'TableName': TABLE_NAME, u'Key': KEY},
+        {u'TableName': TABLE_NAME, u'Key': {u'HashKeyElement': {u'S': u'x'}},
+         u'AttributesToGet': [u'a', u'b'], u'ConsistentRead': True},
+    ],
+    'put_item': [
+        {u'TableName': TABLE_NAME, u'Item': ITEM},
+        {u'TableName': TABLE_NAME, u'Item': ITEM, u'ReturnValues': u'ALL_OLD',
+         u'Expected': {
+            u'a': {u'Exists': False},
+            u'b': {u'Value': {u'S': u'x'}},
+            u'c': {u'Exists': True, u'Value': {u'NS': [u'1']}},
+         }},
+    ],
+    'update_item': [
+        {u'TableName': TABLE_NAME, u'Key': KEY, u'AttributeUpdates': {
+            u'a': {u'Value': {u'S': u'x'}},
+            u'b': {u'Action': u'ADD', u'Value': {u'N': u'1'}},
+            u'c': {u'Action': u'DELETE', u'Value': {u'SS': [u'x']}},
+            u'd': {u'Action': u'DELETE'},
+            u'e': {u'Action': u'PUT', u'Value': {u'BS': [u'dGF0YQ==']}},
+        }, u'ReturnValues': u'UPDATED_NEW', u'Expected': {u'a': {u'Exists': False}}},
+    ],
+    'query': [
+        {u'TableName': TABLE_NAME, u'HashKeyValue': {u'N': u'123'}},
+        {u'TableName': TABLE_NAME, u'HashKeyValue': {u'N': u'123'},
+         u'RangeKeyCondition': {u'ComparisonOperator': u'BETWEEN',
+                                u'AttributeValueList': [{u'S': u'a'}, {u'S': u'b'}]},
+         u'ScanIndexForward': False, u'Count': False, u'Limit': 10,
+         u'ExclusiveStartKey': KEY, u'AttributesToGet': [u'a'], u'ConsistentRead': True},
+        {u'TableName': TABLE_NAME, u'HashKeyValue': {u'N': u'123'},
+         u'RangeKeyCondition': {u'ComparisonOperator': u'BEGINS_WITH',
+                                u'AttributeValueList': [{u'S': u'Waldo'}]},
+         u'Count': True},
+        {u'TableName': TABLE_NAME, u'HashKeyValue': {u'N': u'123'},
+         u'RangeKeyCondition': {u'ComparisonOperator': u'GE',
+                                u'AttributeValueList': [{u'N': u'1'}]}},
+    ],
+    'batch_get_item': [
+        {u'RequestItems': {
+            TABLE_NAME: {u'Keys': [KEY, {u'HashKeyElement': {u'N': u'1'}}]},
+            u'Table-H': {u'Keys': [{u'HashKeyElement': {u'S': u'x'}}],
+                         u'AttributesToGet': [u'a'], u'ConsistentRead': True},
+        }},
+    ],
+}
+
+# values substituted everywhere in the valid requests
+VALUES = [
+    None, True, False, 0, 1, -1, 2**70, 1.5,
+    u'', u'x', 'x', u'1', u'NaN', u'1E500', u'1.000000000000000000000000000000000000001',
+    u'not base64!', u'dGF0YQ==', u'Table-HR', u'bad table name !',
+    u'NONE', u'ALL_NEW', u'PUT', u'ADD', u'DELETE', u'EQ', u'BETWEEN', u'BEGINS_WITH', u'CONTAINS',
+    [], [u'x'], [{}], [{u'S': u'x'}], [{u'S': u'x'}, {u'S': u'y'}], (u'x',),
+    {}, {u'S': u'x'}, {u'N': u'1'}, {u'NS': [u'1']}, {u'Z': u'1'}, {u'S': u'x', u'N': u'1'},
+    {u'Exists': False}, {u'Exists': True}, {u'Value': {u'S': u'x'}}, {u'Action': u'DELETE'},
+    {u'HashKeyElement': {u'S': u'x'}},
+]
+
+def mutations(value):
+    """Yield copies of ``value`` with one change each, at all depths"""
+    for v in VALUES:
+        yield copy.deepcopy(v)
+
+    if isinstance(value, dict):
+        yield dict(value, Waldo=u'x')
+        yield dict(value, **{u'Waldo': {u'S': u'x'}})
+        for key in value:
+            yield dict((k, v) for k, v in value.iteritems() if k != key)
+            for mutated in mutations(value[key]):
+                out = dict(value)
+                out[key] = mutated
+                yield out
+    elif isinstance(value, list):
+        yield value + value[-1:]
+        yield value[1:]
+        for i in range(len(value)):
+            for mutated in mutations(value[i]):
+                yield value[:i] + [mutated] + value[i+1:]
+
+FALLBACK = object()
+
+class TestFastValidators(unittest.TestCase):
+    def check(self, action, post):
+        from ddbmock.validators import compile_validator
+        from ddbmock.validators.fast import CHECKS
+        from importlib import import_module
+
+        schema = compile_validator(import_module('ddbmock.validators.' + action).post)
+        post = dict(post, request_id='42')
+
+        try:
+            expected = schema(copy.deepcopy(post))
+        except Exception as e:
+            expected = e
+
+        try:
+            got = CHECKS[action](copy.deepcopy(post))
+        except Exception:
+            return FALLBACK
+
+        self.assertNotIsInstance(expected, Exception, "fast path accepted {!r}".format(post))
+        self.assertEqual(expected, got)
+        return got
+
+    def test_valid(self):
+        for action, posts in VALID.iteritems():
+            for post in posts:
+                self.assertIsNot(FALLBACK, self.check(action, post), "{} {!r}".format(action, post))
+
+    def test_mutated(self):
+        for action, posts in VALID.iteritems():
+            for post in posts:
+                for mutated in mutations(post):
+                    if isinstance(mutated, dict):
+                        self.check(action, mutated)
+
+    def test_defaults(self):
+        from ddbmock.validators.fast import CHECKS
+
+        post = CHECKS['update_item']({
+            u'TableName': TABLE_NAME, u'Key': KEY,
+            u'AttributeUpdates': {u'a': {u'Value': {u'S': u'x'}}},
+            'request_id': '42',
+        })
+
+        self.assertEqual(u'NONE', post[u'ReturnValues'])
+        self.assertEqual({}, post[u'Expected'])
+        self.assertEqual({u'Value': {u'S': u'x'}, u'Action': u'PUT'}, post[u'AttributeUpdates'][u'a'])
+
+    def test_errors_from_schema(self):
+        from ddbmock.validators import dynamodb_api_validate, compile_validator
+        from ddbmock.validators import get_item
+        from ddbmock.errors import ValidationException
+        from onctuous import Invalid
+
+        post = {u'TableName': u'!', u'Key': KEY, 'request_id': '42'}
+
+        try:
+            compile_validator(get_item.post)(dict(post))
+        except Invalid as e:
+            expected = str(e)
+
+        self.assertRaisesRegexp(ValidationException, re.escape(expected),
+                                dynamodb_api_validate, 'get_item', post, {"READ_ONLY": False})
+
+    def test_config(self):
+        from ddbmock.validators.fast import fast_validator
+
+        m_schema = mock.Mock()
+        validator = fast_validator('get_item', m_schema)
+        post = {u'TableName': TABLE_NAME, u'Key': KEY, 'request_id': '42'}
+
+        # valid: fast path
+        self.assertEqual(KEY, validator(post)[u'Key'])
+        self.assertFalse(m_schema.called)
+
+        # invalid: schema
+        self.assertIs(m_schema.return_value, validator(dict(post, Key={})))
+        m_schema.assert_called_once_with(dict(post, Key={}))
+
+        # disabled: schema
+        m_schema.reset_mock()
+        with mock.patch('ddbmock.config.FAST_VALIDATORS', False):
+            self.assertIs(m_schema.return_value, validator(post))
+        m_schema.assert_called_once_with(post)
+
+        # not a hot operation
+        self.assertIs(m_schema, fast_validator('scan', m_schema))